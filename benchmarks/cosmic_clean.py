@@ -0,0 +1,52 @@
+"""
+Wall time of `Fits.cosmic_clean` on the whole image and in tiles.
+
+Usage:
+    python benchmarks/cosmic_clean.py [--size 2048] [--niter 4]
+                                      [--tiles 256 512 1024] [--workers 1 2 4]
+"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from myraflib import Fits
+
+
+def image(size: int, seed: int = 0) -> Fits:
+    rng = np.random.default_rng(seed)
+    data = rng.normal(1000, 30, (size, size))
+    ys, xs = rng.integers(0, size, size), rng.integers(0, size, size)
+    data[ys, xs] += rng.uniform(2000, 20000, size)
+    return Fits.from_data_header(data)
+
+
+def timed(fits: Fits, **kwargs):
+    start = perf_counter()
+    cleaned = fits.cosmic_clean(**kwargs)
+    return perf_counter() - start, cleaned.data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2048, help="width and height of the test image")
+    parser.add_argument("--niter", type=int, default=4, help="number of L.A.Cosmic iterations")
+    parser.add_argument("--tiles", type=int, nargs="+", default=[256, 512, 1024], help="tile sizes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="numbers of processes")
+    args = parser.parse_args()
+
+    fits = image(args.size)
+
+    whole, expected = timed(fits, niter=args.niter)
+    print(f"{'tile':>6} {'workers':>8} {'seconds':>9} {'speedup':>8} {'identical':>10}")
+    print(f"{'-':>6} {'-':>8} {whole:9.2f} {1:8.2f} {'-':>10}")
+
+    for tile_size in args.tiles:
+        for workers in args.workers:
+            elapsed, cleaned = timed(fits, niter=args.niter, tile_size=tile_size, workers=workers)
+            identical = np.array_equal(cleaned, expected)
+            print(f"{tile_size:6d} {workers:8d} {elapsed:9.2f} {whole / elapsed:8.2f} {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
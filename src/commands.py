@@ -8,8 +8,8 @@ from astropy.coordinates import SkyCoord
 from myraflib import FitsArray, Fits
 
 
-def imhead(files):
-    fits_array = FitsArray.from_pattern(files, verbose=True)
+def imhead(files, index=None):
+    fits_array = FitsArray.from_pattern(files, verbose=True, index=index)
     headers = fits_array.header()
     print(headers.to_json(orient='index', indent=4))
 
@@ -163,6 +163,8 @@ def main():
 
     header = subparsers.add_parser('header', help='Image Header')
     header.add_argument('file', type=str, help='A file path or pattern (e.g., "*.fits")')
+    header.add_argument('--index', type=str, help='Header index file to read from and update (SQLite)',
+                        default=None)
 
     hedit = subparsers.add_parser('hedit', help='Header Edit')
     hedit.add_argument('file', type=str, help='A file path or pattern (e.g., "*.fits")')
@@ -290,7 +292,7 @@ def main():
 
     args = parser.parse_args()
     if args.command == "header":
-        imhead(args.file)
+        imhead(args.file, index=args.index)
 
     elif args.command == "hedit":
         imhedit(args.file, args.key, args.value, args.comment, args.delete, args.value_is_key)
@@ -4,6 +4,8 @@ from PyQt5.QtWidgets import QMessageBox, QTreeWidgetItem, QDialog, QVBoxLayout,
 
 from myraflib import Fits
 
+from .runner import JobRunner
+
 SCHEMA = {"primary": "#F5AE71"}
 
 from PyQt5 import QtCore, QtWidgets, QtGui
@@ -533,4 +535,54 @@ class GUIFunctions:
             for i in range(top_level_item.childCount()):
                 child_item = top_level_item.child(i)
                 tree_widget.collapseItem(child_item)
-                tree_widget.expandItem(child_item)
\ No newline at end of file
+                tree_widget.expandItem(child_item)
+
+    def run_jobs(self, parent, caption, items, function, on_result=None, on_finished=None, workers=1):
+        progress = QtWidgets.QProgressDialog(caption, "Abort", 0, len(items), parent)
+
+        progress.setWindowModality(QtCore.Qt.WindowModal)
+        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
+        progress.setWindowTitle('MYRaf: Please Wait')
+        progress.setAutoClose(True)
+
+        runner = JobRunner(items, function, workers=workers, parent=parent)
+
+        def abort():
+            if not runner.is_cancelled():
+                progress.setLabelText("ABORT!")
+                runner.cancel()
+
+        def finish(failures):
+            progress.canceled.disconnect(abort)
+            progress.close()
+            if on_finished is not None:
+                on_finished(failures)
+
+            if failures > 0:
+                self.toast(f"There were problems with {failures} files.\nCheck logs.")
+
+        progress.canceled.connect(abort)
+        runner.started.connect(lambda _, name: progress.setLabelText(f"Operating on {name}"))
+        runner.progress.connect(progress.setValue)
+        runner.failed.connect(lambda _, error: self.logger.warning(error))
+        if on_result is not None:
+            runner.result.connect(on_result)
+        runner.finished.connect(finish)
+
+        runner.start()
+        return runner
+
+    def add_result_to_tree(self, group_layer, fits, stats):
+        group_layer.setFirstColumnSpanned(True)
+        file_name_layer = CustomQTreeWidgetItem(group_layer, [fits.file.name])
+        file_name_layer.setFirstColumnSpanned(True)
+
+        item = CustomQTreeWidgetItem(file_name_layer, ["Path", fits.file.resolve().parent.__str__()])
+        item.setFlags(QtCore.Qt.ItemIsEnabled)
+        for key, value in stats.iloc[0].items():
+            item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
+            item.setFlags(QtCore.Qt.ItemIsEnabled)
+
+    def remove_if_empty(self, tree_widget, group_layer):
+        if group_layer.childCount() == 0:
+            tree_widget.takeTopLevelItem(tree_widget.indexOfTopLevelItem(group_layer))
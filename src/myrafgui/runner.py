@@ -0,0 +1,162 @@
+from threading import Event
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+__all__ = ["JobRunner"]
+
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a `FileJob` from a worker thread. They are delivered
+    to the `JobRunner` on the UI thread through queued connections.
+    """
+    started = pyqtSignal(int, str)
+    result = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+    skipped = pyqtSignal(int)
+
+
+class FileJob(QRunnable):
+    """
+    Runs the operation on one file in a worker thread
+    """
+
+    def __init__(self, index, item, function, cancelled, signals):
+        super(FileJob, self).__init__()
+        self.index = index
+        self.item = item
+        self.function = function
+        self.cancelled = cancelled
+        self.signals = signals
+
+        self.setAutoDelete(True)
+
+    def run(self):
+        if self.cancelled.is_set():
+            self.signals.skipped.emit(self.index)
+            return
+
+        self.signals.started.emit(self.index, JobRunner.name_of(self.item))
+        try:
+            result = self.function(self.item)
+        except Exception as e:
+            self.signals.failed.emit(self.index, e)
+        else:
+            self.signals.result.emit(self.index, result)
+
+
+class JobRunner(QObject):
+    """
+    Runs an operation on each file of a `FitsArray` off the UI thread.
+
+    The files are handed to a `QThreadPool` with `workers` threads. The
+    result of each file is sent back with the `result` signal as soon as it
+    is available, so the UI can be updated while the rest are running.
+    `cancel` stops every file that has not started yet. `finished` is emitted
+    once with the number of failed files when all files are done or skipped.
+
+    Signals
+    -------
+    started(int, str)
+        index and name of the file being operated on
+    result(int, object)
+        index of the file and the value returned by the operation
+    failed(int, object)
+        index of the file and the exception raised by the operation
+    progress(int)
+        number of files done, failed or skipped so far
+    finished(int)
+        number of failed files
+    """
+    started = pyqtSignal(int, str)
+    result = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(int)
+
+    def __init__(self, items, function, workers=1, parent=None):
+        super(JobRunner, self).__init__(parent)
+        self.items = list(items)
+        self.function = function
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, int(workers)))
+
+        self.cancelled = Event()
+        self.done = 0
+        self.failures = 0
+
+        self.signals = JobSignals()
+        self.signals.started.connect(self.started)
+        self.signals.result.connect(self.__on_result)
+        self.signals.failed.connect(self.__on_failed)
+        self.signals.skipped.connect(self.__on_skipped)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(@: '{id(self)}', nof:'{len(self.items)}', " \
+               f"workers:'{self.pool.maxThreadCount()}')"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.items)
+
+    @staticmethod
+    def name_of(item):
+        """
+        Returns the file name of a `Fits` (or of the first element of a tuple)
+        or the string representation of any other item
+        """
+        if isinstance(item, tuple) and item:
+            item = item[0]
+
+        try:
+            return item.file.name
+        except AttributeError:
+            return str(item)
+
+    def start(self):
+        """
+        Submits all files to the thread pool
+        """
+        if not self.items:
+            QTimer.singleShot(0, lambda: self.finished.emit(0))
+            return
+
+        for index, item in enumerate(self.items):
+            self.pool.start(FileJob(index, item, self.function, self.cancelled, self.signals))
+
+    def cancel(self):
+        """
+        Skips every file that has not started yet. The files being operated
+        on are finished.
+        """
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+    def wait(self, msecs=-1):
+        """
+        Blocks until all jobs in the thread pool are done
+        """
+        return self.pool.waitForDone(msecs)
+
+    def __step(self):
+        self.done += 1
+        self.progress.emit(self.done)
+        if self.done == len(self.items):
+            self.finished.emit(self.failures)
+
+    def __on_result(self, index, value):
+        self.result.emit(index, value)
+        self.__step()
+
+    def __on_failed(self, index, error):
+        self.failures += 1
+        self.failed.emit(index, error)
+        self.__step()
+
+    def __on_skipped(self, _):
+        self.__step()
@@ -1,7 +1,7 @@
-from .fits import Fits
+from .fits import Fits, MemoryFits
 from .fitsarray import FitsArray
 
 __version__ = "0.0.1 Beta"
 __author__ = "Mohammad Niaei, Yücel Kılıç"
-__all__ = ["Fits", "FitsArray"]
+__all__ = ["Fits", "MemoryFits", "FitsArray"]
 __license__ = "GNU/GPL V3"
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+import astroalign
+import numpy as np
+from scipy.spatial import KDTree
+
+__all__ = ["Aligner"]
+
+_INTERNALS = [
+    "_find_sources", "_bw", "_generate_invariants", "_MatchTransform", "_ransac", "matrix_transform",
+    "PIXEL_TOL", "MIN_MATCHES_FRACTION"
+]
+
+
+class Aligner:
+    """
+    The control points, triangle invariants and invariant KD-tree of a
+    reference image. They are computed once and reused to find the
+    transformation of every image to be aligned to the same reference.
+
+    Notes
+    -----
+    `find_transform` follows `astroalign.find_transform` with the reference
+    as the target. If the astroalign internals used to match the triangles
+    are not available, the reference image is kept and passed to
+    `astroalign.find_transform` instead.
+    """
+
+    def __init__(self, reference: Any, max_control_points: int = 50, min_area: int = 5,
+                 detection_sigma: int = 5) -> None:
+        self.shape = reference.shape
+        self.max_control_points = max_control_points
+        self.min_area = min_area
+        self.detection_sigma = detection_sigma
+
+        self.internal = all(hasattr(astroalign, each) for each in _INTERNALS)
+
+        if not self.internal:
+            self.reference = reference
+            return
+
+        self.control_points = self.__sources(reference)
+        if len(self.control_points) < 3:
+            raise ValueError("Reference stars in target image are less than the minimum value (3).")
+
+        self.invariants, self.asterisms = astroalign._generate_invariants(self.control_points)
+        self.tree = KDTree(self.invariants)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', shape:'{self.shape}', internal:'{self.internal}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __sources(self, data: Any) -> Any:
+        """
+        Returns the brightest sources of the data as (x, y) pairs
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the image
+
+        Returns
+        -------
+        np.ndarray
+            the control points sorted by brightness
+        """
+        return astroalign._find_sources(
+            astroalign._bw(data), detection_sigma=self.detection_sigma, min_area=self.min_area
+        )[:self.max_control_points]
+
+    def find_transform(self, data: Any) -> Tuple[Any, Tuple[Any, Any]]:
+        """
+        Finds the transformation mapping the data onto the reference
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the image to be aligned
+
+        Returns
+        -------
+        Tuple[SimilarityTransform, Tuple[np.ndarray, np.ndarray]]
+            the transformation and the matching control points in the data
+            and the reference
+
+        Raises
+        ------
+        ValueError
+            when less than 3 sources are found in the data
+        MaxIterError
+            when no transformation is found
+        """
+        if not self.internal:
+            return astroalign.find_transform(
+                source=data, target=self.reference,
+                max_control_points=self.max_control_points, min_area=self.min_area,
+                detection_sigma=self.detection_sigma
+            )
+
+        source_controlp = self.__sources(data)
+        if len(source_controlp) < 3:
+            raise ValueError("Reference stars in source image are less than the minimum value (3).")
+
+        source_invariants, source_asterisms = astroalign._generate_invariants(source_controlp)
+        matches_list = KDTree(source_invariants).query_ball_tree(self.tree, r=0.1)
+
+        matches = np.array([
+            list(zip(t1, t2))
+            for t1, t2_list in zip(source_asterisms, matches_list)
+            for t2 in self.asterisms[t2_list]
+        ])
+
+        inv_model = astroalign._MatchTransform(source_controlp, self.control_points)
+        min_matches = max(1, min(10, int(len(matches) * astroalign.MIN_MATCHES_FRACTION)))
+        if (len(source_controlp) == 3 or len(self.control_points) == 3) and len(matches) == 1:
+            best_t = inv_model.fit(matches)
+            inlier_ind = np.arange(len(matches))
+        else:
+            best_t, inlier_ind = astroalign._ransac(matches, inv_model, astroalign.PIXEL_TOL, min_matches)
+
+        triangle_inliers = matches[inlier_ind]
+        d1, d2, d3 = triangle_inliers.shape
+        inl_unique = set(tuple(pair) for pair in triangle_inliers.reshape(d1 * d2, d3))
+
+        # Keep the pair with the lowest reprojection error for each source point
+        inl_dict: Dict[int, Tuple[int, float]] = {}
+        for s_i, t_i in inl_unique:
+            predicted = astroalign.matrix_transform(source_controlp[s_i], best_t.params)
+            error = float(np.linalg.norm(predicted - self.control_points[t_i]))
+            if s_i not in inl_dict or error < inl_dict[s_i][1]:
+                inl_dict[s_i] = (t_i, error)
+
+        s, d = np.array([[s_i, t_i] for s_i, (t_i, _) in inl_dict.items()]).T
+
+        return best_t, (source_controlp[s], self.control_points[d])
+
+    def apply_transform(self, transform: Any, data: Any) -> Any:
+        """
+        Applies the transformation to the data
+
+        Parameters
+        ----------
+        transform : SimilarityTransform
+            the transformation found by `find_transform`
+        data : np.ndarray
+            the image to be aligned
+
+        Returns
+        -------
+        np.ndarray
+            the aligned image with the shape of the reference
+        """
+        registered_image, _ = astroalign.apply_transform(
+            transform, data, np.broadcast_to(0.0, self.shape), 0, False
+        )
+        return registered_image
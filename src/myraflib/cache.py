@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+from astropy.io.fits.header import Header
+
+__all__ = ["DataCache"]
+
+
+class DataCache:
+    """
+    A least recently used cache of decoded fits data and headers shared by
+    all `Fits` objects.
+
+    Each entry is validated against the modification time and size of the
+    file it was read from. Entries are evicted, least recently used first,
+    when the total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2) -> None:
+        self.max_bytes = max_bytes
+
+        self._items: OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', nof:'{len(self)}', nbytes:'{self.nbytes}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @staticmethod
+    def signature(path: str) -> Tuple[int, int]:
+        """
+        Returns the modification time and size of the given file
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+
+        Returns
+        -------
+        Tuple[int, int]
+            modification time (ns) and size (bytes) of the file
+        """
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def size_of(value: Any) -> int:
+        """
+        Returns the approximate memory usage of a cached value
+
+        Parameters
+        ----------
+        value : Any
+            either an `np.ndarray` or a `Header`
+
+        Returns
+        -------
+        int
+            memory usage in bytes
+        """
+        if isinstance(value, Header):
+            return len(value) * 80
+
+        return int(getattr(value, "nbytes", 0))
+
+    def get(self, path: str, kind: str) -> Optional[Any]:
+        """
+        Returns the cached value or `None` if it is not cached or the file
+        has changed since it was cached
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        kind : str
+            kind of the cached value. e.g. `data` or `header`
+
+        Returns
+        -------
+        Any, optional
+            the cached value
+        """
+        key = (path, kind)
+        with self._lock:
+            if key not in self._items:
+                return None
+
+            signature, value, _ = self._items[key]
+            try:
+                current = self.signature(path)
+            except OSError:
+                current = None
+
+            if current != signature:
+                self._pop(key)
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, path: str, kind: str, value: Any) -> None:
+        """
+        Caches the given value and evicts the least recently used values if
+        the memory budget is exceeded
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        kind : str
+            kind of the cached value. e.g. `data` or `header`
+        value : Any
+            the value to be cached
+        """
+        key = (path, kind)
+        size = self.size_of(value)
+
+        with self._lock:
+            if key in self._items:
+                self._pop(key)
+
+            if size > self.max_bytes:
+                return
+
+            try:
+                signature = self.signature(path)
+            except OSError:
+                return
+
+            self._items[key] = (signature, value, size)
+            self._nbytes += size
+
+            while self._nbytes > self.max_bytes:
+                self._pop(next(iter(self._items)))
+
+    def invalidate(self, path: str) -> None:
+        """
+        Removes all cached values of the given file
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        """
+        with self._lock:
+            for key in [key for key in self._items if key[0] == path]:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """
+        Removes all cached values
+        """
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+    def _pop(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._items.pop(key)
+        self._nbytes -= size
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from logging import getLogger, Logger
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from .error import CardNotFound, NothingToDo
+
+if TYPE_CHECKING:
+    from .fits import Fits
+
+__all__ = ["Calibrator"]
+
+
+class Calibrator:
+    """
+    Master zero, dark and flat frames loaded once to calibrate many images.
+
+    The masters are read and validated (shape, dtype and exposure card of
+    the dark) once. The flat is normalized by its mean and the dark is scaled
+    per exposure ratio once. An image is then calibrated as
+    `(raw - zero - k * dark) / flat` in a single pass on one float array.
+
+    Raises
+    ------
+    NothingToDo
+        when none of master zero, dark, or flat is provided
+    ValueError
+        when the masters are not numeric or do not have the same shape
+    CardNotFound
+        when the exposure card is not in the header of the master dark
+    """
+
+    def __init__(self, master_zero: Optional[Fits] = None, master_dark: Optional[Fits] = None,
+                 master_flat: Optional[Fits] = None, exposure: Optional[str] = None,
+                 logger: Optional[Logger] = None) -> None:
+
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        if all(each is None for each in [master_zero, master_dark, master_flat]):
+            self.logger.error("None of master Zero, Dark, or Flat is not provided")
+            raise NothingToDo("None of master Zero, Dark, or Flat is not provided")
+
+        self.exposure = exposure
+
+        self.zero = self.__read(master_zero, "master_zero")
+        self.zero_name = None if master_zero is None else master_zero.file.name
+
+        self.dark = self.__read(master_dark, "master_dark")
+        self.dark_name = None if master_dark is None else master_dark.file.name
+        self.dark_exposure = 1.0
+        if master_dark is not None and exposure is not None:
+            dark_header = master_dark.pure_header()
+            if exposure not in dark_header:
+                self.logger.error(f"Key {exposure} not found in master_dark")
+                raise CardNotFound(f"Key {exposure} not found in master_dark")
+
+            self.dark_exposure = float(dark_header[exposure])
+
+        self.flat = self.__read(master_flat, "master_flat")
+        self.flat_name = None if master_flat is None else master_flat.file.name
+        if self.flat is not None:
+            self.flat /= self.flat.mean()
+
+        shapes = {each.shape for each in [self.zero, self.dark, self.flat] if each is not None}
+        if len(shapes) != 1:
+            self.logger.error(f"Master frames must have the same shape. Got {shapes}")
+            raise ValueError(f"Master frames must have the same shape. Got {shapes}")
+
+        self.shape = shapes.pop()
+
+        self._scaled_darks: Dict[float, Any] = {}
+
+    def __str__(self) -> str:
+        return (f"{self.__class__.__name__}(@: '{id(self)}', zero:'{self.zero_name}', "
+                f"dark:'{self.dark_name}', flat:'{self.flat_name}', shape:'{self.shape}')")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __read(self, master: Optional[Fits], name: str) -> Any:
+        """
+        Returns the data of a master frame as a float array
+
+        Parameters
+        ----------
+        master : Optional[Fits]
+            the master frame
+        name : str
+            name of the master to be used in the error message
+
+        Returns
+        -------
+        Optional[np.ndarray]
+            the data of the master or None if no master is given
+
+        Raises
+        ------
+        ValueError
+            when the data is not numeric or not 2D
+        """
+        if master is None:
+            return None
+
+        data = master.data()
+        if not np.issubdtype(data.dtype, np.number) or data.ndim != 2:
+            self.logger.error(f"{name} must be a 2D numeric image. Got {data.dtype} with {data.ndim} dimensions")
+            raise ValueError(f"{name} must be a 2D numeric image. Got {data.dtype} with {data.ndim} dimensions")
+
+        return np.array(data, dtype=float)
+
+    def scaled_dark(self, exposure: float = 1.0) -> Any:
+        """
+        Returns the dark scaled to the given exposure time
+
+        Parameters
+        ----------
+        exposure : float, default=1.0
+            exposure time of the image
+
+        Returns
+        -------
+        np.ndarray
+            the scaled dark
+        """
+        ratio = exposure / self.dark_exposure
+        if ratio not in self._scaled_darks:
+            self._scaled_darks[ratio] = self.dark * ratio
+
+        return self._scaled_darks[ratio]
+
+    def apply(self, data: Any, exposure: float = 1.0, zero: bool = True,
+              dark: bool = True, flat: bool = True) -> Any:
+        """
+        Calibrates the data
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the raw data
+        exposure : float, default=1.0
+            exposure time of the image. Used to scale the dark
+        zero : bool, default=True
+            subtract the zero if available
+        dark : bool, default=True
+            subtract the dark if available
+        flat : bool, default=True
+            divide by the flat if available
+
+        Returns
+        -------
+        np.ndarray
+            the calibrated data
+
+        Raises
+        ------
+        ValueError
+            when the shape of the data differs from the masters
+        """
+        if data.shape != self.shape:
+            self.logger.error(f"Data shape {data.shape} does not match the masters {self.shape}")
+            raise ValueError(f"Data shape {data.shape} does not match the masters {self.shape}")
+
+        calibrated = np.array(data, dtype=float)
+
+        if zero and self.zero is not None:
+            np.subtract(calibrated, self.zero, out=calibrated)
+
+        if dark and self.dark is not None:
+            np.subtract(calibrated, self.scaled_dark(exposure), out=calibrated)
+
+        if flat and self.flat is not None:
+            np.divide(calibrated, self.flat, out=calibrated)
+
+        return calibrated
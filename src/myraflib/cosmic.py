@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger, Logger
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from ccdproc import cosmicray_lacosmic
+from scipy.ndimage import maximum_filter, minimum_filter
+
+from .utils import Fixer
+
+__all__ = ["CosmicCleaner"]
+
+# Radius of the saturation mask: a 7 wide separable median followed by two
+# iterations of a 5x5 dilation
+MASK_RADIUS = 3 + 2 * 2
+
+
+def clean_tile(data: Any, core: Tuple[int, int, int, int], kwargs: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    Cleans one tile and returns its core
+
+    Parameters
+    ----------
+    data : np.ndarray
+        the tile with its halo
+    core : Tuple[int, int, int, int]
+        `(y0, y1, x0, x1)` of the core relative to the tile
+    kwargs : Dict[str, Any]
+        keyword arguments of `cosmicray_lacosmic`
+
+    Returns
+    -------
+    Tuple[np.ndarray, bool]
+        the cleaned core and whether a cosmic ray pixel in the core had no
+        good neighbour. Such pixels are replaced with the median of the whole
+        image, which a tile cannot know.
+    """
+    cleaned, crmask = cosmicray_lacosmic(data, **kwargs)
+
+    y0, y1, x0, x1 = core
+    saturated = np.asarray(data) * kwargs["gain"] >= kwargs["satlevel"]
+    if saturated.any():
+        saturated = maximum_filter(saturated, size=2 * MASK_RADIUS + 1)
+
+    surrounded = minimum_filter(crmask | saturated, size=5, mode="constant", cval=False)
+
+    return cleaned[y0:y1, x0:x1], bool((surrounded & crmask)[y0:y1, x0:x1].any())
+
+
+class CosmicCleaner:
+    """
+    L.A.Cosmic (`ccdproc.cosmicray_lacosmic`) run on overlapping tiles.
+
+    Each tile carries a halo wide enough for every filter of every iteration,
+    so the core of each tile is cleaned exactly as it would be in the whole
+    image. The tiles are cleaned in `workers` processes and their cores are
+    stitched back together.
+
+    Notes
+    -----
+    - A cosmic ray pixel with no good pixel in its 5x5 neighbourhood is
+      replaced with the median of the whole image. If any tile runs into
+      such a pixel the whole image is cleaned at once instead.
+    - The `median` clean type is not local (a cleaned pixel changes again in
+      each iteration), so it is always run on the whole image.
+    """
+
+    def __init__(self, tile_size: int = 1024, workers: int = 1, logger: Optional[Logger] = None,
+                 **kwargs: Any) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.tile_size = tile_size
+        self.workers = workers
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return (f"{self.__class__.__name__}(@: '{id(self)}', tile_size:'{self.tile_size}', "
+                f"halo:'{self.halo}', workers:'{self.workers}')")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def halo(self) -> int:
+        """
+        Returns the number of pixels a cleaned pixel depends on in each
+        direction
+
+        Notes
+        -----
+        In each iteration the Laplacian (1) is divided by the noise (a 7 wide
+        median, 3) and its 7 wide median is subtracted (3). The fine structure
+        image is a 5 wide median (2) minus its 9 wide median (4). The
+        detections are dilated twice (2) and cleaned with a 5x5 filter (2).
+
+        Returns
+        -------
+        int
+            width of the halo
+        """
+        niter = self.kwargs.get("niter", 4)
+        sepmed = self.kwargs.get("sepmed", True)
+        fsmode = self.kwargs.get("fsmode", "median")
+
+        laplacian = 1 + 2 * (3 if sepmed else 2)
+        if fsmode == "convolve":
+            psfk = self.kwargs.get("psfk")
+            kernel = max(psfk.shape) // 2 if psfk is not None else self.kwargs.get("psfsize", 7) // 2
+        else:
+            kernel = 2 if sepmed else 1
+
+        fine_structure = kernel + (4 if sepmed else 3)
+
+        return niter * (max(laplacian, fine_structure) + 2 + 2) + MASK_RADIUS + 2
+
+    def clean(self, data: Any) -> Any:
+        """
+        Cleans the cosmic rays of the data
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the image
+
+        Returns
+        -------
+        np.ndarray
+            the cleaned image
+        """
+        if self.kwargs.get("cleantype", "meanmask") == "median":
+            self.logger.info("The median clean type is not tiled. Cleaning the whole image")
+            return cosmicray_lacosmic(data, **self.kwargs)[0]
+
+        halo = self.halo
+        tiles = Fixer.tiles(data.shape[0], data.shape[1], self.tile_size, halo)
+        if len(tiles) == 1:
+            return cosmicray_lacosmic(data, **self.kwargs)[0]
+
+        arguments = [
+            (
+                np.ascontiguousarray(data[ty0:ty1, tx0:tx1]),
+                (cy0 - ty0, cy1 - ty0, cx0 - tx0, cx1 - tx0)
+            )
+            for (ty0, ty1, tx0, tx1), (cy0, cy1, cx0, cx1) in tiles
+        ]
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(clean_tile, tile, core, self.kwargs) for tile, core in arguments]
+                results = [future.result() for future in futures]
+        else:
+            results = [clean_tile(tile, core, self.kwargs) for tile, core in arguments]
+
+        if any(surrounded for _, surrounded in results):
+            self.logger.info("A cosmic ray has no good neighbour. Cleaning the whole image")
+            return cosmicray_lacosmic(data, **self.kwargs)[0]
+
+        cleaned = np.empty(data.shape, dtype=results[0][0].dtype)
+        for (_, (cy0, cy1, cx0, cx1)), (core, _) in zip(tiles, results):
+            cleaned[cy0:cy1, cx0:cx1] = core
+
+        return cleaned
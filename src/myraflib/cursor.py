@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from logging import getLogger, Logger
+from typing import Any, Optional, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .fits import Fits
+
+__all__ = ["CursorInfo"]
+
+
+class CursorInfo:
+    """
+    Sky coordinates and values of the pixels of one frame, answered from
+    memory.
+
+    The `WCS` of the frame is decoded once, on the first lookup after
+    `load`. Each `lookup` is then a single call to the low level
+    `WCS.all_pix2world`, without creating any `SkyCoord` or `DataFrame`.
+
+    The value of a pixel is an array index if the data of the frame is
+    given to `load` (e.g. the data already read for display). Otherwise
+    only the asked pixel is read from the file by `Fits.value`, so a large
+    frame (e.g. one shown from its pyramid) is never read whole.
+    """
+
+    def __init__(self, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.fits: Optional[Fits] = None
+        self.data: Optional[Any] = None
+        self.wcs: Optional[Any] = None
+        self.axes: Tuple[int, int] = (0, 1)
+        self.__resolved = False
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', fits:'{self.fits}', solved:'{self.wcs is not None}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def load(self, fits: Fits, data: Optional[Any] = None) -> None:
+        """
+        Sets the frame. Its data and `WCS` are decoded on the first lookup
+        and kept until another frame is set
+
+        Parameters
+        ----------
+        fits : Fits
+            the frame
+        data : np.ndarray, optional
+            the data of the frame if it's already read (e.g. for display).
+            The pixels are read one by one from the file if it's `None`
+        """
+        if data is not None:
+            self.data = data
+        elif fits is not self.fits:
+            self.data = None
+
+        self.fits = fits
+        self.wcs = None
+        self.__resolved = False
+
+    def __frame_wcs(self) -> Optional[Any]:
+        if self.__resolved or self.fits is None:
+            return self.wcs
+
+        self.__resolved = True
+        try:
+            w = self.fits.wcs()
+        except Exception as e:
+            self.logger.info(f"Could not read the WCS. {e}")
+            return None
+
+        if w.has_celestial:
+            self.wcs = w
+            self.axes = (w.wcs.lng, w.wcs.lat)
+
+        return self.wcs
+
+    def value(self, x: int, y: int) -> Optional[Union[int, float]]:
+        """
+        Returns the value of the pixel
+
+        Parameters
+        ----------
+        x : int
+            x coordinate (column) of the pixel
+        y : int
+            y coordinate (row) of the pixel
+
+        Returns
+        -------
+        Union[int, float], optional
+            the value. `None` if no frame is loaded or the pixel is out of
+            the frame
+        """
+        if self.data is not None:
+            if not (0 <= y < self.data.shape[0] and 0 <= x < self.data.shape[1]):
+                return None
+
+            return self.data[y, x].item()
+
+        if self.fits is None or x < 0 or y < 0:
+            return None
+
+        try:
+            # The first axis of `Fits.value` is the row
+            return self.fits.value(y, x)
+        except IndexError:
+            return None
+
+    def sky(self, x: float, y: float) -> Optional[Tuple[float, float]]:
+        """
+        Returns the sky coordinates of the pixel
+
+        Parameters
+        ----------
+        x : float
+            x coordinate of the pixel (0 based)
+        y : float
+            y coordinate of the pixel (0 based)
+
+        Returns
+        -------
+        Tuple[float, float], optional
+            longitude (ra) and latitude (dec) in degrees. `None` if the frame
+            is not solved
+        """
+        w = self.__frame_wcs()
+        if w is None:
+            return None
+
+        try:
+            world = w.all_pix2world(np.array([[x, y]], dtype=float), 0)[0]
+        except Exception as e:
+            self.logger.info(f"Could not get ra, dec. {e}")
+            return None
+
+        lng, lat = world[self.axes[0]], world[self.axes[1]]
+        if np.isnan(lng) or np.isnan(lat):
+            return None
+
+        return float(lng), float(lat)
+
+    def lookup(self, x: int, y: int) -> Tuple[Optional[float], Optional[float], Optional[Union[int, float]]]:
+        """
+        Returns the sky coordinates and the value of the pixel
+
+        Parameters
+        ----------
+        x : int
+            x coordinate (column) of the pixel
+        y : int
+            y coordinate (row) of the pixel
+
+        Returns
+        -------
+        Tuple[Optional[float], Optional[float], Optional[Union[int, float]]]
+            ra, dec (degrees) and the value. Each is `None` if it's not
+            available
+        """
+        sky = self.sky(x, y)
+        ra, dec = (None, None) if sky is None else sky
+
+        return ra, dec, self.value(x, y)
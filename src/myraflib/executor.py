@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from logging import getLogger, Logger
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["Job", "SerialJob", "FutureJob", "WorkerPool", "Shared", "submit_all"]
+
+# Objects shipped once to a worker process by the initializer of its pool
+_SHARED: Tuple[Any, ...] = ()
+
+
+class Shared:
+    """
+    A placeholder sent with each job in place of an object already shipped
+    to the worker process.
+    """
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', index:'{self.index}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def set_shared(values: Tuple[Any, ...]) -> None:
+    """
+    Keeps the objects shipped to a worker process. Used as the initializer
+    of the pool
+
+    Parameters
+    ----------
+    values : Tuple[Any, ...]
+        the shared objects
+    """
+    global _SHARED
+    _SHARED = values
+
+
+def resolve(value: Any) -> Any:
+    """
+    Returns the shared object of a `Shared` placeholder or the value itself
+
+    Parameters
+    ----------
+    value : Any
+        an argument of a job
+
+    Returns
+    -------
+    Any
+        the argument to pass to the method
+    """
+    if isinstance(value, Shared):
+        return _SHARED[value.index]
+
+    return value
+
+
+def call_method(obj: Any, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    Calls `method` of `obj` and hands the ownership of a temporary result
+    back to the caller
+
+    Notes
+    -----
+    A temporary `Fits` deletes its file when it is garbage collected. When the
+    call runs in another process the object created there would delete the
+    file as soon as it is returned. So the flag is cleared here and restored
+    by the `Job` in the calling process.
+
+    Parameters
+    ----------
+    obj : Any
+        the object of which the method would be called
+    method : str
+        name of the method
+    args : Tuple[Any, ...]
+        positional arguments of the method
+    kwargs : Dict[str, Any]
+        keyword arguments of the method
+
+    Returns
+    -------
+    Tuple[Any, bool]
+        the result and whether the result was a temporary file
+    """
+    args = tuple(resolve(each) for each in args)
+    kwargs = {key: resolve(value) for key, value in kwargs.items()}
+    result = getattr(obj, method)(*args, **kwargs)
+
+    is_temp = bool(getattr(result, "is_temp", False))
+    if is_temp:
+        result.is_temp = False
+
+    return result, is_temp
+
+
+class Job(ABC):
+    """
+    A unit of per-file work. `result` returns the value or raises the
+    exception of the call.
+    """
+
+    @abstractmethod
+    def result(self) -> Any:
+        ...
+
+
+class SerialJob(Job):
+    """
+    A job that is run only when its result is asked.
+    """
+
+    def __init__(self, obj: Any, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        self.obj = obj
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def result(self) -> Any:
+        return getattr(self.obj, self.method)(*self.args, **self.kwargs)
+
+
+class FutureJob(Job):
+    """
+    A job submitted to an executor.
+    """
+
+    def __init__(self, future: Future) -> None:
+        self.future = future
+
+    def result(self) -> Any:
+        result, is_temp = self.future.result()
+        if is_temp:
+            result.is_temp = True
+
+        return result
+
+
+class WorkerPool(Executor):
+    """
+    A pool of `workers` processes started on the first submission and reused
+    by every later batch until it is shut down.
+
+    After `shutdown` the next submission starts a new pool, so shutting down
+    only releases the processes.
+
+    Objects given to `share` are pickled once per worker process by the
+    initializer of the pool instead of once per job. Sharing other objects
+    than the current ones restarts the pool.
+    """
+
+    def __init__(self, workers: int, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        if workers < 1:
+            self.logger.error("workers must be positive")
+            raise ValueError("workers must be positive")
+
+        self.workers = workers
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._shared: Tuple[Any, ...] = ()
+        self._lock = Lock()
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', workers:'{self.workers}', running:'{self.running}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __del__(self) -> None:
+        self.shutdown(wait=False)
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def share(self, values: Tuple[Any, ...]) -> None:
+        """
+        Ships the objects to the worker processes
+
+        Parameters
+        ----------
+        values : Tuple[Any, ...]
+            the objects. A job refers to the i-th object by `Shared(i)`
+        """
+        with self._lock:
+            if len(values) == len(self._shared) and all(a is b for a, b in zip(values, self._shared)):
+                return
+
+            pool, self._pool = self._pool, None
+            self._shared = tuple(values)
+
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._pool is None:
+                self.logger.info(f"Starting {self.workers} worker processes")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=set_shared, initargs=(self._shared,)
+                )
+
+            return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def submit_all(objects: Iterable[Any], method: str, arguments: Iterable[Tuple[Any, ...]],
+               kwargs: Dict[str, Any], executor: Optional[Executor] = None,
+               shared: Tuple[Any, ...] = ()) -> List[Job]:
+    """
+    Creates a job for each object
+
+    Notes
+    -----
+    - If an `executor` is given the jobs are submitted to it.
+    - Otherwise, the jobs are run serially as their results are asked.
+    - If the executor is a `WorkerPool` the `shared` objects found in the
+      arguments are shipped once per worker process and replaced by `Shared`
+      placeholders in each job. Other executors get them with every job.
+
+    Parameters
+    ----------
+    objects : Iterable[Any]
+        objects of which the method would be called
+    method : str
+        name of the method
+    arguments : Iterable[Tuple[Any, ...]]
+        positional arguments for each object
+    kwargs : Dict[str, Any]
+        keyword arguments shared by all calls
+    executor : Executor, optional
+        the executor to submit the jobs to
+    shared : Tuple[Any, ...], default=()
+        big objects used by all calls (e.g. an `Aligner` or a `Calibrator`)
+
+    Returns
+    -------
+    List[Job]
+        the jobs in the order of `objects`
+    """
+    pairs = list(zip(objects, arguments))
+
+    if executor is None:
+        return [SerialJob(obj, method, args, kwargs) for obj, args in pairs]
+
+    if isinstance(executor, WorkerPool) and shared:
+        executor.share(shared)
+        placeholders = {id(each): Shared(index) for index, each in enumerate(shared)}
+        pairs = [(obj, tuple(placeholders.get(id(each), each) for each in args)) for obj, args in pairs]
+        kwargs = {key: placeholders.get(id(value), value) for key, value in kwargs.items()}
+
+    return [FutureJob(executor.submit(call_method, obj, method, args, kwargs)) for obj, args in pairs]
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import operator
+from logging import getLogger, Logger
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+from .error import NumberOfElementError
+from .utils import Fixer
+
+if TYPE_CHECKING:
+    from .fits import Fits
+    from .fitsarray import FitsArray
+
+__all__ = ["Expression"]
+
+# Number of pixels evaluated at once. Small enough for the block temporaries
+# to stay in the CPU cache
+BLOCK_SIZE = 2 ** 16
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "**": operator.pow,
+}
+
+
+class Expression:
+    """
+    A lazily evaluated arithmetic expression of `Fits`, `FitsArray` and
+    numeric operands.
+
+    Operators on an `Expression` only build the expression graph. Nothing is
+    read or written until `compute`, `save_as` or `data` is called. Then the
+    whole expression is evaluated in a single pass over blocks of rows: each
+    image is read once, block by block, through `Fits.view`, and only block
+    sized temporaries are allocated. Identical subexpressions (and operands)
+    are evaluated once per block.
+
+    An expression with a `FitsArray` (or a list of `Fits` or numbers) operand
+    is evaluated once per file and results in a `FitsArray`. Otherwise it
+    results in a `Fits`.
+    """
+
+    def __init__(self, operand: Optional[str], *operands: Any, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.operand = operand
+        self.operands: Tuple[Any, ...] = operands
+
+        if operand is None:
+            self.key: Tuple[Any, ...] = ("value", self.__leaf_key(operands[0]))
+        else:
+            self.key = (operand,) + tuple(each.key for each in operands)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', expression:'{self.expression()}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @staticmethod
+    def __leaf_key(value: Any) -> Any:
+        if isinstance(value, (float, int)):
+            return float(value)
+
+        return id(value)
+
+    @classmethod
+    def wrap(cls, value: Any, logger: Optional[Logger] = None) -> Expression:
+        """
+        Returns the value as an expression
+
+        Parameters
+        ----------
+        value : Union[Expression, Fits, FitsArray, float, int, List[Union[Fits, float, int]]]
+            the operand
+
+        Returns
+        -------
+        Expression
+            the value itself if it's an `Expression`, a leaf otherwise
+
+        Raises
+        ------
+        NotImplementedError
+            when the value is not one of the supported types
+        """
+        from .fits import Fits
+        from .fitsarray import FitsArray
+
+        if isinstance(value, Expression):
+            return value
+
+        if not isinstance(value, (Fits, FitsArray, float, int, list)):
+            (getLogger(cls.__name__) if logger is None else logger).error(
+                "Other must be either Expression, Fits, FitsArray, list, float or int"
+            )
+            raise NotImplementedError
+
+        return cls(None, value, logger=logger)
+
+    def __binary(self, operand: str, other: Any, reflected: bool = False) -> Expression:
+        other = self.wrap(other, logger=self.logger)
+        if reflected:
+            return self.__class__(operand, other, self, logger=self.logger)
+
+        return self.__class__(operand, self, other, logger=self.logger)
+
+    def __add__(self, other: Any) -> Expression:
+        return self.__binary("+", other)
+
+    def __radd__(self, other: Any) -> Expression:
+        return self.__binary("+", other, reflected=True)
+
+    def __sub__(self, other: Any) -> Expression:
+        return self.__binary("-", other)
+
+    def __rsub__(self, other: Any) -> Expression:
+        return self.__binary("-", other, reflected=True)
+
+    def __mul__(self, other: Any) -> Expression:
+        return self.__binary("*", other)
+
+    def __rmul__(self, other: Any) -> Expression:
+        return self.__binary("*", other, reflected=True)
+
+    def __truediv__(self, other: Any) -> Expression:
+        return self.__binary("/", other)
+
+    def __rtruediv__(self, other: Any) -> Expression:
+        return self.__binary("/", other, reflected=True)
+
+    def __pow__(self, other: Any) -> Expression:
+        return self.__binary("**", other)
+
+    def __rpow__(self, other: Any) -> Expression:
+        return self.__binary("**", other, reflected=True)
+
+    def __neg__(self) -> Expression:
+        return self.__binary("*", -1, reflected=True)
+
+    def expression(self) -> str:
+        """
+        Returns the expression as a string
+
+        Returns
+        -------
+        str
+            the expression with file names and numbers as operands
+        """
+        if self.operand is not None:
+            return "(" + f" {self.operand} ".join(each.expression() for each in self.operands) + ")"
+
+        value = self.operands[0]
+        if isinstance(value, (float, int)):
+            return str(value)
+
+        if isinstance(value, list):
+            return f"[{len(value)} values]"
+
+        try:
+            return value.file.name
+        except AttributeError:
+            return f"{value.__class__.__name__}[{len(value)}]"
+
+    def leaves(self) -> List[Expression]:
+        """
+        Returns the distinct operands of the expression from left to right
+
+        Returns
+        -------
+        List[Expression]
+            the leaves
+        """
+        if self.operand is None:
+            return [self]
+
+        leaves: Dict[Tuple[Any, ...], Expression] = {}
+        for each in self.operands:
+            for leaf in each.leaves():
+                leaves.setdefault(leaf.key, leaf)
+
+        return list(leaves.values())
+
+    def __length(self) -> Optional[int]:
+        """
+        Returns the number of files the expression is evaluated for. `None`
+        if no operand is a `FitsArray` or a list
+
+        Raises
+        ------
+        NumberOfElementError
+            when the `FitsArray` and list operands have different lengths
+        """
+        from .fits import Fits
+
+        lengths = {
+            len(leaf.operands[0]) for leaf in self.leaves()
+            if not isinstance(leaf.operands[0], (Fits, float, int))
+        }
+
+        if len(lengths) > 1:
+            self.logger.error("All FitsArray and list operands must have the same length")
+            raise NumberOfElementError("All FitsArray and list operands must have the same length")
+
+        return lengths.pop() if lengths else None
+
+    def __bind(self, index: Optional[int]) -> Dict[Tuple[Any, ...], Any]:
+        """
+        Returns the value of each leaf for the file at `index`: a read-only
+        view of the data for a `Fits`, the number for a numeric operand
+
+        Raises
+        ------
+        ValueError
+            when an operand is not a `Fits` or a number
+        """
+        from .fits import Fits
+
+        values = {}
+        for leaf in self.leaves():
+            value = leaf.operands[0]
+            if index is not None and not isinstance(value, (Fits, float, int)):
+                value = value[index]
+
+            if isinstance(value, Fits):
+                values[leaf.key] = value.view()
+            elif isinstance(value, (float, int)):
+                values[leaf.key] = float(value)
+            else:
+                self.logger.error(f"Please provide either a Fits Object or a numeric value. Got {value}")
+                raise ValueError(f"Please provide either a Fits Object or a numeric value. Got {value}")
+
+        return values
+
+    def __first(self, index: Optional[int]) -> Fits:
+        """
+        Returns the left most `Fits` operand. Its header and class are used
+        for the result, as in `Fits.add`
+        """
+        from .fits import Fits
+
+        for leaf in self.leaves():
+            value = leaf.operands[0]
+            if index is not None and not isinstance(value, (Fits, float, int)):
+                value = value[index]
+
+            if isinstance(value, Fits):
+                return value
+
+        self.logger.error("The expression has no Fits operand")
+        raise ValueError("The expression has no Fits operand")
+
+    def __block(self, values: Dict[Tuple[Any, ...], Any], block: slice,
+                memo: Dict[Tuple[Any, ...], Any]) -> Any:
+        if self.key in memo:
+            return memo[self.key]
+
+        if self.operand is None:
+            value = values[self.key]
+            result = value if isinstance(value, float) else np.asarray(value[block], dtype=float)
+        else:
+            left, right = (each.__block(values, block, memo) for each in self.operands)
+            result = OPERATORS[self.operand](left, right)
+
+        memo[self.key] = result
+        return result
+
+    def __evaluate(self, index: Optional[int]) -> Any:
+        """
+        Evaluates the expression for the file at `index` block by block
+
+        Raises
+        ------
+        ValueError
+            when the images do not have the same shape
+        """
+        values = self.__bind(index)
+
+        shapes = {value.shape for value in values.values() if not isinstance(value, float)}
+        if len(shapes) != 1:
+            self.logger.error(f"All images must have the same shape. Got {shapes}")
+            raise ValueError(f"All images must have the same shape. Got {shapes}")
+
+        shape = shapes.pop()
+        result = np.empty(shape, dtype=float)
+
+        row_size = max(1, int(np.prod(shape[1:])))
+        rows = max(1, BLOCK_SIZE // row_size)
+        for start in range(0, shape[0], rows):
+            block = slice(start, start + rows)
+            result[block] = self.__block(values, block, {})
+
+        return result
+
+    def data(self) -> Union[Any, List[Any]]:
+        """
+        Evaluates the expression without writing it to a file
+
+        Returns
+        -------
+        Union[np.ndarray, List[np.ndarray]]
+            the result, or the list of results if the expression has a
+            `FitsArray` or a list operand
+        """
+        self.logger.info("Evaluating expression")
+
+        length = self.__length()
+        if length is None:
+            return self.__evaluate(None)
+
+        return [self.__evaluate(index) for index in range(length)]
+
+    def compute(self, output: Optional[str] = None, override: bool = False) -> Union[Fits, FitsArray]:
+        """
+        Evaluates the expression and writes the result
+
+        Parameters
+        ----------
+        output : str, optional
+            path of the new file. Or the directory of the new files if the
+            expression has a `FitsArray` operand. Temporary files are created
+            if it's `None`
+        override : bool, default=False
+            If True will overwrite the output if a file is already exists.
+
+        Returns
+        -------
+        Union[Fits, FitsArray]
+            the result as `Fits`, or as `FitsArray` if the expression has a
+            `FitsArray` or a list operand
+
+        Raises
+        ------
+        NumberOfElementError
+            when the `FitsArray` and list operands have different lengths
+        ValueError
+            when the images do not have the same shape
+        FileExistsError
+            when the file does exist and `override` is `False`
+        """
+        from .fitsarray import FitsArray
+
+        self.logger.info("Evaluating expression")
+
+        length = self.__length()
+        if length is None:
+            first = self.__first(None)
+            return first.__class__.from_data_header(
+                self.__evaluate(None), header=first.pure_header(), output=output, override=override
+            )
+
+        arrays = [leaf.operands[0] for leaf in self.leaves() if isinstance(leaf.operands[0], FitsArray)]
+        template = arrays[0] if arrays else None
+
+        outputs = Fixer.outputs(output, template) if template is not None else [None] * length
+
+        results = []
+        for index, each_output in enumerate(outputs):
+            try:
+                first = self.__first(index)
+                results.append(first.__class__.from_data_header(
+                    self.__evaluate(index), header=first.pure_header(), output=each_output, override=override
+                ))
+            except Exception as error:
+                self.logger.error(f"Could not evaluate the expression for the file {index}: {error}")
+                raise
+
+        if template is None:
+            return FitsArray(results, logger=self.logger)
+
+        return template.__class__(results, logger=template.logger, verbose=template.verbose,
+                                  workers=template.workers, executor=template.executor, index=template.index)
+
+    def save_as(self, output: str, override: bool = False) -> Union[Fits, FitsArray]:
+        """
+        Evaluates the expression and writes the result to `output`
+
+        Parameters
+        ----------
+        output : str
+            path of the new file. Or the directory of the new files if the
+            expression has a `FitsArray` operand
+        override : bool, default=False
+            If True will overwrite the output if a file is already exists.
+
+        Returns
+        -------
+        Union[Fits, FitsArray]
+            the result
+        """
+        return self.compute(output=output, override=override)
@@ -2,21 +2,20 @@ from __future__ import annotations
 
 import math
 import shutil
+from contextlib import contextmanager
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import Optional, Union, List, Any, Tuple, Callable, Dict
+from typing import Optional, Union, List, Any, Tuple, Callable, Dict, Iterator
 
-import astroalign
 import cv2
 import numpy as np
 import pandas as pd
 from astropy import units
-from astropy.coordinates import SkyCoord
+from astropy.coordinates import SkyCoord, concatenate
 from astropy.io import fits as fts
 from astropy.io.fits.header import Header
 from astropy.nddata import CCDData, block_reduce
 from astropy.stats import sigma_clipped_stats
-from astropy.visualization import ZScaleInterval
 from astropy.wcs import WCS
 from astropy.wcs.utils import fit_wcs_from_points
 from astroquery.astrometry_net import AstrometryNet
@@ -26,25 +25,39 @@ from matplotlib import pyplot as plt
 from mpl_point_clicker import clicker
 from photutils.aperture import CircularAperture, aperture_photometry
 from photutils.detection import DAOStarFinder
-from photutils.utils import calc_total_error
 from scipy import ndimage
 from sep import extract as sep_extract, Background, sum_circle
 from typing_extensions import Self
 
+from .aligner import Aligner
+from .cache import DataCache
+from .calibration import Calibrator
+from .cosmic import CosmicCleaner
+from .expression import Expression
 from .error import NothingToDo, AlignError, NumberOfElementError, OverCorrection, CardNotFound, Unsolvable
 from .models import Data, NUMERICS
-from .utils import Fixer, Check
+from .photometry import PhotometryContext, PHOTOMETRY_DTYPE
+from .pyramid import Pyramid
+from .utils import Fixer, Check, RawHeader
+from .wcs_transform import WCSTransform
+from .zscale import ZScale
 
-__all__ = ["Fits"]
+__all__ = ["Fits", "MemoryFits"]
 
 
 class Fits(Data):
+    use_cache = False
+    lazy_arithmetic = False
+    cache = DataCache()
+    zscaler = ZScale()
+
     def __init__(self, file: Path, logger: Optional[Logger] = None) -> None:
 
         self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
 
         self.is_temp = False
         self.file = file
+        self._wcs: Optional[Tuple[Any, WCS]] = None
 
         if not file.exists():
             self.logger.error(f"The File ({self.file}) does not exist.")
@@ -62,71 +75,126 @@ class Fits(Data):
     def __del__(self) -> None:
         if self.is_temp:
             self.logger.info("Deleting the temporary file")
+            self.cache.invalidate(abs(self))
             self.file.unlink()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # A pickled copy (e.g. sent to a worker process) must not delete the file
+        state = self.__dict__.copy()
+        state["is_temp"] = False
+        return state
+
     def __abs__(self) -> str:
         return str(self.file.absolute())
 
-    def __add__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __add__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() + other
+
         return self.add(other)
 
-    def __radd__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __radd__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other + self.lazy()
+
         return self.add(other)
 
-    def __sub__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __sub__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() - other
+
         return self.sub(other)
 
-    def __rsub__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __rsub__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other - self.lazy()
+
         return self.mul(-1).add(other)
 
-    def __mul__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __mul__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() * other
+
         return self.mul(other)
 
-    def __rmul__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __rmul__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other * self.lazy()
+
         return self.mul(other)
 
-    def __truediv__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __truediv__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() / other
+
         return self.div(other)
 
-    def __rtruediv__(self, other: Union[Self, float, int]) -> Self:
-        if not isinstance(other, (self.__class__, float, int)):
+    def __rtruediv__(self, other: Union[Self, float, int]) -> Union[Fits, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
+        if not isinstance(other, (Fits, float, int)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other / self.lazy()
+
         return self.div(other).pow(-1)
 
-    def flux_to_mag(self, flux: Union[int, float],
-                    flux_error: Union[int, float],
+    def flux_to_mag(self, flux: Union[int, float, Any],
+                    flux_error: Union[int, float, Any],
                     exptime: Union[int, float]
-                    ) -> Tuple[Union[int, float], Union[int, float]]:
+                    ) -> Tuple[Union[int, float, Any], Union[int, float, Any]]:
         r"""
         Converts flux and flux error to magnitude and magnitude error
 
@@ -142,43 +210,44 @@ class Fits(Data):
 
         Where :math:`f` is flux, :math:`t_e` is exposure time, and :math:`f_e` is flux error.
 
+        `flux` and `flux_error` can also be arrays. Then magnitudes and
+        magnitude errors are returned as arrays.
+
         Parameters
         ----------
-        flux : Union[int, float]
+        flux : Union[int, float, np.ndarray]
             measured flux
-        flux_error : Union[int, float]
+        flux_error : Union[int, float, np.ndarray]
             measured flux error
         exptime : Union[int, float]
             exposure time
 
         Returns
         -------
-        Tuple[Union[int, float], Union[int, float]]
+        Tuple[Union[int, float, np.ndarray], Union[int, float, np.ndarray]]
             calculated magnitude and magnitude error.
-
-        Raises
-        ------
-        ZeroDivisionError
-            when the `flux` is `0`
         """
         self.logger.info("Calculating Flux to Magnitude")
 
-        mag = -2.5 * np.log10(flux)
-        if exptime != 0:
-            mag += 2.5 * np.log10(exptime)
+        flux = np.asarray(flux, dtype=float)
+        flux_error = np.asarray(flux_error, dtype=float)
 
-        if flux_error <= 0:
-            mag_err = 0.0
-        else:
-            mag_err = 1.0857 * flux_error / flux
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mag = -2.5 * np.log10(flux)
+            if exptime != 0:
+                mag += 2.5 * np.log10(exptime)
+
+            mag_err = np.where(flux_error <= 0, 0.0, 1.0857 * flux_error / flux)
 
-        if np.isinf(mag_err):
-            mag_err = 0
+        mag_err = np.where(np.isinf(mag_err), 0.0, mag_err)
+
+        if mag.ndim == 0:
+            return float(mag) + self.ZMag, float(mag_err)
 
         return mag + self.ZMag, mag_err
 
     @classmethod
-    def from_image(cls, path: str) -> Self:
+    def from_image(cls, path: str) -> Fits:
         """
         Creates a `Fits` object from the given image file
 
@@ -230,7 +299,7 @@ class Fits(Data):
     def from_data_header(cls, data: Any,
                          header: Optional[Header] = None,
                          output: Optional[str] = None,
-                         override: bool = False) -> Self:
+                         override: bool = False) -> Fits:
         """
         Creates a `Fits` object th give `data` and `header`
 
@@ -263,13 +332,14 @@ class Fits(Data):
             data = data.astype(data_type)
 
         fts.writeto(new_output, data, header=header, output_verify="silentfix")
+        cls.cache.invalidate(str(Path(new_output).absolute()))
         fits = cls.from_path(new_output)
 
         fits.is_temp = output is None
         return fits
 
     @classmethod
-    def sample(cls) -> Self:
+    def sample(cls) -> Fits:
         """
         Creates a sample `Fits` object
         see: https://www.astropy.org/astropy-data/tutorials/FITS-images/HorseHead.fits
@@ -301,10 +371,21 @@ class Fits(Data):
         self.logger.info("Resetting ZMag to 25")
         self.ZMag = 25
 
-    def header(self) -> pd.DataFrame:
+    def header(self, keys: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Returns headers of the fits file
 
+        Parameters
+        ----------
+        keys : List[str], optional
+            keys to be returned. All keys are returned if it's `None`
+
+        Notes
+        -----
+        When `keys` is given the header is scanned block by block only up to
+        the `END` card and only the given keys are parsed. No astropy `Header`
+        is built.
+
         Returns
         -------
         pd.DataFrame
@@ -312,13 +393,42 @@ class Fits(Data):
         """
         self.logger.info("Getting header")
 
-        header = fts.getheader(abs(self))
-
-        return pd.DataFrame(
-            {i: header[i] for i in header if isinstance(header[i], (bool, int, float, str))}, index=[0]).assign(
+        return pd.DataFrame(self.cards(keys), index=[0]).assign(
             image=[abs(self)]
         ).set_index("image")
 
+    def cards(self, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Returns the keys and values of the header whose values are bool, int,
+        float, or str
+
+        Parameters
+        ----------
+        keys : List[str], optional
+            keys to be returned. All keys are returned if it's `None`
+
+        Returns
+        -------
+        Dict[str, Any]
+            the keys found in the header and their values
+        """
+        if keys is None:
+            header = self.__header()
+            cards = {i: header[i] for i in header}
+        elif self.use_cache and self.cache.get(abs(self), "header") is not None:
+            header = self.__header()
+            cards = {key: header[key] for key in keys if key in header}
+        else:
+            try:
+                raw, _ = RawHeader.read(abs(self), keys)
+                cards = {key: raw[key] for key in keys if key in raw}
+            except ValueError as e:
+                self.logger.info(e)
+                header = self.__header()
+                cards = {key: header[key] for key in keys if key in header}
+
+        return {key: value for key, value in cards.items() if isinstance(value, (bool, int, float, str))}
+
     def data(self) -> Any:
         """
         returns the data of fits file
@@ -335,12 +445,43 @@ class Fits(Data):
         """
         self.logger.info("Getting data")
 
-        data = fts.getdata(abs(self))
+        return self.__data().astype(float)
+
+    def view(self) -> Any:
+        """
+        returns a read-only view of the data of fits file in its native data type
+
+        Notes
+        -----
+        The file is memory-mapped when possible. Scaled data (BZERO, BSCALE, or
+        BLANK cards present) cannot be memory-mapped and is read into memory.
+
+        Returns
+        -------
+        Any
+            the data as read-only `np.ndarray`
+
+        Raises
+        ------
+        ValueError
+            if the fits file is not an image
+        """
+        self.logger.info("Getting data view")
+
+        if self.use_cache:
+            return self.__data()
+
+        try:
+            data = fts.getdata(abs(self), memmap=True)
+        except ValueError:
+            data = fts.getdata(abs(self), memmap=False)
+
         if not isinstance(data, np.ndarray):
             self.logger.error("Unknown Fits type")
             raise ValueError("Unknown Fits type.  Maybe its a fits table and not an image.")
 
-        return data.astype(float)
+        data.flags.writeable = False
+        return data
 
     def value(self, x: int, y: int) -> float:
         """
@@ -362,7 +503,222 @@ class Fits(Data):
         IndexError
             when the x, y coordinate is out of boundaries
         """
-        return float(self.data()[x][y])
+        return float(self.__read_pixels([x], [y])[0])
+
+    def values(self, xs: List[int], ys: List[int]) -> pd.DataFrame:
+        """
+        Returns a table of values of asked coordinates
+
+        Notes
+        -----
+        Only the asked pixels are read from the file. Same as `value`, `xs` are
+        the first and `ys` are the second axis of the data.
+
+        Parameters
+        ----------
+        xs : List[int]
+            x coordinates of asked pixels
+        ys: List[int]
+            y coordinates of asked pixels
+
+        Returns
+        -------
+        pd.DataFrame
+            table of values of asked coordinates
+
+        Raises
+        ------
+        ValueError
+            when the length of xs and ys is not equal
+        IndexError
+            when any of x, y coordinates is out of boundaries
+        """
+        self.logger.info("Getting values")
+
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must be equal in length")
+
+        values = self.__read_pixels(xs, ys)
+
+        return pd.DataFrame(
+            {"image": [abs(self)] * len(values), "x": xs, "y": ys, "value": values}
+        ).set_index("image")
+
+    def cutout(self, x: int, y: int, width: int, height: int) -> Any:
+        """
+        Returns a region of the data without reading the whole data
+
+        Parameters
+        ----------
+        x : int
+            x coordinate of top left
+        y : int
+            y coordinate of top left
+        width : int
+            width of the region
+        height : int
+            height of the region
+
+        Returns
+        -------
+        Any
+            the region as `np.ndarray`. Same as `data()[y:y + height, x:x + width]`
+
+        Raises
+        ------
+        IndexError
+            when the region is out of boundaries
+        """
+        self.logger.info("Getting a cutout")
+
+        layout = self.__layout()
+        if layout is None:
+            data = self.view()[y:y + height, x:x + width].astype(float)
+        else:
+            offset, data_type, (ny, nx), bzero, bscale, blank = layout
+            rows = range(*slice(y, y + height).indices(ny))
+            columns = range(*slice(x, x + width).indices(nx))
+            data = np.empty((len(rows), len(columns)), dtype=float)
+            if data.size > 0:
+                with open(abs(self), "rb") as f:
+                    for i, row in enumerate(rows):
+                        f.seek(offset + (row * nx + columns.start) * data_type.itemsize)
+                        raw = np.frombuffer(f.read(len(columns) * data_type.itemsize), dtype=data_type)
+                        data[i] = self.__scale(raw, bzero, bscale, blank)
+
+        if data.size == 0:
+            raise IndexError("Out of boundaries")
+
+        return data
+
+    def pyramid(self, factors: Optional[List[int]] = None,
+                cache_dir: Optional[Union[str, Path]] = None) -> Pyramid:
+        """
+        Returns the block reduced levels of the data for display
+
+        Notes
+        -----
+        The levels are made in a single pass over the data when first used.
+        If `cache_dir` is given they are saved there and reused until the
+        file changes.
+
+        Parameters
+        ----------
+        factors : List[int], optional
+            binning factors of the levels. `[2, 4, 8]` if it's `None`
+        cache_dir : Union[str, Path], optional
+            directory to save the levels in
+
+        Returns
+        -------
+        Pyramid
+            `Pyramid` of the fits file
+
+        Raises
+        ------
+        ValueError
+            when any of the `factors` is smaller than 2
+        ValueError
+            when the fits file is not a 2D image
+        """
+        self.logger.info("Getting pyramid")
+
+        return Pyramid(self, factors=[2, 4, 8] if factors is None else factors,
+                       cache_dir=cache_dir, logger=self.logger)
+
+    def zscale(self) -> Tuple[float, float]:
+        """
+        Returns the approximate zscale limits of the data
+
+        Notes
+        -----
+        The limits are fitted on a stratified sample of `Fits.zscaler.n_samples`
+        pixels read from the native data type data. They are cached by
+        `Fits.zscaler` until the file changes.
+
+        Returns
+        -------
+        Tuple[float, float]
+            the lower and upper limits
+        """
+        self.logger.info("Getting zscale limits")
+
+        return self.zscaler.limits(self)
+
+    def __layout(self) -> Optional[Tuple[int, np.dtype, Tuple[int, int], float, float, Optional[int]]]:
+        """
+        Returns the layout of the primary data unit read from the raw header.
+
+        Returns
+        -------
+        Tuple[int, np.dtype, Tuple[int, int], float, float, Optional[int]], optional
+            offset of the data, data type on disk, shape, BZERO, BSCALE and BLANK.
+            `None` if the primary data unit is not a 2D image.
+        """
+        try:
+            cards, offset = RawHeader.read(
+                abs(self), ["BITPIX", "NAXIS", "NAXIS1", "NAXIS2", "BZERO", "BSCALE", "BLANK"]
+            )
+        except (OSError, ValueError) as e:
+            self.logger.info(e)
+            return None
+
+        if cards.get("NAXIS") != 2 or cards.get("BITPIX") not in RawHeader.DATA_TYPES:
+            return None
+
+        return (
+            offset, np.dtype(RawHeader.DATA_TYPES[cards["BITPIX"]]), (cards["NAXIS2"], cards["NAXIS1"]),
+            cards.get("BZERO", 0), cards.get("BSCALE", 1), cards.get("BLANK")
+        )
+
+    @staticmethod
+    def __scale(raw: Any, bzero: float, bscale: float, blank: Optional[int]) -> Any:
+        scaled = raw.astype(float) * bscale + bzero
+        if blank is not None and raw.dtype.kind in "iu":
+            scaled[raw == blank] = np.nan
+        return scaled
+
+    def __read_pixels(self, xs: List[int], ys: List[int]) -> List[float]:
+        """
+        Reads the given pixels. Seeks to the pixels in the file if the data is
+        not cached and the primary data unit is a 2D image.
+
+        Parameters
+        ----------
+        xs : List[int]
+            first axis coordinates
+        ys : List[int]
+            second axis coordinates
+
+        Returns
+        -------
+        List[float]
+            values of the pixels
+
+        Raises
+        ------
+        IndexError
+            when any of x, y coordinates is out of boundaries
+        """
+        layout = None if self.use_cache else self.__layout()
+        if layout is None:
+            data = self.view()
+            return [float(data[x][y]) for x, y in zip(xs, ys)]
+
+        offset, data_type, shape, bzero, bscale, blank = layout
+        values = []
+        with open(abs(self), "rb") as f:
+            for x, y in zip(xs, ys):
+                row = int(x) + shape[0] if x < 0 else int(x)
+                column = int(y) + shape[1] if y < 0 else int(y)
+                if not (0 <= row < shape[0] and 0 <= column < shape[1]):
+                    raise IndexError(f"({x}, {y}) is out of boundaries")
+
+                f.seek(offset + (row * shape[1] + column) * data_type.itemsize)
+                raw = np.frombuffer(f.read(data_type.itemsize), dtype=data_type)
+                values.append(float(self.__scale(raw, bzero, bscale, blank)[0]))
+
+        return values
 
     def pure_header(self) -> Header:
         """
@@ -375,7 +731,80 @@ class Fits(Data):
         """
         self.logger.info("Getting header (as an astropy header object)")
 
-        return fts.getheader(abs(self))
+        return self.__header().copy()
+
+    def wcs(self) -> WCS:
+        """
+        Returns the `WCS` of the header
+
+        Notes
+        -----
+        The `WCS` is parsed once and reused until the file changes (its
+        modification time or size) or its header is edited. It is shared by
+        all callers and must not be modified. Use its `deepcopy` instead.
+
+        Returns
+        -------
+        WCS
+            the WCS of the file
+        """
+        signature = self.cache.signature(abs(self))
+        if self._wcs is None or self._wcs[0] != signature:
+            self._wcs = (signature, WCS(self.pure_header()))
+
+        return self._wcs[1]
+
+    def __data(self) -> Any:
+        """
+        Reads the data from the file or from the cache if `use_cache` is True
+
+        Returns
+        -------
+        Any
+            the data as `np.ndarray` in its native data type
+
+        Raises
+        ------
+        ValueError
+            if the fits file is not an image
+        """
+        if self.use_cache:
+            cached = self.cache.get(abs(self), "data")
+            if cached is not None:
+                return cached
+
+        data = fts.getdata(abs(self))
+        if not isinstance(data, np.ndarray):
+            self.logger.error("Unknown Fits type")
+            raise ValueError("Unknown Fits type.  Maybe its a fits table and not an image.")
+
+        if self.use_cache:
+            data = np.array(data)
+            data.flags.writeable = False
+            self.cache.put(abs(self), "data", data)
+
+        return data
+
+    def __header(self) -> Header:
+        """
+        Reads the header from the file or from the cache if `use_cache` is True
+
+        Returns
+        -------
+        Header
+            the Header object of the file
+        """
+        if self.use_cache:
+            cached = self.cache.get(abs(self), "header")
+            if cached is not None:
+                return cached
+
+        header = fts.getheader(abs(self))
+
+        if self.use_cache:
+            self.cache.put(abs(self), "header", header)
+
+        return header
 
     def ccd(self) -> CCDData:
         """
@@ -411,12 +840,12 @@ class Fits(Data):
         """
         self.logger.info("Calculating image statistics")
 
-        data = self.data()
+        data = self.view()
         return pd.DataFrame(
             [
                 [
-                    abs(self), data.size, np.mean(data), np.std(data),
-                    np.min(data), np.max(data)
+                    abs(self), data.size, float(np.mean(data)), float(np.std(data)),
+                    float(np.min(data)), float(np.max(data))
                 ]
             ],
             columns=["image", "npix", "mean", "stddev", "min", "max"]
@@ -430,7 +859,8 @@ class Fits(Data):
                      cleantype: str = 'meanmask', fsmode: str = 'median',
                      psfmodel: str = 'gauss', psffwhm: float = 2.5,
                      psfsize: int = 7, psfk: Optional[Any] = None,
-                     psfbeta: float = 4.765, gain_apply: bool = True) -> Self:
+                     psfbeta: float = 4.765, gain_apply: bool = True,
+                     tile_size: Optional[int] = None, workers: int = 1) -> Fits:
         """
         Clears cosmic rays from the fits file
 
@@ -525,6 +955,13 @@ class Fits(Data):
             If True, return gain-corrected data, with correct units,
             otherwise do not gain-correct the data.
             Default is True to preserve backwards compatibility. see [1]
+        tile_size: int, optional
+            If given, the image is cleaned in tiles of `tile_size` x `tile_size`
+            pixels with an overlapping halo. The result is the same as
+            cleaning the whole image.
+        workers: int, default=1
+            Number of processes to clean the tiles in. Ignored if
+            `tile_size` is not given.
 
         Returns
         -------
@@ -533,8 +970,8 @@ class Fits(Data):
         """
         self.logger.info("Cleaning the data")
 
-        cleaned_data, _ = cosmicray_lacosmic(
-            self.data(), sigclip=sigclip,
+        kwargs = dict(
+            sigclip=sigclip,
             sigfrac=sigfrac, objlim=objlim,
             gain=gain, readnoise=readnoise, satlevel=satlevel,
             niter=niter, sepmed=sepmed, cleantype=cleantype.lower(), fsmode=fsmode.lower(),
@@ -542,6 +979,12 @@ class Fits(Data):
             psfbeta=psfbeta, gain_apply=gain_apply
         )
 
+        if tile_size is None:
+            cleaned_data, _ = cosmicray_lacosmic(self.data(), **kwargs)
+        else:
+            cleaner = CosmicCleaner(tile_size=tile_size, workers=workers, logger=self.logger, **kwargs)
+            cleaned_data = cleaner.clean(self.data())
+
         return self.from_data_header(cleaned_data, header=self.pure_header(), output=output, override=override)
 
     def hedit(self, keys: Union[str, List[str]],
@@ -577,15 +1020,13 @@ class Fits(Data):
             if isinstance(keys, str):
                 keys = [keys]
 
-            with fts.open(abs(self), "update") as hdu:
+            with self.header_edit() as header:
                 for key in keys:
-                    if key in hdu[0].header:
-                        del hdu[0].header[key]
+                    if key in header:
+                        del header[key]
                     else:
                         self.logger.info("Key does not exist")
 
-                hdu.flush()
-
         else:
             if values is None:
                 self.logger.error("Delete is False and Value is not given")
@@ -597,57 +1038,170 @@ class Fits(Data):
                 self.logger.error("List of keys and values must be equal in length")
                 raise ValueError("List of keys and values must be equal in length")
 
-            with fts.open(abs(self), "update") as hdu:
+            with self.header_edit() as header:
                 for key, value, comment in zip(keys_to_use, values_to_use, comments_to_use):
                     if value_is_key:
-                        hdu[0].header[key] = hdu[0].header[value]
+                        header[key] = header[value]
                     else:
-                        hdu[0].header[key] = value
-                    hdu[0].header.comments[key] = comment
-
-                hdu.flush()
+                        header[key] = value
+                    header.comments[key] = comment
 
         return self
 
-    def save_as(self, output: str, override: bool = False) -> Self:
+    def hedit_many(self, cards: Dict[str, Any]) -> Self:
         """
-        Saves the `Fits` file as output.
+        Sets many header cards at once
 
         Parameters
         ----------
-        output: str
-            New path to save the file.
-        override: bool, default=False
-            If True will overwrite the new_path if a file is already exists.
+        cards : Dict[str, Any]
+            keys and values to be set. A value can be a `(value, comment)`
+            tuple. The key is deleted if the value is `None`
 
         Returns
         -------
         Fits
-            New `Fits` object of saved fits file.
+            The same `Fits` object
+        """
+        self.logger.info("Editing header")
+
+        with self.header_edit() as header:
+            for key, value in cards.items():
+                if value is None:
+                    if key in header:
+                        del header[key]
+                    else:
+                        self.logger.info("Key does not exist")
+                else:
+                    header[key] = value
+
+        return self
+
+    @contextmanager
+    def header_edit(self) -> Iterator[Header]:
+        """
+        Opens the header for editing. All edits made in the `with` block are
+        written at once when the block exits without an error
+
+        Notes
+        -----
+        - The header is read and written with one open each. When the
+          edited header still fits its existing 2880-byte blocks only the
+          header blocks are overwritten and the data unit is not touched.
+          Otherwise the file is rewritten once.
+        - `SIMPLE`, `BITPIX`, `NAXIS` and `NAXISn` describe the data unit and
+          cannot be changed.
+
+        Yields
+        ------
+        Header
+            the header to be edited
 
         Raises
         ------
-        FileExistsError
-            when the file does exist and `override` is `False`
+        ValueError
+            when the file is not a fits file or the cards describing the data
+            unit are changed
         """
-        self.logger.info("Saving the fits to as")
+        try:
+            text = RawHeader.text(abs(self))
+        except ValueError as e:
+            self.logger.error(e)
+            raise
 
-        new_output = Fixer.output(output=output, override=override)
-        shutil.copy(self.file, new_output)
-        return self.__class__.from_path(new_output)
+        header = Header.fromstring(text)
+        while len(header) and header.cards[-1].image.strip() == "":
+            del header[-1]
 
-    def add(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Self:
-        r"""
-        Does Addition operation on the `Fits` object
+        structure = self.__structure(header)
 
-        Notes
-        -----
-        It is able to add numeric values as other `Fits`
+        yield header
 
-        - If other is numeric each element of the matrix will be added to the number.
-        - If other is another `Fits` elementwise summation will be done.
+        if self.__structure(header) != structure:
+            self.logger.error("SIMPLE, BITPIX, NAXIS and NAXISn cannot be edited")
+            raise ValueError("SIMPLE, BITPIX, NAXIS and NAXISn cannot be edited")
 
-        Parameters
+        in_place = RawHeader.write(abs(self), header.tostring(endcard=False, padding=False), len(text))
+        if not in_place:
+            self.logger.info("Header does not fit its blocks. The file is rewritten")
+
+        self.cache.invalidate(abs(self))
+        self._wcs = None
+
+    @staticmethod
+    def __structure(header: Header) -> List[Tuple[str, Any]]:
+        """
+        Returns the leading cards that describe the data unit
+
+        Parameters
+        ----------
+        header : Header
+            the header
+
+        Returns
+        -------
+        List[Tuple[str, Any]]
+            keywords and values of `SIMPLE`, `BITPIX`, `NAXIS` and `NAXISn`
+        """
+        naxis = header.get("NAXIS", 0)
+        return [(card.keyword, card.value) for card in header.cards[:3 + naxis]]
+
+    def save_as(self, output: str, override: bool = False) -> Fits:
+        """
+        Saves the `Fits` file as output.
+
+        Parameters
+        ----------
+        output: str
+            New path to save the file.
+        override: bool, default=False
+            If True will overwrite the new_path if a file is already exists.
+
+        Returns
+        -------
+        Fits
+            New `Fits` object of saved fits file.
+
+        Raises
+        ------
+        FileExistsError
+            when the file does exist and `override` is `False`
+        """
+        self.logger.info("Saving the fits to as")
+
+        new_output = Fixer.output(output=output, override=override)
+        shutil.copy(self.file, new_output)
+        return self.__class__.from_path(new_output)
+
+    def lazy(self) -> Expression:
+        """
+        Returns the `Fits` as a lazily evaluated `Expression`
+
+        Notes
+        -----
+        Arithmetic operators on the expression only build the expression.
+        It is evaluated in a single blocked pass (with each image read once)
+        when `compute`, `save_as` or `data` of the expression is called.
+
+        Returns
+        -------
+        Expression
+            the expression of this `Fits`
+        """
+        return Expression.wrap(self, logger=self.logger)
+
+    def add(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Fits:
+        r"""
+        Does Addition operation on the `Fits` object
+
+        Notes
+        -----
+        It is able to add numeric values as other `Fits`
+
+        - If other is numeric each element of the matrix will be added to the number.
+        - If other is another `Fits` elementwise summation will be done.
+
+        Parameters
         ----------
         other: Union[Self, float, int]
             Either a `Fits` object, float, or integer
@@ -668,7 +1222,7 @@ class Fits(Data):
         """
         self.logger.info("Making addition operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -682,7 +1236,7 @@ class Fits(Data):
             output=output, override=override
         )
 
-    def sub(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Self:
+    def sub(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Does Subtraction operation on the `Fits` object
 
@@ -715,7 +1269,7 @@ class Fits(Data):
         """
         self.logger.info("Making subtraction operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -729,7 +1283,7 @@ class Fits(Data):
             output=output, override=override
         )
 
-    def mul(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Self:
+    def mul(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Does Multiplication operation on the `Fits` object
 
@@ -762,7 +1316,7 @@ class Fits(Data):
         """
         self.logger.info("Making multiplication operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -776,7 +1330,7 @@ class Fits(Data):
             output=output, override=override
         )
 
-    def div(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Self:
+    def div(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Does Division operation on the `Fits` object
 
@@ -809,7 +1363,7 @@ class Fits(Data):
         """
         self.logger.info("Making division operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -823,7 +1377,7 @@ class Fits(Data):
             output=output, override=override
         )
 
-    def pow(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Self:
+    def pow(self, other: Union[Self, float, int], output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Does Power operation on the `Fits` object
 
@@ -856,7 +1410,7 @@ class Fits(Data):
         """
         self.logger.info("Making power operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -871,7 +1425,7 @@ class Fits(Data):
         )
 
     def imarith(self, other: Union[Self, float, int], operand: str,
-                output: Optional[str] = None, override: bool = False) -> Self:
+                output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Does Arithmetic operation on the `Fits` object
 
@@ -908,7 +1462,7 @@ class Fits(Data):
         """
         self.logger.info("Making an arithmetic operation")
 
-        if not isinstance(other, (float, int, self.__class__)):
+        if not isinstance(other, (float, int, Fits)):
             self.logger.error(f"Please provide either a {self.__class__} Object or a numeric value")
             raise ValueError(f"Please provide either a {self.__class__} Object or a numeric value")
 
@@ -925,9 +1479,31 @@ class Fits(Data):
         else:
             return self.div(other, output=output, override=override)
 
-    def align(self, reference: Self, output: Optional[str] = None,
+    def aligner(self, max_control_points: int = 50, min_area: int = 5) -> Aligner:
+        """
+        Returns an `Aligner` holding the control points of the fits file to
+        align other files to it
+
+        Parameters
+        ----------
+        max_control_points: int, default=50
+            The maximum number of control point-sources to
+            find the transformation.
+        min_area: int, default=5
+            Minimum number of connected pixels to be considered a source.
+
+        Returns
+        -------
+        Aligner
+            `Aligner` of the fits file.
+        """
+        self.logger.info("Getting aligner")
+
+        return Aligner(self.data(), max_control_points=max_control_points, min_area=min_area)
+
+    def align(self, reference: Union[Self, Aligner], output: Optional[str] = None,
               max_control_points: int = 50, min_area: int = 5,
-              override: bool = False) -> Self:
+              override: bool = False) -> Fits:
         """
         Aligns the fits file with the given reference
 
@@ -935,15 +1511,17 @@ class Fits(Data):
 
         Parameters
         ----------
-        reference: Self
-            The reference Image to be aligned as a Fits object.
+        reference: Union[Self, Aligner]
+            The reference Image to be aligned as a Fits object. Or an `Aligner`
+            of the reference to reuse its control points.
         output: str, optional
             Path of the new fits file.
         max_control_points: int, default=50
             The maximum number of control point-sources to
-            find the transformation. [1]
+            find the transformation. Ignored if `reference` is an `Aligner`. [1]
         min_area: int, default=5
-            Minimum number of connected pixels to be considered a source. [1]
+            Minimum number of connected pixels to be considered a source.
+            Ignored if `reference` is an `Aligner`. [1]
         override: bool, default=False
             If True will overwrite the new_path if a file is already exists.
 
@@ -954,25 +1532,19 @@ class Fits(Data):
         """
         self.logger.info("Aligning the image")
 
-        if not isinstance(reference, self.__class__):
+        if not isinstance(reference, (Fits, Aligner)):
             self.logger.error(f"Other must be a {self.__class__}")
             raise ValueError(f"Other must be a {self.__class__}")
 
         try:
             data = self.data()
-            reference_data = reference.data()
-            w = WCS(self.pure_header())
-
-            t, (source_list, target_list) = astroalign.find_transform(
-                source=data,
-                target=reference_data,
-                max_control_points=max_control_points,
-                min_area=min_area,
-            )
+            w = self.wcs()
 
-            registered_image, _ = astroalign.apply_transform(
-                t, data, reference_data, 0, False
+            aligner = reference if isinstance(reference, Aligner) else reference.aligner(
+                max_control_points=max_control_points, min_area=min_area
             )
+            t, (source_list, target_list) = aligner.find_transform(data)
+            registered_image = aligner.apply_transform(t, data)
 
             try:
 
@@ -1013,9 +1585,10 @@ class Fits(Data):
         """
         self.logger.info("Showing the image")
 
-        zscale = ZScaleInterval() if scale else lambda x: x
-
-        plt.imshow(zscale(self.data()), cmap="Greys_r")
+        if scale:
+            plt.imshow(self.zscaler.image(self), cmap="Greys_r", vmin=0, vmax=255)
+        else:
+            plt.imshow(self.view(), cmap="Greys_r")
 
         if sources is not None:
             plt.scatter(sources["xcentroid"], sources["ycentroid"])
@@ -1041,10 +1614,11 @@ class Fits(Data):
         """
         self.logger.info("Showing the image to pick some coordinates")
 
-        zscale = ZScaleInterval() if scale else lambda x: x
-
         fig, ax = plt.subplots(constrained_layout=True)
-        ax.imshow(zscale(self.data()), cmap="Greys_r")
+        if scale:
+            ax.imshow(self.zscaler.image(self), cmap="Greys_r", vmin=0, vmax=255)
+        else:
+            ax.imshow(self.view(), cmap="Greys_r")
         klkr = clicker(ax, ["source"], markers=["o"])
         plt.show()
         if len(klkr.get_positions()["source"]) == 0:
@@ -1057,7 +1631,7 @@ class Fits(Data):
     def solve_field(self, api_key: str, solve_timeout: int = 120,
                     force_image_upload: bool = False,
                     output: Optional[str] = None, override: bool = False
-                    ) -> Self:
+                    ) -> Fits:
         """
         Solves filed for the given file.
 
@@ -1102,7 +1676,7 @@ class Fits(Data):
             raise Unsolvable("Cannot solve")
 
     def zero_correction(self, master_zero: Self, output: Optional[str] = None,
-                        override: bool = False, force: bool = False) -> Self:
+                        override: bool = False, force: bool = False) -> Fits:
         """
         Does zero correction of the data
 
@@ -1144,7 +1718,7 @@ class Fits(Data):
         raise OverCorrection("This Data is already zero corrected")
 
     def dark_correction(self, master_dark: Self, exposure: Optional[str] = None, output: Optional[str] = None,
-                        override: bool = False, force: bool = False) -> Self:
+                        override: bool = False, force: bool = False) -> Fits:
         """
         Does dark correction of the data
 
@@ -1207,7 +1781,7 @@ class Fits(Data):
         raise OverCorrection("This Data is already dark corrected")
 
     def flat_correction(self, master_flat: Self, output: Optional[str] = None,
-                        override: bool = False, force: bool = False) -> Self:
+                        override: bool = False, force: bool = False) -> Fits:
         """
         Does flat correction of the data
 
@@ -1250,7 +1824,7 @@ class Fits(Data):
 
     def ccdproc(self, master_zero: Optional[Self] = None, master_dark: Optional[Self] = None,
                 master_flat: Optional[Self] = None, exposure: Optional[str] = None, output: Optional[str] = None,
-                override: bool = False, force: bool = False) -> Self:
+                override: bool = False, force: bool = False, calibrator: Optional[Calibrator] = None) -> Fits:
         """
         Does ccdproc correction of the data. can be zero, dark, or flat in any combination
 
@@ -1270,6 +1844,9 @@ class Fits(Data):
             If True will overwrite the output if a file is already exists.
         force: bool, default=False
             Overcorrection flag
+        calibrator: Calibrator, optional
+            Masters already loaded by a `Calibrator`. If given, `master_zero`,
+            `master_dark`, `master_flat` and `exposure` are ignored.
 
         Returns
         -------
@@ -1278,46 +1855,39 @@ class Fits(Data):
         """
         self.logger.info("Making ccd correction on the image")
 
-        if all(each is None for each in [master_zero, master_dark, master_flat]):
-            raise NothingToDo("None of master Zero, Dark, or Flat is not provided")
+        if calibrator is None:
+            if all(each is None for each in [master_zero, master_dark, master_flat]):
+                raise NothingToDo("None of master Zero, Dark, or Flat is not provided")
+
+            calibrator = Calibrator(master_zero, master_dark, master_flat, exposure=exposure, logger=self.logger)
+
+        exposure = calibrator.exposure
 
-        corrected = self.ccd()
         header = self.pure_header()
-        if master_zero:
-            if "MY-ZERO" not in self.header() or force:
-                corrected = subtract_bias(corrected, master_zero.ccd())
-                header["MY-ZERO"] = master_zero.file.name
-
-        if master_dark:
-            if "MY-DARK" not in self.header() or force:
-                if exposure is None:
-                    options = {"dark_exposure": 1 * units.s,
-                               "data_exposure": 1 * units.s}
-                else:
-                    if exposure not in self.header() or \
-                            exposure not in master_dark.header():
-                        self.logger.error(f"Key {exposure} not found in file, master_dark or both")
-                        raise CardNotFound(f"Key {exposure} not found in file, master_dark or both")
-
-                    options = {
-                        "dark_exposure": float(
-                            master_dark.header()[exposure].values[0]) * units.s,
-                        "data_exposure": float(
-                            self.header()[exposure].values[0]) * units.s
-                    }
-                corrected = subtract_dark(
-                    corrected, master_dark.ccd(),
-                    **options, scale=True
-                )
-                header["MY-DARK"] = master_dark.file.name
-
-        if master_flat:
-            if "MY-FLAT" not in self.header() or force:
-                corrected = flat_correct(corrected, master_flat.ccd())
-                header["MY-FLAT"] = master_flat.file.name
+
+        zero = calibrator.zero is not None and ("MY-ZERO" not in header or force)
+        dark = calibrator.dark is not None and ("MY-DARK" not in header or force)
+        flat = calibrator.flat is not None and ("MY-FLAT" not in header or force)
+
+        data_exposure = 1.0
+        if dark and exposure is not None:
+            if exposure not in header:
+                self.logger.error(f"Key {exposure} not found in file, master_dark or both")
+                raise CardNotFound(f"Key {exposure} not found in file, master_dark or both")
+
+            data_exposure = float(header[exposure])
+
+        corrected = calibrator.apply(self.data(), exposure=data_exposure, zero=zero, dark=dark, flat=flat)
+
+        if zero:
+            header["MY-ZERO"] = calibrator.zero_name
+        if dark:
+            header["MY-DARK"] = calibrator.dark_name
+        if flat:
+            header["MY-FLAT"] = calibrator.flat_name
 
         return self.__class__.from_data_header(
-            corrected.data, header=header,
+            corrected, header=header,
             output=output, override=override
         )
 
@@ -1408,9 +1978,54 @@ class Fits(Data):
             sources,
         ).rename(columns={"x": "xcentroid", "y": "ycentroid"})
 
+    def photometry_context(self, exposure: Optional[Union[str, float, int]] = None) -> PhotometryContext:
+        """
+        Returns the data, background, background rms and error map of the
+        fits file to be shared by photometry calls
+
+        Parameters
+        ----------
+        exposure: Union[str, float, int], optional
+            Header key that contains or a numeric value of exposure time
+
+        Returns
+        -------
+        PhotometryContext
+            photometry context of `Fits`
+        """
+        self.logger.info("Getting photometry context")
+
+        return PhotometryContext(self.data(), self.__exposure(self.header(), exposure))
+
+    @staticmethod
+    def __exposure(the_header: pd.DataFrame, exposure: Optional[Union[str, float, int]] = None) -> Union[float, int]:
+        """
+        Returns the exposure time
+
+        Parameters
+        ----------
+        the_header : pd.DataFrame
+            the header
+        exposure: Union[str, float, int], optional
+            Header key that contains or a numeric value of exposure time
+
+        Returns
+        -------
+        Union[float, int]
+            the exposure time. `0` if `exposure` is `None`
+        """
+        if exposure is None:
+            return 0.0
+
+        if isinstance(exposure, (int, float)):
+            return exposure
+
+        return float(the_header[exposure].iloc[0])
+
     def photometry_sep(self, xs: NUMERICS, ys: NUMERICS, rs: NUMERICS,
                        headers: Optional[Union[str, list[str]]] = None,
-                       exposure: Optional[Union[str, float, int]] = None
+                       exposure: Optional[Union[str, float, int]] = None,
+                       context: Optional[PhotometryContext] = None
                        ) -> pd.DataFrame:
         """
         Does a photometry using sep
@@ -1427,6 +2042,9 @@ class Fits(Data):
             Header keys to be extracted after photometry
         exposure: Union[str, float, int], optional
             Header key that contains or a numeric value of exposure time
+        context: PhotometryContext, optional
+            Data, background and error map of the frame. Created if not given.
+            `exposure` is ignored when given
 
         Returns
         -------
@@ -1440,17 +2058,12 @@ class Fits(Data):
         """
         self.logger.info("Doing photometry (sep) on the image")
 
-        table = []
-
         the_header = self.header()
 
-        if exposure is None:
-            exposure_to_use = 0.0
+        if context is None:
+            exposure_to_use = self.__exposure(the_header, exposure)
         else:
-            if isinstance(exposure, (int, float)):
-                exposure_to_use = exposure
-            else:
-                exposure_to_use = float(the_header[exposure].iloc[0])
+            exposure_to_use = context.exposure
 
         new_xs, new_ys = Fixer.coordinate(xs, ys)
         new_rs = Fixer.aperture(rs)
@@ -1465,51 +2078,20 @@ class Fits(Data):
             except KeyError:
                 headers_.append(None)
 
-        data = self.data()
-        background = self.background()
+        if context is None:
+            context = PhotometryContext(self.data(), exposure_to_use)
 
-        clean_d = data - background.rms()
-        error = calc_total_error(
-            self.data(), background, exposure_to_use
+        fluxes, flux_errors, flags = self.__sep_fluxes(new_xs, new_ys, new_rs, context)
+
+        return self.__photometry_table(
+            "sep", np.asarray(new_xs), np.asarray(new_ys), new_rs, fluxes, flux_errors,
+            np.concatenate(flags), context.clean, exposure_to_use, dict(zip(keys_, headers_))
         )
-        for new_r in new_rs:
-            fluxes, flux_errs, flags = sum_circle(
-                data,
-                new_xs, new_ys, new_r,
-                err=error
-            )
-            for x, y, flux, flux_err, flag in zip(new_xs, new_ys, fluxes,
-                                                  flux_errs, flags):
-                try:
-                    sky = self.pixels_to_skys(x, y).iloc[0].sky
-                    ra = sky.ra.degree
-                    dec = sky.dec.degree
-                except Exception as e:
-                    self.logger.info(f"Could not get ra, dec. {e}")
-                    ra = None
-                    dec = None
-
-                value = clean_d[int(x)][int(y)]
-                snr = np.nan if value < 0 else math.sqrt(value)
-                mag, mag_err = self.flux_to_mag(flux, flux_err,
-                                                exposure_to_use)
-                table.append(
-                    [
-                        abs(self), "sep", x, y, ra, dec, new_r, flux, flux_err,
-                        flag, snr, mag, mag_err, *headers_
-                    ]
-                )
-        return pd.DataFrame(
-            table,
-            columns=[
-                "image", "package", "xcentroid", "ycentroid", "ra", "dec", "aperture",
-                "flux", "flux_error", "flag", "snr", "mag", "merr", *keys_
-            ]
-        ).set_index("image")
 
     def photometry_phu(self, xs: NUMERICS, ys: NUMERICS, rs: NUMERICS,
                        headers: Optional[Union[str, list[str]]] = None,
-                       exposure: Optional[Union[str, float, int]] = None
+                       exposure: Optional[Union[str, float, int]] = None,
+                       context: Optional[PhotometryContext] = None
                        ) -> pd.DataFrame:
         """
         Does a photometry using photutils
@@ -1526,6 +2108,9 @@ class Fits(Data):
             Header keys to be extracted after photometry
         exposure: Union[str, float, int], optional
             Header key that contains or a numeric value of exposure time
+        context: PhotometryContext, optional
+            Data, background and error map of the frame. Created if not given.
+            `exposure` is ignored when given
 
         Returns
         -------
@@ -1539,17 +2124,12 @@ class Fits(Data):
         """
         self.logger.info("Doing photometry (photutils) on the image")
 
-        table = []
-
         the_header = self.header()
 
-        if exposure is None:
-            exposure_to_use = 0.0
+        if context is None:
+            exposure_to_use = self.__exposure(the_header, exposure)
         else:
-            if isinstance(exposure, (int, float)):
-                exposure_to_use = exposure
-            else:
-                exposure_to_use = float(the_header[exposure].iloc[0])
+            exposure_to_use = context.exposure
 
         new_xs, new_ys = Fixer.coordinate(xs, ys)
         new_rs = Fixer.aperture(rs)
@@ -1564,66 +2144,260 @@ class Fits(Data):
             except KeyError:
                 headers_.append(None)
 
-        data = self.data()
-        background = self.background()
+        if context is None:
+            context = PhotometryContext(self.data(), exposure_to_use)
+
+        fluxes, flux_errors = self.__phu_fluxes(new_xs, new_ys, new_rs, context)
+
+        return self.__photometry_table(
+            "phu", np.asarray(new_xs, dtype=float), np.asarray(new_ys, dtype=float), new_rs,
+            fluxes, flux_errors, None, context.clean, exposure_to_use, dict(zip(keys_, headers_))
+        )
+
+    def photometry_arrays(self, xs: NUMERICS, ys: NUMERICS, rs: NUMERICS, package: str = "sep",
+                          exposure: Optional[Union[str, float, int]] = None,
+                          context: Optional[PhotometryContext] = None) -> Any:
+        """
+        Does a photometry and returns the result as a structured array
+        without building a dataframe
+
+        Notes
+        -----
+        The fields of the array are the same as the columns of
+        `photometry_sep` except `image` and `package`. `ra` and `dec` are
+        `nan` if the plate is not solved. `flag` is `0` for photutils.
+
+        Parameters
+        ----------
+        xs: Union[float, int, List[Union[float, int]]]
+            x coordinate(s)
+        ys: Union[float, int, List[Union[float, int]]]
+            y coordinate(s)
+        rs: Union[float, int, List[Union[float, int]]]
+            aperture(s)
+        package: str, default="sep"
+            photometry back-end. Either sep or phu
+        exposure: Union[str, float, int], optional
+            Header key that contains or a numeric value of exposure time
+        context: PhotometryContext, optional
+            Data, background and error map of the frame. Created if not given.
+            `exposure` is ignored when given
 
-        clean_d = data - background.rms()
+        Returns
+        -------
+        np.ndarray
+            structured array of shape (number of stars, number of apertures)
 
-        for new_r in new_rs:
-            apertures = CircularAperture([
-                [new_x, new_y] for new_x, new_y in zip(new_xs, new_ys)
-            ], r=new_r)
-            error = calc_total_error(
-                self.data(), self.background(), exposure_to_use
+        Raises
+        ------
+        NumberOfElementError
+            when `x` and `y` coordinates does not have the same length
+        ValueError
+            when the package is not either of sep, or phu
+        """
+        self.logger.info(f"Doing photometry ({package}) on the image")
+
+        if package not in ["sep", "phu"]:
+            raise ValueError("Package can only be one of these: sep, phu")
+
+        if context is None:
+            context = self.photometry_context(exposure=exposure)
+
+        new_xs, new_ys = Fixer.coordinate(xs, ys)
+        new_rs = Fixer.aperture(rs)
+        xs_array = np.asarray(new_xs, dtype=float)
+        ys_array = np.asarray(new_ys, dtype=float)
+
+        result = np.zeros((len(xs_array), len(new_rs)), dtype=PHOTOMETRY_DTYPE)
+
+        if package == "sep":
+            fluxes, flux_errors, flags = self.__sep_fluxes(xs_array, ys_array, new_rs, context)
+            result["flag"] = np.transpose(flags)
+        else:
+            fluxes, flux_errors = self.__phu_fluxes(xs_array, ys_array, new_rs, context)
+
+        ras, decs = self.__radec(xs_array, ys_array)
+
+        value = context.clean[xs_array.astype(int), ys_array.astype(int)]
+        with np.errstate(invalid="ignore"):
+            snr = np.where(value < 0, np.nan, np.sqrt(value))
+
+        mag, mag_err = self.flux_to_mag(np.transpose(fluxes), np.transpose(flux_errors), context.exposure)
+
+        result["xcentroid"] = xs_array[:, np.newaxis]
+        result["ycentroid"] = ys_array[:, np.newaxis]
+        result["ra"] = np.nan if ras is None else ras[:, np.newaxis]
+        result["dec"] = np.nan if decs is None else decs[:, np.newaxis]
+        result["aperture"] = new_rs
+        result["flux"] = np.transpose(fluxes)
+        result["flux_error"] = np.transpose(flux_errors)
+        result["snr"] = snr[:, np.newaxis]
+        result["mag"] = mag
+        result["merr"] = mag_err
+
+        return result
+
+    @staticmethod
+    def __sep_fluxes(xs: Any, ys: Any, rs: List[Union[float, int]],
+                     context: PhotometryContext) -> Tuple[List[Any], List[Any], List[Any]]:
+        """
+        Sums the circular apertures using sep
+
+        Parameters
+        ----------
+        xs : np.ndarray
+            x coordinates
+        ys : np.ndarray
+            y coordinates
+        rs : List[Union[float, int]]
+            apertures
+        context : PhotometryContext
+            photometry context of the frame
+
+        Returns
+        -------
+        Tuple[List[np.ndarray], List[np.ndarray], List[np.ndarray]]
+            fluxes, flux errors and flags of each aperture
+        """
+        fluxes, flux_errors, flags = [], [], []
+        for r in rs:
+            flux, flux_error, flag = sum_circle(
+                context.data,
+                xs, ys, r,
+                err=context.error
             )
-            phot_table = aperture_photometry(data, apertures, error=error)
+            fluxes.append(flux)
+            flux_errors.append(flux_error)
+            flags.append(flag)
 
-            for phot_line in phot_table:
-                value = clean_d[
-                    int(phot_line["xcenter"])
-                ][
-                    int(phot_line["ycenter"])
-                ]
-                snr = np.nan if value < 0 else math.sqrt(value)
-                mag, mag_err = self.flux_to_mag(
-                    phot_line["aperture_sum"],
-                    phot_line["aperture_sum_err"],
-                    exposure_to_use
-                )
-
-                try:
-                    sky = self.pixels_to_skys(phot_line["xcenter"].value, phot_line["ycenter"].value).iloc[0].sky
-                    ra = sky.ra.degree
-                    dec = sky.dec.degree
-                except Exception as e:
-                    self.logger.info(f"Could not get ra, dec. {e}")
-                    ra = None
-                    dec = None
-
-                table.append(
-                    [
-                        abs(self), "phu",
-                        phot_line["xcenter"],
-                        phot_line["ycenter"],
-                        ra, dec,
-                        new_r,
-                        phot_line["aperture_sum"],
-                        phot_line["aperture_sum_err"],
-                        None, snr, mag, mag_err, *headers_
-                    ]
-                )
+        return fluxes, flux_errors, flags
 
-        return pd.DataFrame(
-            table,
-            columns=[
-                "image", "package", "xcentroid", "ycentroid", "ra", "dec", "aperture",
-                "flux", "flux_error", "flag", "snr", "mag", "merr", *keys_
-            ]
-        ).set_index("image")
+    @staticmethod
+    def __phu_fluxes(xs: Any, ys: Any, rs: List[Union[float, int]],
+                     context: PhotometryContext) -> Tuple[List[Any], List[Any]]:
+        """
+        Sums the circular apertures using photutils
+
+        Parameters
+        ----------
+        xs : np.ndarray
+            x coordinates
+        ys : np.ndarray
+            y coordinates
+        rs : List[Union[float, int]]
+            apertures
+        context : PhotometryContext
+            photometry context of the frame
+
+        Returns
+        -------
+        Tuple[List[np.ndarray], List[np.ndarray]]
+            fluxes and flux errors of each aperture
+        """
+        fluxes, flux_errors = [], []
+        for r in rs:
+            apertures = CircularAperture(np.transpose([xs, ys]), r=r)
+            phot_table = aperture_photometry(context.data, apertures, error=context.error)
+            fluxes.append(np.asarray(phot_table["aperture_sum"], dtype=float))
+            flux_errors.append(np.asarray(phot_table["aperture_sum_err"], dtype=float))
+
+        return fluxes, flux_errors
+
+    def __photometry_table(self, package: str, xs: Any, ys: Any, rs: List[Union[float, int]],
+                           fluxes: List[Any], flux_errors: List[Any], flags: Optional[Any],
+                           clean_data: Any, exposure: Union[float, int],
+                           headers: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Builds the photometry table of all apertures at once
+
+        Parameters
+        ----------
+        package : str
+            name of the photometry back-end
+        xs : np.ndarray
+            x coordinates
+        ys : np.ndarray
+            y coordinates
+        rs : List[Union[float, int]]
+            apertures
+        fluxes : List[np.ndarray]
+            fluxes of each aperture
+        flux_errors : List[np.ndarray]
+            flux errors of each aperture
+        flags : np.ndarray, optional
+            flags of all apertures
+        clean_data : np.ndarray
+            background rms subtracted data
+        exposure : Union[float, int]
+            exposure time
+        headers : Dict[str, Any]
+            header keys and values to be added
+
+        Returns
+        -------
+        pd.DataFrame
+            photometric data as dataframe
+        """
+        number_of_rows = len(xs) * len(rs)
+
+        ras, decs = self.__radec(xs, ys)
+
+        value = clean_data[xs.astype(int), ys.astype(int)]
+        with np.errstate(invalid="ignore"):
+            snr = np.where(value < 0, np.nan, np.sqrt(value))
+
+        mag, mag_err = self.flux_to_mag(np.concatenate(fluxes), np.concatenate(flux_errors), exposure)
+
+        table = {
+            "image": [abs(self)] * number_of_rows,
+            "package": [package] * number_of_rows,
+            "xcentroid": np.tile(xs, len(rs)),
+            "ycentroid": np.tile(ys, len(rs)),
+            "ra": [None] * number_of_rows if ras is None else np.tile(ras, len(rs)),
+            "dec": [None] * number_of_rows if decs is None else np.tile(decs, len(rs)),
+            "aperture": np.repeat(rs, len(xs)),
+            "flux": np.concatenate(fluxes),
+            "flux_error": np.concatenate(flux_errors),
+            "flag": [None] * number_of_rows if flags is None else flags,
+            "snr": np.tile(snr, len(rs)),
+            "mag": mag,
+            "merr": mag_err,
+        }
+        for key, value in headers.items():
+            table[key] = [value] * number_of_rows
+
+        return pd.DataFrame(table).set_index("image")
+
+    def __radec(self, xs: Any, ys: Any) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Returns the ra and dec of all given pixels using a single WCS
+
+        Parameters
+        ----------
+        xs : np.ndarray
+            x coordinates
+        ys : np.ndarray
+            y coordinates
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            ra and dec in degrees. `(None, None)` if the plate is not solved
+        """
+        try:
+            sky = self.wcs().pixel_to_world(xs, ys)
+            if not isinstance(sky, SkyCoord):
+                raise Unsolvable("Plate is not solved")
+
+            return np.asarray(sky.ra.degree), np.asarray(sky.dec.degree)
+        except Exception as e:
+            self.logger.info(f"Could not get ra, dec. {e}")
+            return None, None
 
     def photometry(self, xs: NUMERICS, ys: NUMERICS, rs: NUMERICS,
                    headers: Optional[Union[str, list[str]]] = None,
-                   exposure: Optional[Union[str, float, int]] = None
+                   exposure: Optional[Union[str, float, int]] = None,
+                   context: Optional[PhotometryContext] = None
                    ) -> pd.DataFrame:
         """
         Does a photometry using both sep and photutils
@@ -1640,6 +2414,9 @@ class Fits(Data):
             Header keys to be extracted after photometry
         exposure: Union[str, float, int], optional
             Header key that contains or a numeric value of exposure time
+        context: PhotometryContext, optional
+            Data, background and error map of the frame. Created if not given.
+            `exposure` is ignored when given
 
         Returns
         -------
@@ -1651,16 +2428,19 @@ class Fits(Data):
         NumberOfElementError
             when `x` and `y` coordinates does not have the same length
         """
+        if context is None:
+            context = self.photometry_context(exposure=exposure)
+
         return pd.concat(
             (self.photometry_sep(
-                xs, ys, rs, headers=headers, exposure=exposure
+                xs, ys, rs, headers=headers, context=context
             ),
              self.photometry_phu(
-                 xs, ys, rs, headers=headers, exposure=exposure
+                 xs, ys, rs, headers=headers, context=context
              ))
         )
 
-    def shift(self, x: int, y: int, output: Optional[str] = None, override: bool = False) -> Self:
+    def shift(self, x: int, y: int, output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Shifts the data of `Fits` object
 
@@ -1694,28 +2474,16 @@ class Fits(Data):
         elif y > 0:
             shifted_data[0:y, :] = set_value
 
-        w = WCS(self.pure_header())
-
-        try:
-            highest = min(self.data().shape)
-            xs = np.random.randint(0, highest, 20)
-            ys = np.random.randint(0, highest, 20)
-
-            skys = w.pixel_to_world(xs.tolist(), ys.tolist())
-            w = fit_wcs_from_points([xs + x, ys + y], skys)
-        except Unsolvable:
-            self.logger.info("No WCS found in header")
-        except AttributeError as e:
-            self.logger.info(e)
+        w = WCSTransform(self.wcs(), logger=self.logger).shift(x, y)
 
         temp_header = Header()
         # temp_header.extend(self.pure_header(), unique=True, update=True)
-        temp_header.extend(w.to_header(), unique=True, update=True)
+        temp_header.extend(w.header(), unique=True, update=True)
         return self.from_data_header(shifted_data, header=temp_header,
                                      output=output, override=override)
 
     def rotate(self, angle: Union[float, int],
-               output: Optional[str] = None, override: bool = False) -> Self:
+               output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Rotates the data of `Fits` object
 
@@ -1739,39 +2507,15 @@ class Fits(Data):
         angle_degree = math.degrees(angle)
         data = ndimage.rotate(self.data(), angle_degree, reshape=False, cval=set_value)
 
-        w = WCS(self.pure_header())
-        try:
-            # cd_matrix = w.wcs.cd
-            shape = self.data().shape
-            highest = min(self.data().shape)
-            xs = np.random.randint(0, highest, 20)
-            ys = np.random.randint(0, highest, 20)
-
-            skys = w.pixel_to_world(xs.tolist(), ys.tolist())
-
-            center = np.array(shape) / 2.0
-            rotation_matrix = np.array([[np.cos(-angle), -np.sin(-angle)],
-                                        [np.sin(-angle), np.cos(-angle)]])
-            translated_coords = np.array([xs, ys]) - center[:, np.newaxis]
-            new_coords = np.dot(rotation_matrix, translated_coords) + center[:, np.newaxis]
-            new_coords = np.round(new_coords).astype(int)
-            new_coords[0] = np.clip(new_coords[0], 0, data.shape[0] - 1)
-            new_coords[1] = np.clip(new_coords[1], 0, data.shape[1] - 1)
-
-            w = fit_wcs_from_points([new_coords[0], new_coords[1]], skys)
-
-        except Unsolvable:
-            self.logger.info("No WCS found in header")
-        except AttributeError as e:
-            self.logger.info(e)
+        w = WCSTransform(self.wcs(), logger=self.logger).rotate(angle, data.shape)
 
         temp_header = Header()
         # temp_header.extend(self.pure_header(), unique=True, update=True)
-        temp_header.extend(w.to_header(), unique=True, update=True)
+        temp_header.extend(w.header(), unique=True, update=True)
         return self.__class__.from_data_header(data, header=temp_header, output=output, override=override)
 
     def crop(self, x: int, y: int, width: int, height: int,
-             output: Optional[str] = None, override: bool = False) -> Self:
+             output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Crop the data of `Fits` object
 
@@ -1804,25 +2548,18 @@ class Fits(Data):
 
         data = self.data()[y:y + height, x:x + width]
 
-        w = WCS(self.pure_header())
-
         if data.size == 0:
             raise IndexError("Out of boundaries")
 
-        try:
-            w = w[y:y + height, x:x + width]
-        except Unsolvable:
-            self.logger.info("No WCS found in header")
-        except AttributeError as e:
-            self.logger.info(e)
+        w = WCSTransform(self.wcs(), logger=self.logger).crop(x, y)
 
         temp_header = Header()
         # temp_header.extend(self.pure_header(), unique=True, update=True)
-        temp_header.extend(w.to_header(), unique=True, update=True)
+        temp_header.extend(w.header(), unique=True, update=True)
         return self.__class__.from_data_header(data, header=temp_header, output=output, override=override)
 
     def bin(self, binning_factor: Union[int, List[int]], func: Callable[[Any], float] = np.mean,
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         """
         Bin the data of `Fits` object
 
@@ -1858,44 +2595,39 @@ class Fits(Data):
             binning_factor_to_use = binning_factor
         try:
             binned_data = block_reduce(self.data(), tuple(binning_factor_to_use), func=func)
-            w = WCS(self.pure_header())
+            w = self.wcs()
         except ValueError:
             raise ValueError("Big value")
 
-        try:
-            highest = min(self.data().shape)
-            xs = np.random.randint(0, highest, 20)
-            ys = np.random.randint(0, highest, 20)
-
-            skys = w.pixel_to_world(xs.tolist(), ys.tolist())
-
-            new_coords = [
-                xs // binning_factor_to_use[0],
-                ys // binning_factor_to_use[1]
-            ]
-
-            w = fit_wcs_from_points([new_coords[0], new_coords[1]], skys)
-        except Unsolvable:
-            self.logger.info("No WCS found in header")
-        except AttributeError as e:
-            self.logger.info(e)
+        # `block_reduce` bins the rows by the first and the columns by the second factor
+        w = WCSTransform(w, logger=self.logger).bin(binning_factor_to_use[1], binning_factor_to_use[0])
 
         temp_header = Header()
         # temp_header.extend(self.pure_header(), unique=True, update=True)
-        temp_header.extend(w.to_header(), unique=True, update=True)
+        temp_header.extend(w.header(), unique=True, update=True)
         return self.__class__.from_data_header(binned_data, header=temp_header, output=output, override=override)
 
     def pixels_to_skys(self, xs: Union[List[Union[int, float]], int, float],
-                       ys: Union[List[Union[int, float]], int, float]) -> pd.DataFrame:
+                       ys: Union[List[Union[int, float]], int, float],
+                       sky: bool = True) -> pd.DataFrame:
         """
         Calculate Sky Coordinate of given Pixel
 
+        Notes
+        -----
+        All coordinates are transformed at once using the cached `WCS` of the
+        file (see `wcs`).
+
         Parameters
         ----------
         xs: Union[List[Union[int, float]], int, float]
             x coordinate(s) of pixel
         ys: Union[List[Union[int, float]], int, float]
             y coordinate(s) of pixel
+        sky: bool, default=True
+            add the `sky` column with a `SkyCoord` for each pixel. Creating
+            these objects takes much longer than the transformation itself.
+            The `ra` and `dec` columns are always added
 
         Returns
         -------
@@ -1912,36 +2644,42 @@ class Fits(Data):
         """
         self.logger.info("Calculating pixels to skys")
 
-        xs_to_use = xs if isinstance(xs, list) else [xs]
-        ys_to_use = ys if isinstance(ys, list) else [ys]
+        xs_to_use = np.atleast_1d(np.asarray(xs, dtype=float))
+        ys_to_use = np.atleast_1d(np.asarray(ys, dtype=float))
 
         if len(xs_to_use) != len(ys_to_use):
             raise ValueError("xs and ys must be equal in length")
 
-        data = []
-
-        w = WCS(self.pure_header())
+        skys = self.wcs().pixel_to_world(xs_to_use, ys_to_use)
+        if not isinstance(skys, SkyCoord):
+            raise Unsolvable("Plate is not solved")
 
-        for x, y in zip(xs_to_use, ys_to_use):
-            sky = w.pixel_to_world(x, y)
-            if not isinstance(sky, SkyCoord):
-                raise Unsolvable("Plate is not solved")
+        data = {
+            "image": [abs(self)] * len(xs_to_use),
+            "xcentroid": xs_to_use,
+            "ycentroid": ys_to_use,
+            "ra": skys.ra.degree,
+            "dec": skys.dec.degree,
+        }
+        if sky:
+            data["sky"] = list(skys)
 
-            data.append([abs(self), x, y, sky])
-
-        return pd.DataFrame(
-            data,
-            columns=["image", "xcentroid", "ycentroid", "sky"]
-        ).set_index("image")
+        return pd.DataFrame(data).set_index("image")
 
     def skys_to_pixels(self, skys: Union[List[SkyCoord], SkyCoord]) -> pd.DataFrame:
         """
         Calculate Pixel Coordinate of given Sky
 
+        Notes
+        -----
+        All coordinates are transformed at once using the cached `WCS` of the
+        file (see `wcs`).
+
         Parameters
         ----------
         skys: Union[List[SkyCoord], SkyCoord]
-            x coordinate(s) of pixel
+            sky coordinate(s). Either a list of `SkyCoord` or a (scalar or
+            array) `SkyCoord`
 
         Returns
         -------
@@ -1956,26 +2694,31 @@ class Fits(Data):
         """
         self.logger.info("Calculating skys to pixels")
 
-        skys_to_use = skys if isinstance(skys, list) else [skys]
-
-        data = []
-
-        w = WCS(self.pure_header())
+        if isinstance(skys, list):
+            skys_to_use = skys
+            coordinates = concatenate(skys)
+        elif skys.isscalar:
+            skys_to_use = [skys]
+            coordinates = skys.reshape((1,))
+        else:
+            skys_to_use = list(skys)
+            coordinates = skys
 
-        for sky in skys_to_use:
-            try:
-                pixels = w.world_to_pixel(sky)
-            except ValueError:
-                raise Unsolvable("Plate is not solved")
-            if np.isnan(pixels).any():
-                raise Unsolvable("Plate is not solved")
+        try:
+            xs, ys = self.wcs().world_to_pixel(coordinates)
+        except ValueError:
+            raise Unsolvable("Plate is not solved")
 
-            data.append([abs(self), sky, float(pixels[0]), float(pixels[1])])
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        if np.isnan(xs).any() or np.isnan(ys).any():
+            raise Unsolvable("Plate is not solved")
 
-        return pd.DataFrame(
-            data,
-            columns=["image", "sky", "xcentroid", "ycentroid"]
-        ).set_index("image")
+        return pd.DataFrame({
+            "image": [abs(self)] * len(skys_to_use),
+            "sky": skys_to_use,
+            "xcentroid": xs,
+            "ycentroid": ys,
+        }).set_index("image")
 
     def map_to_sky(self):
         """
@@ -2018,3 +2761,330 @@ class Fits(Data):
             data["ycentroid"].append(y)
 
         return pd.DataFrame(data)
+
+
+class MemoryFits(Fits):
+    def __init__(self, data: Any, header: Optional[Header] = None,
+                 logger: Optional[Logger] = None) -> None:
+
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        if not isinstance(data, np.ndarray):
+            self.logger.error("Unknown Fits type")
+            raise ValueError("Unknown Fits type.  Maybe its a fits table and not an image.")
+
+        hdu = fts.PrimaryHDU(data=data, header=header)
+        hdu.verify("silentfix")
+
+        self.is_temp = False
+        self.file = Path(Fixer.output(prefix="myraf_memory_"))
+
+        self._data = hdu.data
+        self._header = hdu.header
+        self._wcs: Optional[Tuple[Any, WCS]] = None
+        self._owner: Any = None
+
+        self.ZMag = 25
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The data is pickled with the object, so the owner of a view is not needed
+        state = super().__getstate__()
+        state["_owner"] = None
+        return state
+
+    @classmethod
+    def from_view(cls, data: Any, header: Header, logger: Optional[Logger] = None, owner: Any = None) -> Self:
+        """
+        Creates a `MemoryFits` object on the given array without copying or
+        verifying it
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the data (e.g. a slice of a memory mapped cube)
+        header : Header
+            a header that already describes the data (`SIMPLE`, `BITPIX`,
+            `NAXIS` and `NAXISn`)
+        logger : Logger, optional
+            the logger
+        owner : Any, optional
+            the object holding the data (e.g. a `VideoCube`). It is kept
+            alive as long as the `MemoryFits` object is
+
+        Returns
+        -------
+        MemoryFits
+            a `MemoryFits` object.
+        """
+        fits = cls.__new__(cls)
+        fits.logger = getLogger(f"{cls.__name__}") if logger is None else logger
+        fits.is_temp = False
+        fits.file = Path(Fixer.output(prefix="myraf_memory_"))
+        fits._data = data
+        fits._header = header
+        fits._wcs = None
+        fits._owner = owner
+        fits.ZMag = 25
+        return fits
+
+    @classmethod
+    def from_path(cls, path: str) -> Self:
+        """
+        Creates a `MemoryFits` object by loading the given file `path` into memory
+
+        Parameters
+        ----------
+        path : str
+            path of the file as string
+
+        Returns
+        -------
+        MemoryFits
+            a `MemoryFits` object.
+
+        Raises
+        ------
+        FileNotFoundError
+            when the file does not exist
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"File {path} does not exist")
+
+        with fts.open(path) as hdu:
+            return cls(hdu[0].data, header=hdu[0].header.copy())
+
+    @classmethod
+    def from_data_header(cls, data: Any,
+                         header: Optional[Header] = None,
+                         output: Optional[str] = None,
+                         override: bool = False) -> Fits:
+        """
+        Creates a `MemoryFits` object th give `data` and `header`
+
+        Parameters
+        ----------
+        data : Any
+            the data as `np.ndarray`
+        header : Header
+            the header as `Header`
+        output : str, optional
+            the wanted file path.
+            the data will be kept in memory if it's `None`
+        override : bool, default=False
+            delete already existing file if `true`
+
+        Returns
+        -------
+        Fits
+            a `MemoryFits` object. Or a `Fits` object if `output` is given.
+
+        Raises
+        ------
+        FileExistsError
+            when the file does exist and `override` is `False`
+        """
+        if output is not None:
+            return Fits.from_data_header(data, header=header, output=output, override=override)
+
+        if not cls.high_precision:
+            data_type = Fixer.smallest_data_type(data)
+            data = data.astype(data_type)
+
+        return cls(data, header=header)
+
+    def cards(self, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Returns the keys and values of the in memory header whose values are
+        bool, int, float, or str
+
+        Parameters
+        ----------
+        keys : List[str], optional
+            keys to be returned. All keys are returned if it's `None`
+
+        Returns
+        -------
+        Dict[str, Any]
+            the keys found in the header and their values
+        """
+        header = self._header
+        names = header.keys() if keys is None else [key for key in keys if key in header]
+
+        return {i: header[i] for i in names if isinstance(header[i], (bool, int, float, str))}
+
+    def data(self) -> Any:
+        """
+        returns the in memory data
+
+        Returns
+        -------
+        Any
+            the data as `np.ndarray`
+        """
+        self.logger.info("Getting data")
+
+        return self._data.astype(float)
+
+    def view(self) -> Any:
+        """
+        returns a read-only view of the in memory data in its native data type
+
+        Returns
+        -------
+        Any
+            the data as read-only `np.ndarray`
+        """
+        self.logger.info("Getting data view")
+
+        data = self._data.view()
+        data.flags.writeable = False
+        return data
+
+    def pure_header(self) -> Header:
+        """
+        Returns a copy of the in memory `Header`
+
+        Returns
+        -------
+        Header
+            the Header object
+        """
+        self.logger.info("Getting header (as an astropy header object)")
+
+        return self._header.copy()
+
+    def wcs(self) -> WCS:
+        """
+        Returns the `WCS` of the in memory header
+
+        Notes
+        -----
+        The `WCS` is parsed once and reused until the header is edited. It is
+        shared by all callers and must not be modified.
+
+        Returns
+        -------
+        WCS
+            the WCS of the header
+        """
+        if self._wcs is None or self._wcs[0] is not self._header:
+            self._wcs = (self._header, WCS(self._header))
+
+        return self._wcs[1]
+
+    def ccd(self) -> CCDData:
+        """
+        Returns the CCDData of the in memory data
+
+        Returns
+        -------
+        CDDData
+            the CCDData of the data
+        """
+        self.logger.info("Getting CCDData")
+
+        return CCDData(self.data(), meta=self.pure_header(), unit="adu")
+
+    @contextmanager
+    def header_edit(self) -> Iterator[Header]:
+        """
+        Opens the in memory header for editing. All edits made in the `with`
+        block are kept when the block exits without an error
+
+        Yields
+        ------
+        Header
+            a copy of the in memory header to be edited
+        """
+        header = self._header.copy()
+
+        yield header
+
+        self._header = header
+
+    def flush(self, output: Optional[str] = None, override: bool = False) -> Fits:
+        """
+        Writes the in memory data and header to disk.
+
+        Parameters
+        ----------
+        output: str, optional
+            Path of the new fits file.
+            a temporary file will be created if it's `None`
+        override: bool, default=False
+            If True will overwrite the output if a file is already exists.
+
+        Returns
+        -------
+        Fits
+            `Fits` object of written fits file.
+
+        Raises
+        ------
+        FileExistsError
+            when the file does exist and `override` is `False`
+        """
+        self.logger.info("Flushing the data to disk")
+
+        return Fits.from_data_header(self._data, header=self._header, output=output, override=override)
+
+    def save_as(self, output: str, override: bool = False) -> Fits:
+        """
+        Saves the `MemoryFits` as output.
+
+        Parameters
+        ----------
+        output: str
+            New path to save the file.
+        override: bool, default=False
+            If True will overwrite the new_path if a file is already exists.
+
+        Returns
+        -------
+        Fits
+            New `Fits` object of saved fits file.
+
+        Raises
+        ------
+        FileExistsError
+            when the file does exist and `override` is `False`
+        """
+        self.logger.info("Saving the fits to as")
+
+        return self.flush(output=output, override=override)
+
+    def solve_field(self, api_key: str, solve_timeout: int = 120,
+                    force_image_upload: bool = False,
+                    output: Optional[str] = None, override: bool = False
+                    ) -> Fits:
+        """
+        Solves filed for the in memory data. The data is flushed to a temporary
+        file first since astrometry.net needs a file to upload.
+
+        Parameters
+        ----------
+        api_key: str
+            api_key of astrometry.net (https://nova.astrometry.net/api_help)
+        solve_timeout: int, default=120
+            solve timeout as seconds
+        force_image_upload: bool, default=False
+            If True, upload the image to astrometry.net even if it is possible to detect sources in the image locally.
+        output: str
+            New path to save the file.
+        override: bool, default=False
+            If True will overwrite the new_path if a file is already exists.
+
+        Returns
+        -------
+        Fits
+            `Fits` object of field solved image.
+
+        Raises
+        ------
+        Unsolvable
+            when the data is unsolvable or timeout
+        """
+        return self.flush().solve_field(
+            api_key, solve_timeout=solve_timeout, force_image_upload=force_image_upload,
+            output=output, override=override
+        )
@@ -1,24 +1,25 @@
 from __future__ import annotations
 
 import inspect
+import tempfile
 import warnings
 
 from tqdm import tqdm
 
+from concurrent.futures import Executor
 from glob import glob
+from itertools import repeat
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import List, Union, Any, Optional, Iterator, Dict, Callable
+from typing import List, Union, Any, Optional, Iterator, Dict, Callable, Tuple
 
 import astroalign
-import cv2
 import numpy as np
 import pandas as pd
 from astropy.coordinates import SkyCoord
 from astropy.io.fits.header import Header
 from astropy.nddata import CCDData
 from astropy.time import Time
-from astropy.visualization import ZScaleInterval
 from astropy.wcs import WCS
 from astropy.wcs.utils import fit_wcs_from_points
 from ccdproc import Combiner
@@ -26,10 +27,17 @@ from matplotlib import pyplot as plt, animation
 from sep import Background
 from typing_extensions import Self
 
-from .error import NumberOfElementError, OverCorrection, Unsolvable, NothingToDo
+from .calibration import Calibrator
+from .executor import Job, WorkerPool, submit_all
+from .expression import Expression
+from .error import NumberOfElementError, OverCorrection, Unsolvable, NothingToDo, AlignError
 from .fits import Fits
+from .header_index import HeaderIndex
 from .models import DataArray, NUMERICS
+from .photometry import PHOTOMETRY_DTYPE
+from .player import FramePlayer
 from .utils import Fixer, Check
+from .video import VideoCube, probe, prefetch, read_frames
 
 warnings.filterwarnings('ignore')
 
@@ -37,7 +45,10 @@ __all__ = ["FitsArray"]
 
 
 class FitsArray(DataArray):
-    def __init__(self, fits_list: List[Fits], logger: Optional[Logger] = None, verbose: bool = False) -> None:
+    lazy_arithmetic = False
+
+    def __init__(self, fits_list: List[Fits], logger: Optional[Logger] = None, verbose: bool = False,
+                 workers: int = 1, executor: Optional[Executor] = None, index: Optional[HeaderIndex] = None) -> None:
 
         self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
 
@@ -55,12 +66,26 @@ class FitsArray(DataArray):
 
         self.verbose = verbose
 
+        self.workers = workers
+        if executor is None and workers > 1:
+            executor = WorkerPool(workers, logger=self.logger)
+
+        self.executor = executor
+
+        self.index = index
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(@: '{id(self)}', nof:'{len(self)}')"
 
     def __repr__(self) -> str:
         return self.__str__()
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
     def __iter__(self) -> Iterator[Fits]:
         for x in self.fits_list:
             yield x
@@ -70,7 +95,7 @@ class FitsArray(DataArray):
         if isinstance(key, int):
             return self.fits_list[key]
         elif isinstance(key, slice):
-            return self.__class__(self.fits_list[key])
+            return self.__new(self.fits_list[key])
 
         self.logger.error("Wrong slice")
         raise ValueError("Wrong slice")
@@ -84,61 +109,109 @@ class FitsArray(DataArray):
     def __abs__(self) -> List[str]:
         return [str(fits.file.absolute()) for fits in self]
 
-    def __add__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __add__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, Fits, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() + other
+
         return self.add(other)
 
-    def __radd__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __radd__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+
+        if isinstance(other, Expression):
+            return NotImplemented
 
         if not isinstance(other, (self.__class__, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other + self.lazy()
+
         return self.add(other)
 
-    def __sub__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __sub__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, Fits, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() - other
+
         return self.sub(other)
 
-    def __rsub__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __rsub__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other - self.lazy()
+
         return self.mul(-1).add(other)
 
-    def __mul__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __mul__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, Fits, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() * other
+
         return self.mul(other)
 
-    def __rmul__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __rmul__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other * self.lazy()
+
         return self.mul(other)
 
-    def __truediv__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __truediv__(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, Fits, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return self.lazy() / other
+
         return self.div(other)
 
-    def __rtruediv__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Self:
+    def __rtruediv__(self, other: Union[Self, float, int, List[Union[Fits, float, int]]]) -> Union[Self, Expression]:
+        if isinstance(other, Expression):
+            return NotImplemented
+
         if not isinstance(other, (self.__class__, float, int, List)):
             self.logger.error(f"Other must be either {self.__class__.__name__}, Fits, float or int")
             raise NotImplementedError
 
+        if self.lazy_arithmetic:
+            return other / self.lazy()
+
         return self.div(other).pow(-1)
 
     def __verbosify(self, iterator):
@@ -152,9 +225,89 @@ class FitsArray(DataArray):
 
         return iterator
 
+    def __new(self, fits_list: List[Fits]) -> Self:
+        return self.__class__(fits_list, logger=self.logger, verbose=self.verbose,
+                              workers=self.workers, executor=self.executor, index=self.index)
+
+    def __map(self, method: str, *iterables: Any, shared: Tuple[Any, ...] = (), **kwargs: Any) -> List[Job]:
+        """
+        Creates a job calling `method` of each `Fits` with the positional
+        arguments taken from `iterables` and the shared `kwargs`
+
+        Parameters
+        ----------
+        method : str
+            name of the `Fits` method
+        iterables : Any
+            per file positional arguments
+        shared : Tuple[Any, ...], default=()
+            big arguments to be shipped once per worker process
+        kwargs : Any
+            keyword arguments shared by all files
+
+        Returns
+        -------
+        List[Job]
+            the jobs in the order of the files
+        """
+        arguments = zip(*iterables) if iterables else repeat(())
+        return submit_all(self, method, arguments, kwargs, executor=self.executor, shared=shared)
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes started for `workers`. The
+        `FitsArray` objects made from this one share them. A later batch
+        operation starts them again.
+        """
+        if isinstance(self.executor, WorkerPool):
+            self.executor.shutdown()
+
+    def with_executor(self, executor: Optional[Executor] = None, workers: int = 1) -> Self:
+        """
+        Returns a `FitsArray` of the same files whose batch operations are
+        run by the given `executor` or by `workers` processes
+
+        Parameters
+        ----------
+        executor : Executor, optional
+            an executor (e.g. `ProcessPoolExecutor`) to submit per-file jobs to
+        workers : int, default=1
+            number of processes to use when no executor is given
+
+        Returns
+        -------
+        FitsArray
+            a `FitsArray` sharing the same `Fits` objects
+        """
+        return self.__class__(self.fits_list, logger=self.logger, verbose=self.verbose,
+                              workers=workers, executor=executor, index=self.index)
+
+    def with_index(self, index: Optional[Union[str, HeaderIndex]] = None) -> Self:
+        """
+        Returns a `FitsArray` of the same files whose headers are answered
+        from the given header index
+
+        Parameters
+        ----------
+        index : Union[str, HeaderIndex], optional
+            a `HeaderIndex` or the path of its SQLite file. The index is
+            detached if it's `None`
+
+        Returns
+        -------
+        FitsArray
+            a `FitsArray` sharing the same `Fits` objects
+        """
+        if isinstance(index, (str, Path)):
+            index = HeaderIndex(index, logger=self.logger)
+
+        return self.__class__(self.fits_list, logger=self.logger, verbose=self.verbose,
+                              workers=self.workers, executor=self.executor, index=index)
+
     @classmethod
     def from_video(cls, path: str, start_time: Optional[Union[Time, float]] = None,
-                   logger: Optional[Logger] = None, verbose: bool = False) -> Self:
+                   logger: Optional[Logger] = None, verbose: bool = False, cube: bool = False,
+                   output: Optional[str] = None, background: bool = False) -> Self:
         """
         Creates a `FitsArray` from frames of a video.
 
@@ -168,6 +321,15 @@ class FitsArray(DataArray):
             The logger
         verbose: bool, default=False
             Show more
+        cube: bool, default=False
+            stream the frames into a single 3D fits cube (see `VideoCube`)
+            and return `MemoryFits` views of its slices instead of writing a
+            file per frame
+        output: str, optional
+            path of the cube. A temporary file is created if it's `None`.
+            Ignored if `cube` is `False`
+        background: bool, default=False
+            decode the frames on a background thread while they are written
 
         Returns
         -------
@@ -178,43 +340,50 @@ class FitsArray(DataArray):
         ------
         FileNotFoundError
             when the file does not exist
+        NumberOfElementError
+            when no frame could be read
         """
         Fits.high_precision = cls.high_precision
 
+        logger = getLogger(cls.__name__) if logger is None else logger
+
         if not Path(path).exists():
+            logger.error(f"{path} does not exist")
             raise FileNotFoundError(f"{path} does not exist")
 
-        cap = cv2.VideoCapture(path)
-        frames = []
-        success, frame = cap.read()
-        fps = cap.get(cv2.CAP_PROP_FPS)
+        if cube:
+            video_cube = VideoCube.from_video(
+                path, output=output, start_time=start_time, background=background, logger=logger
+            )
+            cube_frames: List[Fits] = list(video_cube.frames())
+            return cls(cube_frames, logger=logger, verbose=verbose)
+
+        fps, _, _, _ = probe(path)
 
         if isinstance(start_time, Time):
-            frame_number = start_time.jd
+            first = start_time.jd
         elif isinstance(start_time, float):
-            frame_number = start_time
+            first = start_time
         else:
-            frame_number = 0
+            first = 0
 
-        while success:
-            try:
-                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                data = np.array(gray_frame)
-                fits_frame = Fits.from_data_header(data)
-                fits_frame.hedit(["MY-RELJD", "MY-EXPTM"], [frame_number / (fps * 86400), 1 / fps])
-                frames.append(fits_frame)
-                success, frame = cap.read()
-            except Exception:
-                pass
+        frames = read_frames(path, logger)
+        if background:
+            frames = prefetch(frames, 64)
 
-            frame_number += 1
+        fits_frames = []
+        for number, frame in frames:
+            if frame is None:
+                continue
 
-        cap.release()
+            header = Header({"MY-RELJD": (first + number) / (fps * 86400), "MY-EXPTM": 1 / fps})
+            fits_frames.append(Fits.from_data_header(np.array(frame), header=header))
 
-        return cls(frames, logger=logger, verbose=verbose)
+        return cls(fits_frames, logger=logger, verbose=verbose)
 
     @classmethod
-    def from_paths(cls, paths: List[str], logger: Optional[Logger] = None, verbose: bool = False) -> Self:
+    def from_paths(cls, paths: List[str], logger: Optional[Logger] = None, verbose: bool = False,
+                   index: Optional[Union[str, HeaderIndex]] = None) -> Self:
         """
         Create a `FitsArray` from paths as list of strings
 
@@ -226,6 +395,9 @@ class FitsArray(DataArray):
             The logger
         verbose: bool, default=False
             Show more
+        index: Union[str, HeaderIndex], optional
+            a `HeaderIndex` or the path of its SQLite file to answer header
+            queries from
 
         Returns
         -------
@@ -246,10 +418,14 @@ class FitsArray(DataArray):
             except FileNotFoundError:
                 pass
 
-        return cls(files, logger=logger, verbose=verbose)
+        if isinstance(index, (str, Path)):
+            index = HeaderIndex(index, logger=logger)
+
+        return cls(files, logger=logger, verbose=verbose, index=index)
 
     @classmethod
-    def from_pattern(cls, pattern: str, logger: Optional[Logger] = None, verbose: bool = False) -> Self:
+    def from_pattern(cls, pattern: str, logger: Optional[Logger] = None, verbose: bool = False,
+                     index: Optional[Union[str, HeaderIndex]] = None) -> Self:
         """
         Create a `FitsArray` from patterns
 
@@ -261,6 +437,9 @@ class FitsArray(DataArray):
             The logger
         verbose: bool, default=False
             Show more
+        index: Union[str, HeaderIndex], optional
+            a `HeaderIndex` or the path of its SQLite file to answer header
+            queries from
 
         Returns
         -------
@@ -272,7 +451,7 @@ class FitsArray(DataArray):
         NumberOfElementError
             when the number of fits files is 0
         """
-        return cls.from_paths(glob(pattern), logger=logger, verbose=verbose)
+        return cls.from_paths(glob(pattern), logger=logger, verbose=verbose, index=index)
 
     @classmethod
     def sample(cls, numer_of_samples: int = 10, logger: Optional[Logger] = None, verbose: bool = False) -> Self:
@@ -342,10 +521,22 @@ class FitsArray(DataArray):
 
         self.fits_list.append(other)
 
-    def header(self) -> pd.DataFrame:
+    def header(self, keys: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Returns headers of the fits files
 
+        Parameters
+        ----------
+        keys : List[str], optional
+            keys to be returned. All keys are returned if it's `None`
+
+        Notes
+        -----
+        - If a `HeaderIndex` is attached the headers are answered from it and
+          only the files changed since they were indexed are read.
+        - When `keys` is given each header is scanned only up to the `END`
+          card and only the given keys are parsed (see `Fits.header`).
+
         Returns
         -------
         pd.DataFrame
@@ -353,15 +544,24 @@ class FitsArray(DataArray):
         """
         self.logger.info("Getting header")
 
-        headers = []
+        if self.index is not None:
+            headers = self.index.header(abs(self))
+            if keys is None:
+                return headers
 
-        for fits in self.__verbosify(self):
+            return headers[[key for key in dict.fromkeys(keys) if key in headers.columns]]
+
+        cards = []
+        images = []
+
+        for fits, job in zip(self.__verbosify(self), self.__map("cards", keys=keys)):
             try:
-                headers.append(fits.header())
+                cards.append(job.result())
+                images.append(abs(fits))
             except Exception as e:
                 self.logger.warning(e)
 
-        return pd.concat(headers)
+        return pd.DataFrame.from_records(cards, index=pd.Index(images, name="image"))
 
     def data(self) -> List[Any]:
         """
@@ -412,6 +612,75 @@ class FitsArray(DataArray):
             data, columns=["image", "value"]
         ).set_index("image")
 
+    def values(self, xs: List[int], ys: List[int]) -> pd.DataFrame:
+        """
+        Returns a table of values of asked coordinates
+
+        Parameters
+        ----------
+        xs : List[int]
+            x coordinates of asked pixels
+        ys: List[int]
+            y coordinates of asked pixels
+
+        Returns
+        -------
+        pd.DataFrame
+            table of values of asked coordinates
+
+        Raises
+        ------
+        ValueError
+            when the length of xs and ys is not equal
+        """
+        self.logger.info("Getting values")
+
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must be equal in length")
+
+        values = []
+        for fits in self.__verbosify(self):
+            try:
+                values.append(fits.values(xs, ys))
+            except IndexError as error:
+                self.logger.info(error)
+
+        if len(values) < 1:
+            return pd.DataFrame([], columns=["image", "x", "y", "value"]).set_index("image")
+
+        return pd.concat(values)
+
+    def cutout(self, x: int, y: int, width: int, height: int) -> List[Any]:
+        """
+        Returns a region of the data of fits files without reading the whole data
+
+        Parameters
+        ----------
+        x : int
+            x coordinate of top left
+        y : int
+            y coordinate of top left
+        width : int
+            width of the region
+        height : int
+            height of the region
+
+        Returns
+        -------
+        List[Any]
+            the list of regions as `np.ndarray`
+        """
+        self.logger.info("Getting cutouts")
+
+        data = []
+        for fits in self.__verbosify(self):
+            try:
+                data.append(fits.cutout(x, y, width, height))
+            except IndexError as error:
+                self.logger.info(error)
+
+        return data
+
     def pure_header(self) -> List[Header]:
         """
         Returns the `Header` of the files
@@ -470,8 +739,8 @@ class FitsArray(DataArray):
         self.logger.info("Calculating image statistics")
 
         stats = []
-        for fits in self.__verbosify(self):
-            stats.append(fits.imstat())
+        for fits, job in zip(self.__verbosify(self), self.__map("imstat")):
+            stats.append(job.result())
 
         return pd.concat(stats)
 
@@ -513,6 +782,45 @@ class FitsArray(DataArray):
 
         return self
 
+    def hedit_many(self, cards: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Self:
+        """
+        Sets many header cards of each file at once. Each header is read and
+        written once (see `Fits.header_edit`)
+
+        Parameters
+        ----------
+        cards : Union[Dict[str, Any], List[Dict[str, Any]]]
+            keys and values to be set. Either one mapping for all files or a
+            mapping per file. A value can be a `(value, comment)` tuple. The
+            key is deleted if the value is `None`
+
+        Returns
+        -------
+        FitsArray
+            the same `FitsArray` object.
+
+        Raises
+        ------
+        NumberOfElementError
+            when the number of mappings and files are not equal
+        """
+        self.logger.info("Editing header")
+
+        if isinstance(cards, dict):
+            cards = [cards] * len(self)
+
+        if len(cards) != len(self):
+            self.logger.error("Number of Fits must be equal to number of mappings")
+            raise NumberOfElementError("Number of Fits must be equal to number of mappings")
+
+        for fits, each in zip(self.__verbosify(self), cards):
+            try:
+                fits.hedit_many(each)
+            except Exception as error:
+                self.logger.error(error)
+
+        return self
+
     def hselect(self, fields: Union[str, List[str]]) -> pd.DataFrame:
         """
         returns data frame containing wanted keys
@@ -532,13 +840,13 @@ class FitsArray(DataArray):
         if isinstance(fields, str):
             fields = [fields]
 
-        headers = self.header()
-        fields_to_use = [field for field in fields if field in headers.columns]
+        headers = self.header(keys=fields)
+        fields_to_use = [field for field in dict.fromkeys(fields) if field in headers.columns]
 
         if len(fields_to_use) < 1:
             return pd.DataFrame()
 
-        return self.header()[fields_to_use]
+        return headers[fields_to_use]
 
     def save_as(self, output: str) -> Self:
         """
@@ -571,7 +879,7 @@ class FitsArray(DataArray):
             copied = fits.save_as(output_fit)
             fits_array.append(copied)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def __prepare_weights(self,
                           weights: Optional[Union[List[str], List[Union[float, int]]]] = None
@@ -641,6 +949,23 @@ class FitsArray(DataArray):
 
         return other_to_use
 
+    def lazy(self) -> Expression:
+        """
+        Returns the `FitsArray` as a lazily evaluated `Expression`
+
+        Notes
+        -----
+        Arithmetic operators on the expression only build the expression.
+        It is evaluated for each file in a single blocked pass when `compute`,
+        `save_as` or `data` of the expression is called.
+
+        Returns
+        -------
+        Expression
+            the expression of this `FitsArray`
+        """
+        return Expression.wrap(self, logger=self.logger)
+
     def add(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
             output: Optional[str] = None) -> Self:
         """
@@ -681,14 +1006,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self.__verbosify(self), other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("add", other_to_use, outputs)):
             try:
-                result = fits.add(the_other, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def sub(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
             output: Optional[str] = None) -> Self:
@@ -732,14 +1057,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self.__verbosify(self), other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("sub", other_to_use, outputs)):
             try:
-                result = fits.sub(the_other, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def mul(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
             output: Optional[str] = None) -> Self:
@@ -783,14 +1108,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self.__verbosify(self), other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("mul", other_to_use, outputs)):
             try:
-                result = fits.mul(the_other, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def div(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
             output: Optional[str] = None) -> Self:
@@ -834,14 +1159,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self.__verbosify(self), other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("div", other_to_use, outputs)):
             try:
-                result = fits.div(the_other, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def pow(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
             output: Optional[str] = None) -> Self:
@@ -885,14 +1210,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self, other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("pow", other_to_use, outputs)):
             try:
-                result = fits.pow(the_other, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def imarith(self, other: Union[Self, Fits, float, int, List[Union[Fits, float, int]]],
                 operand: str, output: Optional[str] = None) -> Self:
@@ -938,14 +1263,14 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, the_other, output_fit in zip(self.__verbosify(self), other_to_use, outputs):
+        for fits, job in zip(self.__verbosify(self), self.__map("imarith", other_to_use, repeat(operand), outputs)):
             try:
-                result = fits.imarith(the_other, operand, output_fit)
+                result = job.result()
                 fits_array.append(result)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def shift(self, xs: Union[List[int], int], ys: Union[List[int], int],
               output: Optional[str] = None) -> Self:
@@ -991,15 +1316,14 @@ class FitsArray(DataArray):
         fits_array = []
         outputs = Fixer.outputs(output, self)
 
-        for fits, output_fit, x, y in zip(self.__verbosify(self), outputs, to_x_shift,
-                                          to_y_shift):
+        for fits, job in zip(self.__verbosify(self), self.__map("shift", to_x_shift, to_y_shift, outputs)):
             try:
-                shifted = fits.shift(x, y, output_fit)
+                shifted = job.result()
                 fits_array.append(shifted)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def rotate(self, angle: Union[List[Union[float, int]], float, int],
                output: Optional[str] = None) -> Self:
@@ -1035,15 +1359,15 @@ class FitsArray(DataArray):
         fits_array = []
         outputs = Fixer.outputs(output, self)
 
-        for fits, output_fit, ang in zip(self.__verbosify(self), outputs, to_rotate):
+        for fits, job in zip(self.__verbosify(self), self.__map("rotate", to_rotate, outputs)):
 
             try:
-                rotated = fits.rotate(ang, output=output_fit)
+                rotated = job.result()
                 fits_array.append(rotated)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def crop(self, xs: Union[List[int], int], ys: Union[List[int], int],
              widths: Union[List[int], int], heights: Union[List[int], int],
@@ -1111,18 +1435,17 @@ class FitsArray(DataArray):
         fits_array = []
         outputs = Fixer.outputs(output, self)
 
-        for fits, output_fit, x, y, w, h in zip(
-                self.__verbosify(self), outputs, to_x_crop, to_y_crop, to_w_crop, to_h_crop
-        ):
+        jobs = self.__map("crop", to_x_crop, to_y_crop, to_w_crop, to_h_crop, outputs)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                cropped = fits.crop(x, y, w, h, output_fit)
+                cropped = job.result()
                 fits_array.append(cropped)
             except IndexError as error:
                 self.logger.info(error)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def bin(self, binning_factor: Union[int, List[int]], func: Callable[[Any], float] = np.mean,
             output: Optional[str] = None) -> Self:
@@ -1156,16 +1479,17 @@ class FitsArray(DataArray):
         fits_array = []
         outputs = Fixer.outputs(output, self)
 
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("bin", repeat(binning_factor), repeat(func), outputs)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                binned = fits.bin(binning_factor, func=func, output=output_fit)
+                binned = job.result()
                 fits_array.append(binned)
             except ValueError as error:
                 self.logger.info(error)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def align(self, reference: Union[Fits, int] = 0, output: Optional[str] = None,
               max_control_points: int = 50, min_area: int = 5) -> Self:
@@ -1191,6 +1515,11 @@ class FitsArray(DataArray):
         -------
         FitsArray
             `FitsArray` object of aligned images.
+
+        Raises
+        ------
+        AlignError
+            when not enough sources are found on the reference
         """
         self.logger.info("Aligning all images")
 
@@ -1207,19 +1536,23 @@ class FitsArray(DataArray):
             self.logger.error("reference cannot be FitsArray")
             raise ValueError(" reference cannot be FitsArray")
 
+        try:
+            aligner = the_reference.aligner(max_control_points=max_control_points, min_area=min_area)
+        except Exception as error:
+            self.logger.error(error)
+            raise AlignError(error)
+
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("align", repeat(aligner), outputs, shared=(aligner,))
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                aligned = fits.align(the_reference, output_fit,
-                                     max_control_points=max_control_points,
-                                     min_area=min_area
-                                     )
+                aligned = job.result()
                 fits_array.append(aligned)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def solve_field(self, api_key: str, reference: Union[Fits, int] = 0,
                     solve_timeout: int = 120, force_image_upload: bool = False,
@@ -1316,7 +1649,7 @@ class FitsArray(DataArray):
             except AttributeError as e:
                 self.logger.info(e)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def zero_correction(self, master_zero: Fits, output: Optional[str] = None,
                         force: bool = False) -> Self:
@@ -1341,18 +1674,17 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("zero_correction", repeat(master_zero), outputs, force=force)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                zero_corrected = fits.zero_correction(master_zero,
-                                                      output=output_fit,
-                                                      force=force)
+                zero_corrected = job.result()
                 fits_array.append(zero_corrected)
             except OverCorrection:
                 fits_array.append(fits)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def dark_correction(self, master_dark: Fits, exposure: Optional[str] = None,
                         output: Optional[str] = None, force: bool = False) -> Self:
@@ -1380,19 +1712,17 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("dark_correction", repeat(master_dark), repeat(exposure), outputs, force=force)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                dark_corrected = fits.dark_correction(master_dark,
-                                                      exposure=exposure,
-                                                      output=output_fit,
-                                                      force=force)
+                dark_corrected = job.result()
                 fits_array.append(dark_corrected)
             except OverCorrection:
                 fits_array.append(fits)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def flat_correction(self, master_flat: Fits, output: Optional[str] = None,
                         force: bool = False) -> Self:
@@ -1417,24 +1747,24 @@ class FitsArray(DataArray):
 
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("flat_correction", repeat(master_flat), outputs, force=force)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                flat_corrected = fits.flat_correction(master_flat,
-                                                      output=output_fit,
-                                                      force=force)
+                flat_corrected = job.result()
                 fits_array.append(flat_corrected)
             except OverCorrection:
                 fits_array.append(fits)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def ccdproc(self, master_zero: Optional[Fits] = None, master_dark: Optional[Fits] = None,
                 master_flat: Optional[Fits] = None, exposure: Optional[str] = None, output: Optional[str] = None,
                 force: bool = False) -> Self:
         """
-        Does ccd correction of the data
+        Does ccd correction of the data. The masters are read and validated
+        once and shared by all files.
 
         Parameters
         ----------
@@ -1461,21 +1791,22 @@ class FitsArray(DataArray):
         if all(each is None for each in [master_zero, master_dark, master_flat]):
             raise NothingToDo("None of master Zero, Dark, or Flat is not provided")
 
+        calibrator = Calibrator(master_zero, master_dark, master_flat, exposure=exposure, logger=self.logger)
+
         fits_array = []
         outputs = Fixer.outputs(output, self)
-        for fits, output_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map("ccdproc", repeat(None), repeat(None), repeat(None), repeat(None), outputs,
+                          shared=(calibrator,), force=force, calibrator=calibrator)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                ccd_corrected = fits.ccdproc(
-                    master_zero=master_zero, master_dark=master_dark, master_flat=master_flat,
-                    exposure=exposure, output=output_fit, force=force
-                )
+                ccd_corrected = job.result()
                 fits_array.append(ccd_corrected)
             except OverCorrection:
                 fits_array.append(fits)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(fits_array)
 
     def background(self) -> List[Background]:
         """
@@ -1584,9 +1915,10 @@ class FitsArray(DataArray):
         self.logger.info("Doing photometry (sep) on the image")
 
         photometry = []
-        for fits in self.__verbosify(self):
+        jobs = self.__map("photometry_sep", repeat(xs), repeat(ys), repeat(rs), headers=headers, exposure=exposure)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                phot = fits.photometry_sep(xs, ys, rs, headers=headers, exposure=exposure)
+                phot = job.result()
                 photometry.append(phot)
             except NumberOfElementError:
                 self.logger.error("The length of Xs and Ys must be equal")
@@ -1632,9 +1964,10 @@ class FitsArray(DataArray):
         self.logger.info("Doing photometry (photutils) on the image")
 
         photometry = []
-        for fits in self.__verbosify(self):
+        jobs = self.__map("photometry_phu", repeat(xs), repeat(ys), repeat(rs), headers=headers, exposure=exposure)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                phot = fits.photometry_phu(xs, ys, rs, headers=headers, exposure=exposure)
+                phot = job.result()
                 photometry.append(phot)
             except NumberOfElementError:
                 self.logger.error("The length of Xs and Ys must be equal")
@@ -1678,9 +2011,10 @@ class FitsArray(DataArray):
             when `x` and `y` coordinates does not have the same length
         """
         photometry = []
-        for fits in self.__verbosify(self):
+        jobs = self.__map("photometry", repeat(xs), repeat(ys), repeat(rs), headers=headers, exposure=exposure)
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                phot = fits.photometry(xs, ys, rs, headers=headers, exposure=exposure)
+                phot = job.result()
                 photometry.append(phot)
             except Exception as error:
                 self.logger.error(error)
@@ -1690,6 +2024,108 @@ class FitsArray(DataArray):
 
         return pd.concat(photometry)
 
+    def photometry_batch(self, xs: NUMERICS, ys: NUMERICS, rs: NUMERICS,
+                         headers: Optional[Union[str, list[str]]] = None,
+                         exposure: Optional[Union[str, float, int]] = None,
+                         package: str = "sep", raw: bool = False) -> Union[pd.DataFrame, Any]:
+        """
+        Does a photometry of the same stars on all files and collects the
+        results in a single preallocated array
+
+        Notes
+        -----
+        The coordinates and apertures are validated once. The results are
+        written into a structured array of shape (number of files, number of
+        stars, number of apertures) and a single dataframe is built at the end.
+        The rows of failed files are `nan` in the array and are dropped from
+        the dataframe.
+
+        Parameters
+        ----------
+        xs: Union[float, int, List[Union[float, int]]]
+            x coordinate(s)
+        ys: Union[float, int, List[Union[float, int]]]
+            y coordinate(s)
+        rs: Union[float, int, List[Union[float, int]]]
+            aperture(s)
+        headers: Union[str, list[str]], optional
+            Header keys to be extracted after photometry. Ignored if `raw` is `True`
+        exposure: Union[str, float, int], optional
+            Header key that contains or a numeric value of exposure time
+        package: str, default="sep"
+            photometry back-end. Either sep or phu
+        raw: bool, default=False
+            return the structured array instead of a dataframe
+
+        Returns
+        -------
+        Union[pd.DataFrame, np.ndarray]
+            photometric data as dataframe, or as structured array if `raw` is `True`
+
+        Raises
+        ------
+        NumberOfElementError
+            when `x` and `y` coordinates does not have the same length
+        ValueError
+            when the package is not either of sep, or phu
+        """
+        self.logger.info(f"Doing batch photometry ({package}) on the images")
+
+        if package not in ["sep", "phu"]:
+            self.logger.error("Package can only be one of these: sep, phu")
+            raise ValueError("Package can only be one of these: sep, phu")
+
+        new_xs, new_ys = Fixer.coordinate(xs, ys)
+        new_rs = Fixer.aperture(rs)
+        xs_array = np.asarray(new_xs, dtype=float)
+        ys_array = np.asarray(new_ys, dtype=float)
+
+        result = np.zeros((len(self), len(xs_array), len(new_rs)), dtype=PHOTOMETRY_DTYPE)
+        succeeded = np.zeros(len(self), dtype=bool)
+
+        jobs = self.__map("photometry_arrays", repeat(xs_array), repeat(ys_array), repeat(new_rs),
+                          package=package, exposure=exposure)
+        for i, (fits, job) in enumerate(zip(self.__verbosify(self), jobs)):
+            try:
+                result[i] = job.result()
+                succeeded[i] = True
+            except Exception as error:
+                for field in PHOTOMETRY_DTYPE.names or ():
+                    if field != "flag":
+                        result[i][field] = np.nan
+                self.logger.error(error)
+
+        if raw:
+            return result
+
+        if not succeeded.any():
+            return pd.DataFrame()
+
+        rows = result[succeeded].transpose(0, 2, 1).reshape(-1)
+        rows_per_file = len(xs_array) * len(new_rs)
+
+        table: Dict[str, Any] = {
+            "image": np.repeat([abs(fits) for fits, ok in zip(self, succeeded) if ok], rows_per_file),
+            "package": [package] * len(rows),
+        }
+        for field in PHOTOMETRY_DTYPE.names or ():
+            table[field] = rows[field]
+
+        if package == "phu":
+            table["flag"] = [None] * len(rows)
+
+        new_headers = Fixer.header(headers)
+        if new_headers:
+            the_headers = self.header(keys=new_headers)
+            for key in new_headers:
+                values = [
+                    the_headers[key].get(abs(fits)) if key in the_headers.columns else None
+                    for fits, ok in zip(self, succeeded) if ok
+                ]
+                table[key] = np.repeat(np.array(values, dtype=object), rows_per_file)
+
+        return pd.DataFrame(table).infer_objects().set_index("image")
+
     def cosmic_clean(self, output: Optional[str] = None,
                      override: bool = False, sigclip: float = 4.5,
                      sigfrac: float = 0.3, objlim: int = 5, gain: float = 1.0,
@@ -1697,8 +2133,9 @@ class FitsArray(DataArray):
                      niter: int = 4, sepmed: bool = True,
                      cleantype: str = 'meanmask', fsmode: str = 'median',
                      psfmodel: str = 'gauss', psffwhm: float = 2.5,
-                     psfsize: int = 7, psfk: Any = Optional[Any],
-                     psfbeta: float = 4.765, gain_apply: bool = True) -> Self:
+                     psfsize: int = 7, psfk: Optional[Any] = None,
+                     psfbeta: float = 4.765, gain_apply: bool = True,
+                     tile_size: Optional[int] = None, tile_workers: int = 1) -> Self:
         """
         Clears cosmic rays from the fits files
 
@@ -1793,6 +2230,13 @@ class FitsArray(DataArray):
             If True, return gain-corrected data, with correct units,
             otherwise do not gain-correct the data.
             Default is True to preserve backwards compatibility. see [1]
+        tile_size: int, optional
+            If given, each image is cleaned in tiles of `tile_size` x
+            `tile_size` pixels with an overlapping halo. The result is the
+            same as cleaning the whole image.
+        tile_workers: int, default=1
+            Number of processes to clean the tiles of each image in. Ignored
+            if `tile_size` is not given.
 
         Returns
         -------
@@ -1803,34 +2247,47 @@ class FitsArray(DataArray):
 
         outputs = Fixer.outputs(output, self)
         clean_fits_array = []
-        for fits, out_fit in zip(self.__verbosify(self), outputs):
+        jobs = self.__map(
+            "cosmic_clean", outputs,
+            override=override, sigclip=sigclip, sigfrac=sigfrac,
+            objlim=objlim, gain=gain, readnoise=readnoise,
+            satlevel=satlevel, niter=niter, sepmed=sepmed,
+            cleantype=cleantype, fsmode=fsmode, psfmodel=psfmodel,
+            psffwhm=psffwhm, psfsize=psfsize, psfk=psfk,
+            psfbeta=psfbeta,
+            gain_apply=gain_apply, tile_size=tile_size, workers=tile_workers
+        )
+        for fits, job in zip(self.__verbosify(self), jobs):
             try:
-                clean_fits = fits.cosmic_clean(
-                    out_fit,
-                    override=override, sigclip=sigclip, sigfrac=sigfrac,
-                    objlim=objlim, gain=gain, readnoise=readnoise,
-                    satlevel=satlevel, niter=niter, sepmed=sepmed,
-                    cleantype=cleantype, fsmode=fsmode, psfmodel=psfmodel,
-                    psffwhm=psffwhm, psfsize=psfsize, psfk=psfk,
-                    psfbeta=psfbeta,
-                    gain_apply=gain_apply
-                )
+                clean_fits = job.result()
                 clean_fits_array.append(clean_fits)
             except Exception as error:
                 self.logger.error(error)
 
-        return self.__class__(clean_fits_array, logger=self.logger, verbose=self.verbose)
+        return self.__new(clean_fits_array)
 
-    def show(self, scale: bool = True, interval: float = 1.0) -> None:
+    def show(self, scale: bool = True, interval: float = 1.0, buffer: int = 16, zscale_every: int = 0) -> None:
         """
         Shows the Images using matplotlib.
 
+        Notes
+        -----
+        The frames are read and scaled ahead of time by a `FramePlayer` on a
+        background thread. The zscale limits are computed from the first
+        frame (or every `zscale_every` frames) and each frame is converted
+        to an 8-bit image.
+
         Parameters
         ----------
         scale: bool, optional
             Scales the Image if True.
         interval: float, default=1
             The interval of the animation
+        buffer: int, default=16
+            maximum number of frames prepared ahead of time
+        zscale_every: int, default=0
+            recompute the zscale limits every `zscale_every` frames. The
+            limits of the first frame are used for all frames if it's `0`
         """
         self.logger.info("Showing all images")
 
@@ -1838,27 +2295,28 @@ class FitsArray(DataArray):
         plt.rcParams['figure.dpi'] = 150
         plt.ioff()
 
-        fig = plt.figure()
+        player = FramePlayer(self, buffer=buffer, scale=scale, zscale_every=zscale_every, logger=self.logger)
+        frames = player.frames()
 
-        if scale:
-            zscale = ZScaleInterval()
-        else:
-            def zscale(x):
-                return x
+        fig = plt.figure()
 
-        im = plt.imshow(zscale(self[0].data()), cmap="Greys_r", animated=True)
+        _, _, first = next(frames)
+        im = plt.imshow(first, cmap="Greys_r", animated=True, vmin=0 if scale else None, vmax=255 if scale else None)
         plt.xticks([])
         plt.yticks([])
 
-        def updatefig(args):
-            im.set_array(zscale(self[args % len(self)].data()))
+        def updatefig(frame):
+            im.set_array(frame[2])
             return im,
 
         _ = animation.FuncAnimation(
-            fig, updatefig, interval=interval, blit=True,
+            fig, updatefig, frames=frames, interval=interval, blit=True,
             cache_frame_data=False
         )
-        plt.show()
+        try:
+            plt.show()
+        finally:
+            player.stop()
 
     def group_by(self, groups: Union[str, List[str]]) -> Dict[Any, Self]:
         """
@@ -1882,24 +2340,34 @@ class FitsArray(DataArray):
         if len(groups) < 1:
             return dict()
 
-        headers = self.header()
+        headers = self.header(keys=groups)
 
         for group in groups:
             if group not in headers.columns:
                 headers[group] = "N/A"
 
+        by_path = {abs(fits): fits for fits in self}
+
         grouped = {}
         for keys, df in headers.fillna("N/A").groupby(groups, dropna=False):
-            grouped[keys] = self.__class__.from_paths(df.index.tolist(), logger=self.logger, verbose=self.verbose)
+            grouped[keys] = self.__new([by_path[path] for path in df.index])
 
         return grouped
 
     def combine(self, method: str = "average", clipping: Optional[str] = None,
                 weights: Optional[List[Union[float, int]]] = None,
-                output: Optional[str] = None, override: bool = False) -> Fits:
+                output: Optional[str] = None, override: bool = False,
+                mem_limit: float = 1e9) -> Fits:
         """
         Combines FitsArray to a Fits
 
+        Notes
+        -----
+        The images are not loaded at once. Strips of rows are read from each
+        file and combined one after another so the stack of strips stays
+        under `mem_limit`. All methods and clippings work pixel by pixel, so
+        the result is the same as combining the whole images.
+
         Parameters
         ----------
         method : str
@@ -1912,6 +2380,8 @@ class FitsArray(DataArray):
             New path to save the files.
         override : bool, default=False
             delete already existing file if `true`
+        mem_limit : float, default=1e9
+            maximum memory in bytes to be used for the stack of strips
 
         Returns
         -------
@@ -1926,12 +2396,12 @@ class FitsArray(DataArray):
             when the method is not either of average, mean, median, or sum
         ValueError
             when the clipping is not either of sigma, or minmax
+        ValueError
+            when the images do not have the same shape
         """
         Check.method(method)
         Check.clipping(clipping)
 
-        combiner = Combiner(self.ccd())
-
         if weights is None:
             weights = [1] * len(self)
 
@@ -1939,6 +2409,55 @@ class FitsArray(DataArray):
             self.logger.error("Length of weights must be equal to number of Fits")
             raise ValueError("Length of weights must be equal to number of Fits")
 
+        # The shapes are read from the headers, so no image is read before its strips
+        shapes = set()
+        for fits in self:
+            cards = fits.cards(keys=["NAXIS", "NAXIS1", "NAXIS2"])
+            shapes.add((cards.get("NAXIS", 0), cards.get("NAXIS2", 0), cards.get("NAXIS1", 0)))
+
+        if len(shapes) != 1:
+            self.logger.error("All images must have the same shape")
+            raise ValueError("All images must have the same shape")
+
+        naxis, height, width = shapes.pop()
+        if naxis != 2:
+            self.logger.error("Only 2D images can be combined")
+            raise ValueError("Only 2D images can be combined")
+
+        with tempfile.TemporaryFile() as buffer:
+            combined = np.memmap(buffer, dtype=float, mode="w+", shape=(height, width))
+            for start, stop in self.__verbosify(Fixer.strips(height, width, len(self), mem_limit)):
+                combined[start:stop] = self.__combine_strip(
+                    [fits.cutout(0, start, width, stop - start) for fits in self],
+                    method, clipping, weights
+                )
+
+            return Fits.from_data_header(data=combined, output=output, override=override)
+
+    @staticmethod
+    def __combine_strip(strips: List[Any], method: str, clipping: Optional[str],
+                        weights: List[Union[float, int]]) -> Any:
+        """
+        Combines the same strip of all images
+
+        Parameters
+        ----------
+        strips : List[np.ndarray]
+            the strip of each image
+        method : str
+            method of combine. Either average, mean, median or sum
+        clipping: str, optional
+            clipping method. Either sigma or minmax
+        weights: List[Union[float, int]]
+            weight of each image
+
+        Returns
+        -------
+        np.ndarray
+            the combined strip
+        """
+        combiner = Combiner([CCDData(strip, unit="adu") for strip in strips])
+
         if clipping is not None:
             if "sigma".startswith(clipping):
                 combiner.sigma_clipping()
@@ -1948,14 +2467,15 @@ class FitsArray(DataArray):
         combiner.weights = np.array(weights)
 
         if "median".startswith(method.lower()):
-            return Fits.from_data_header(data=combiner.median_combine().data, output=output, override=override)
+            return combiner.median_combine().data
         elif "sum".startswith(method.lower()):
-            return Fits.from_data_header(data=combiner.sum_combine().data, output=output, override=override)
+            return combiner.sum_combine().data
         else:
-            return Fits.from_data_header(data=combiner.average_combine().data, output=output, override=override)
+            return combiner.average_combine().data
 
     def zero_combine(self, method: str = "median", clipping: Optional[str] = None,
-                     output: Optional[str] = None, override: bool = False) -> Fits:
+                     output: Optional[str] = None, override: bool = False,
+                     mem_limit: float = 1e9) -> Fits:
         """
         Combines FitsArray to a Fits optimized for zero combining
 
@@ -1969,6 +2489,8 @@ class FitsArray(DataArray):
             New path to save the files.
         override : bool, default=False
             delete already existing file if `true`
+        mem_limit : float, default=1e9
+            maximum memory in bytes to be used for the stack of strips
 
         Returns
         -------
@@ -1982,11 +2504,13 @@ class FitsArray(DataArray):
         ValueError
             when the clipping is not either of sigma, or minmax
         """
-        return self.combine(method=method, clipping=clipping, output=output, override=override)
+        return self.combine(method=method, clipping=clipping, output=output, override=override,
+                            mem_limit=mem_limit)
 
     def dark_combine(self, method: str = "median", clipping: Optional[str] = None,
                      weights: Optional[Union[List[str], List[Union[float, int]]]] = None,
-                     output: Optional[str] = None, override: bool = False) -> Fits:
+                     output: Optional[str] = None, override: bool = False,
+                     mem_limit: float = 1e9) -> Fits:
         """
         Combines FitsArray to a Fits optimized for dark combining
 
@@ -2002,6 +2526,8 @@ class FitsArray(DataArray):
             New path to save the files.
         override : bool, default=False
             delete already existing file if `true`
+        mem_limit : float, default=1e9
+            maximum memory in bytes to be used for the stack of strips
 
         Returns
         -------
@@ -2019,11 +2545,13 @@ class FitsArray(DataArray):
         """
 
         fixed_weights = self.__prepare_weights(weights)
-        return self.combine(method=method, clipping=clipping, weights=fixed_weights, output=output, override=override)
+        return self.combine(method=method, clipping=clipping, weights=fixed_weights, output=output, override=override,
+                            mem_limit=mem_limit)
 
     def flat_combine(self, method: str = "median", clipping: Optional[str] = None,
                      weights: Optional[Union[List[str], List[Union[float, int]]]] = None,
-                     output: Optional[str] = None, override: bool = False) -> Fits:
+                     output: Optional[str] = None, override: bool = False,
+                     mem_limit: float = 1e9) -> Fits:
         """
         Combines FitsArray to a Fits optimized for flat combining
 
@@ -2039,6 +2567,8 @@ class FitsArray(DataArray):
             New path to save the files.
         override : bool, default=False
             delete already existing file if `true`
+        mem_limit : float, default=1e9
+            maximum memory in bytes to be used for the stack of strips
 
         Returns
         -------
@@ -2055,10 +2585,12 @@ class FitsArray(DataArray):
             when the clipping is not either of sigma, or minmax
         """
         fixed_weights = self.__prepare_weights(weights)
-        return self.combine(method=method, clipping=clipping, weights=fixed_weights, output=output, override=override)
+        return self.combine(method=method, clipping=clipping, weights=fixed_weights, output=output, override=override,
+                            mem_limit=mem_limit)
 
     def pixels_to_skys(self, xs: Union[List[Union[int, float]], int, float],
-                       ys: Union[List[Union[int, float]], int, float]) -> pd.DataFrame:
+                       ys: Union[List[Union[int, float]], int, float],
+                       sky: bool = True) -> pd.DataFrame:
         """
         Calculate Sky Coordinate of given Pixel
 
@@ -2068,6 +2600,9 @@ class FitsArray(DataArray):
             x coordinate(s) of pixel
         ys: Union[List[Union[int, float]], int, float]
             y coordinate(s) of pixel
+        sky: bool, default=True
+            add the `sky` column with a `SkyCoord` for each pixel. The `ra`
+            and `dec` columns are always added
 
         Returns
         -------
@@ -2084,8 +2619,8 @@ class FitsArray(DataArray):
         """
         self.logger.info("Calculating pixels to skys")
 
-        xs_to_use = xs if isinstance(xs, list) else [xs]
-        ys_to_use = ys if isinstance(ys, list) else [ys]
+        xs_to_use = np.atleast_1d(np.asarray(xs, dtype=float))
+        ys_to_use = np.atleast_1d(np.asarray(ys, dtype=float))
 
         if len(xs_to_use) != len(ys_to_use):
             raise ValueError("xs and ys must be equal in length")
@@ -2093,7 +2628,7 @@ class FitsArray(DataArray):
         skys = []
         for each in self.__verbosify(self):
             try:
-                skys.append(each.pixels_to_skys(xs_to_use, ys_to_use))
+                skys.append(each.pixels_to_skys(xs_to_use, ys_to_use, sky=sky))
             except ValueError as error:
                 self.logger.info(error)
             except Unsolvable as error:
@@ -2111,7 +2646,8 @@ class FitsArray(DataArray):
         Parameters
         ----------
         skys: Union[List[SkyCoord], SkyCoord]
-            x coordinate(s) of pixel
+            sky coordinate(s). Either a list of `SkyCoord` or a (scalar or
+            array) `SkyCoord`
 
         Returns
         -------
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from logging import getLogger, Logger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+from astropy.io import fits as fts
+
+from .cache import DataCache
+
+__all__ = ["HeaderIndex"]
+
+# SQLite limits the number of parameters of a statement
+CHUNK = 500
+
+
+class HeaderIndex:
+    """
+    A persistent index of fits headers kept in an SQLite file.
+
+    Each row holds the header cards of one file (as `Fits.header` returns
+    them) with the modification time and size of the file. A file is read
+    again only when it is new to the index or its modification time or size
+    has changed.
+    """
+
+    def __init__(self, path: Union[str, Path], logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.path = str(Path(path).absolute())
+
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS headers "
+                "(path TEXT PRIMARY KEY, mtime INTEGER NOT NULL, size INTEGER NOT NULL, header TEXT NOT NULL)"
+            )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', path:'{self.path}', nof:'{len(self)}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        with closing(sqlite3.connect(self.path)) as connection:
+            return connection.execute("SELECT COUNT(*) FROM headers").fetchone()[0]
+
+    @staticmethod
+    def read(path: str) -> Dict[str, Any]:
+        """
+        Reads the header cards of the given file the same way `Fits.header`
+        does
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+
+        Returns
+        -------
+        Dict[str, Any]
+            keys and values of the header
+        """
+        header = fts.getheader(path)
+        return {i: header[i] for i in header if isinstance(header[i], (bool, int, float, str))}
+
+    def __stored(self, connection: sqlite3.Connection, paths: List[str]) -> Dict[str, Tuple[int, int, str]]:
+        stored = {}
+        for start in range(0, len(paths), CHUNK):
+            chunk = paths[start:start + CHUNK]
+            rows = connection.execute(
+                f"SELECT path, mtime, size, header FROM headers WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for path, mtime, size, header in rows:
+                stored[path] = (mtime, size, header)
+
+        return stored
+
+    def update(self, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Brings the index up to date for the given files and returns their
+        headers
+
+        Parameters
+        ----------
+        paths : Iterable[str]
+            paths of the files
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            absolute paths and header cards of the files that could be read
+        """
+        paths = [str(Path(path).absolute()) for path in paths]
+
+        headers = {}
+        changed = []
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            stored = self.__stored(connection, paths)
+            for path in paths:
+                try:
+                    mtime, size = DataCache.signature(path)
+                except OSError as error:
+                    self.logger.warning(error)
+                    continue
+
+                row = stored.get(path)
+                if row is not None and row[:2] == (mtime, size):
+                    headers[path] = json.loads(row[2])
+                    continue
+
+                try:
+                    header = self.read(path)
+                except Exception as error:
+                    self.logger.warning(error)
+                    continue
+
+                headers[path] = header
+                changed.append((path, mtime, size, json.dumps(header)))
+
+            if changed:
+                self.logger.info(f"Indexing {len(changed)} headers")
+                connection.executemany("INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?)", changed)
+
+        return headers
+
+    def header(self, paths: Iterable[str]) -> pd.DataFrame:
+        """
+        Returns the headers of the given files as a dataframe indexed by
+        the absolute path of each file, like `FitsArray.header`
+
+        Parameters
+        ----------
+        paths : Iterable[str]
+            paths of the files
+
+        Returns
+        -------
+        pd.DataFrame
+            the headers as dataframe
+        """
+        headers = self.update(paths)
+
+        return pd.DataFrame.from_records(
+            list(headers.values()), index=pd.Index(list(headers.keys()), name="image")
+        )
+
+    def remove(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Removes the given files from the index. Removes all files if `paths`
+        is `None`
+
+        Parameters
+        ----------
+        paths : Iterable[str], optional
+            paths of the files
+        """
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            if paths is None:
+                connection.execute("DELETE FROM headers")
+                return
+
+            connection.executemany(
+                "DELETE FROM headers WHERE path = ?", [(str(Path(path).absolute()),) for path in paths]
+            )
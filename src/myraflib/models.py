@@ -25,7 +25,7 @@ class Data(ABC):
 
     @classmethod
     @abstractmethod
-    def from_image(cls, path: str) -> Self:
+    def from_image(cls, path: str) -> Fits:
         ...
 
     @classmethod
@@ -36,12 +36,12 @@ class Data(ABC):
     @classmethod
     @abstractmethod
     def from_data_header(cls, data: Any, header: Optional[Header] = None,
-                         output: Optional[str] = None, override: bool = False) -> Self:
+                         output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @classmethod
     @abstractmethod
-    def sample(cls) -> Self:
+    def sample(cls) -> Fits:
         ...
 
     @abstractmethod
@@ -56,10 +56,22 @@ class Data(ABC):
     def data(self) -> Any:
         ...
 
+    @abstractmethod
+    def view(self) -> Any:
+        ...
+
     @abstractmethod
     def value(self, x: int, y: int) -> float:
         ...
 
+    @abstractmethod
+    def values(self, xs: List[int], ys: List[int]) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def cutout(self, x: int, y: int, width: int, height: int) -> Any:
+        ...
+
     @abstractmethod
     def pure_header(self) -> Header:
         ...
@@ -81,7 +93,7 @@ class Data(ABC):
                      cleantype: str = 'meanmask', fsmode: str = 'median',
                      psfmodel: str = 'gauss', psffwhm: float = 2.5,
                      psfsize: int = 7, psfk: Optional[Any] = None,
-                     psfbeta: float = 4.765, gain_apply: bool = True) -> Self:
+                     psfbeta: float = 4.765, gain_apply: bool = True) -> Fits:
         ...
 
     @abstractmethod
@@ -92,43 +104,43 @@ class Data(ABC):
         ...
 
     @abstractmethod
-    def save_as(self, output: str, override: bool = False) -> Self:
+    def save_as(self, output: str, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def add(self, other: Union[Self, float, int],
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def sub(self, other: Union[Self, int, float],
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def mul(self, other: Union[Self, int, float],
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def div(self, other: Union[Self, int, float],
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def pow(self, other: Union[Fits, float, int],
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def imarith(self, other: Union[Self, int, float], operand: str,
-                output: Optional[str] = None, override: bool = False) -> Self:
+                output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def align(self, reference: Self, output: Optional[str] = None,
               max_control_points: int = 50, min_area: int = 5,
-              override: bool = False) -> Self:
+              override: bool = False) -> Fits:
         ...
 
     @abstractmethod
@@ -143,29 +155,29 @@ class Data(ABC):
     def solve_field(self, api_key: str, solve_timeout: int = 120,
                     force_image_upload: bool = False,
                     output: Optional[str] = None, override: bool = False
-                    ) -> Self:
+                    ) -> Fits:
         ...
 
     @abstractmethod
     def zero_correction(self, master_zero: Self,
-                        output: Optional[str] = None, override: bool = True, force: bool = False) -> Self:
+                        output: Optional[str] = None, override: bool = True, force: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def dark_correction(self, master_dark: Self, exposure: Optional[str] = None,
                         output: Optional[str] = None, override: bool = False,
-                        force: bool = False) -> Self:
+                        force: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def flat_correction(self, master_flat: Self, output: Optional[str] = None,
-                        override: bool = False, force: bool = False) -> Self:
+                        override: bool = False, force: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def ccdproc(self, master_zero: Optional[Self] = None, master_dark: Optional[Self] = None,
                 master_flat: Optional[Self] = None, exposure: Optional[str] = None, output: Optional[str] = None,
-                override: bool = False, force: bool = False) -> Self:
+                override: bool = False, force: bool = False) -> Fits:
         ...
 
     @abstractmethod
@@ -206,27 +218,28 @@ class Data(ABC):
 
     @abstractmethod
     def shift(self, x: int, y: int, output: Optional[str] = None,
-              override: bool = False) -> Self:
+              override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def rotate(self, angle: Union[float, int], output: Optional[str] = None,
-               override: bool = False) -> Self:
+               override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def crop(self, x: int, y: int, width: int, height: int,
-             output: Optional[str] = None, override: bool = False) -> Self:
+             output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def bin(self, binning_factor: Union[int, List[int]], func: Callable[[Any], float] = np.mean,
-            output: Optional[str] = None, override: bool = False) -> Self:
+            output: Optional[str] = None, override: bool = False) -> Fits:
         ...
 
     @abstractmethod
     def pixels_to_skys(self, xs: Union[List[Union[int, float]], int, float],
-                       ys: Union[List[Union[int, float]], int, float]) -> pd.DataFrame:
+                       ys: Union[List[Union[int, float]], int, float],
+                       sky: bool = True) -> pd.DataFrame:
         ...
 
     @abstractmethod
@@ -281,6 +294,14 @@ class DataArray(ABC):
     def value(self, x: int, y: int) -> pd.DataFrame:
         ...
 
+    @abstractmethod
+    def values(self, xs: List[int], ys: List[int]) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def cutout(self, x: int, y: int, width: int, height: int) -> List[Any]:
+        ...
+
     @abstractmethod
     def pure_header(self) -> List[Header]:
         ...
@@ -378,7 +399,7 @@ class DataArray(ABC):
         ...
 
     @abstractmethod
-    def show(self, scale: bool = True, interval: float = 1.0) -> None:
+    def show(self, scale: bool = True, interval: float = 1.0, buffer: int = 16, zscale_every: int = 0) -> None:
         ...
 
     @abstractmethod
@@ -473,7 +494,8 @@ class DataArray(ABC):
 
     @abstractmethod
     def pixels_to_skys(self, xs: Union[List[Union[int, float]], int, float],
-                       ys: Union[List[Union[int, float]], int, float]) -> pd.DataFrame:
+                       ys: Union[List[Union[int, float]], int, float],
+                       sky: bool = True) -> pd.DataFrame:
         ...
 
     @abstractmethod
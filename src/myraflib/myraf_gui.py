@@ -16,20 +16,22 @@ from typing import List
 from logging import Logger
 
 import pandas as pd
+import numpy as np
 import math
 import statistics
 
 # noinspection PyUnresolvedReferences
 from PyQt5 import QtWidgets
 from PyQt5 import QtCore
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtGui import QIcon, QPixmap, QGuiApplication
 from PyQt5.QtCore import QEvent, Qt, QSize
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidgetItem
 
 import qdarktheme
 
 from astropy.utils.exceptions import AstropyWarning
-from astropy.coordinates import EarthLocation, SkyCoord, AltAz
+from astropy import units
+from astropy.coordinates import EarthLocation, SkyCoord, AltAz, Angle
 from astropy.io.fits import Header
 from astropy.time import Time
 from astropy.wcs import WCS
@@ -43,6 +45,10 @@ from ginga.canvas.types.basic import Circle, Rectangle, Text
 from ginga.qtw.ImageViewQt import CanvasView
 
 from myraflib import FitsArray, Fits
+from myraflib.calibration import Calibrator
+from myraflib.cursor import CursorInfo
+from myraflib.player import FramePlayer
+from myraflib.zscale import ZScale
 from myraflib.error import Unsolvable
 from myrafgui import Ui_MainWindow, Ui_FormDisplay, Ui_FormArithmetic, Ui_FormCombine, Ui_FormCosmicCleaner, \
     Ui_FormAlign, Ui_FormShift, Ui_FormRotate, Ui_FormHedit, Ui_FormBin, Ui_FormCrop, Ui_FormHeader, Ui_FormHSelect, \
@@ -61,6 +67,7 @@ DEFAULT_OBSERVATORIES = {
 
 DEFAULT_SETTINGS = {
     "ZMag": 25,
+    "workers": 1,
     "display": {
         "interval": 100,
     },
@@ -167,6 +174,196 @@ def database_dir():
     return settings_dir
 
 
+class CursorThrottle(QtCore.QObject):
+    """
+    Coalesces mouse move events. Only the last position is passed to
+    `callback`, at most once per refresh of the screen
+    """
+
+    def __init__(self, callback, parent=None):
+        super(CursorThrottle, self).__init__(parent)
+        self.callback = callback
+        self.position = None
+
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(1000 / refresh_rate) if refresh_rate > 0 else 16)
+        self.timer.timeout.connect(self.flush)
+
+    def move(self, x, y):
+        self.position = (x, y)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if self.position is None:
+            return
+
+        x, y = self.position
+        self.position = None
+        self.callback(x, y)
+
+
+def cursor_text(ra, dec, value):
+    return (
+        "---" if ra is None else Angle(ra, unit=units.degree).__str__(),
+        "---" if dec is None else Angle(dec, unit=units.degree).__str__(),
+        "---" if value is None else value.__str__(),
+    )
+
+
+class PyramidDisplay(QtCore.QObject):
+    """
+    Shows frames on a ginga canvas. Frames bigger than `PIXEL_LIMIT` are
+    shown from their pyramid: only the visible region is loaded, from the
+    level that fits the zoom, or from the full resolution data when zoomed
+    in
+    """
+
+    PIXEL_LIMIT = 2048 * 2048
+
+    def __init__(self, canvas, img, logger, parent=None):
+        super(PyramidDisplay, self).__init__(parent)
+        self.canvas = canvas
+        self.img = img
+        self.logger = logger
+        self.autocuts = canvas.get_settings().get('autocuts')
+
+        self.pyramid = None
+        self.shown = None
+        self.shape = None
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self.refresh)
+
+        self.canvas.add_callback('redraw', self.redrawn)
+
+    def load(self, fits, data=None):
+        """
+        Shows the frame. `data` is shown as is if it's given. Returns the
+        full resolution data if it was read
+        """
+        self.timer.stop()
+        self.pyramid = None
+        self.shown = None
+        self.canvas.enable_autocuts(self.autocuts)
+
+        if data is None:
+            header = fits.pure_header()
+            if header.get("NAXIS", 0) == 2 and header["NAXIS1"] * header["NAXIS2"] > self.PIXEL_LIMIT:
+                try:
+                    self.pyramid = fits.pyramid(cache_dir=database_dir() / "pyramids")
+                except Exception as e:
+                    self.logger.warning(f"Could not use the pyramid. {e}")
+
+        if self.pyramid is None:
+            if data is None:
+                data = fits.data()
+
+            self.shape = data.shape
+            self.show(data, 0, 0, 1)
+            return data
+
+        ny, nx = self.pyramid.shape
+        window_width, window_height = self.canvas.get_window_size()
+        scale = min(window_width / nx, window_height / ny) if window_width > 0 and window_height > 0 else 0
+        factor = self.pyramid.factor_for(scale) if scale > 0 else self.pyramid.factors[-1]
+
+        # Keep the cut levels of the whole frame while the visible region changes
+        self.canvas.enable_autocuts('off')
+        if factor == 1:
+            self.show(fits.data(), 0, 0, 1)
+        else:
+            self.show(np.asarray(self.pyramid.level(factor)), 0, 0, factor)
+            self.shown = (factor, 0, 0) + self.pyramid.level_shape(factor)[::-1]
+
+        if self.shape != self.pyramid.shape:
+            self.shape = self.pyramid.shape
+            self.canvas.zoom_fit()
+
+        if self.autocuts != 'off':
+            try:
+                self.canvas.cut_levels(*fits.zscale())
+            except Exception as e:
+                self.logger.warning(f"Could not get the zscale limits. {e}")
+                self.canvas.auto_levels()
+
+        return None
+
+    def show(self, data, x, y, factor):
+        self.img.load_data(data)
+        canvas_img = self.canvas.get_canvas_image()
+        if canvas_img.get_image() is not self.img:
+            self.canvas.set_image(self.img)
+
+        canvas_img.set_scale(factor, factor)
+        canvas_img.set_origin(x, y)
+        if self.pyramid is not None:
+            ny, nx = self.pyramid.shape
+            self.canvas.set_limits(((-0.5, -0.5), (nx - 0.5, ny - 0.5)))
+
+        self.canvas.redraw()
+
+    def redrawn(self, *args):
+        if self.pyramid is not None and not self.timer.isActive():
+            self.timer.start()
+
+    def refresh(self):
+        if self.pyramid is None:
+            return
+
+        pts = np.asarray(self.canvas.get_draw_bbox()).T
+        if np.isnan(pts).any():
+            return
+
+        ny, nx = self.pyramid.shape
+        x1, y1 = max(pts[0].min(), 0), max(pts[1].min(), 0)
+        x2, y2 = min(pts[0].max(), nx), min(pts[1].max(), ny)
+        if x2 <= x1 or y2 <= y1:
+            return
+
+        margin_x, margin_y = (x2 - x1) / 2, (y2 - y1) / 2
+        factor = self.pyramid.factor_for(self.canvas.get_scale())
+        if factor == 1:
+            if self.shown is not None and self.shown[0] == 1 and self.shown[1] <= x1 and self.shown[2] <= y1 \
+                    and self.shown[3] >= x2 and self.shown[4] >= y2:
+                return
+
+            try:
+                tile, x, y = self.pyramid.tile(int(x1 - margin_x), int(y1 - margin_y),
+                                               int(x2 - x1 + 2 * margin_x) + 1, int(y2 - y1 + 2 * margin_y) + 1)
+            except Exception as e:
+                self.logger.warning(e)
+                return
+
+            self.shown = (1, x, y, x + tile.shape[1], y + tile.shape[0])
+            self.show(tile, x, y, 1)
+            return
+
+        # ginga clips scaled images from their top left in data pixels. Start
+        # the region inside the visible area so nothing is clipped
+        level_ny, level_nx = self.pyramid.level_shape(factor)
+        column, row = math.ceil(x1 / factor), math.ceil(y1 / factor)
+        end_column = min(math.ceil((x2 + margin_x) / factor), level_nx)
+        end_row = min(math.ceil((y2 + margin_y) / factor), level_ny)
+        if self.shown is not None and self.shown[:3] == (factor, column, row) \
+                and self.shown[3] >= min(math.ceil(x2 / factor), level_nx) \
+                and self.shown[4] >= min(math.ceil(y2 / factor), level_ny):
+            return
+
+        if end_column <= column or end_row <= row:
+            return
+
+        level = self.pyramid.level(factor)
+        self.shown = (factor, column, row, end_column, end_row)
+        self.show(np.asarray(level[row:end_row, column:end_column]), column * factor, row * factor, factor)
+
+
 # noinspection PyUnresolvedReferences
 class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     def __init__(self, parent=None, logger_level="DEBUG", log_file=None):
@@ -184,6 +381,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         basicConfig(filename=self.log_file, level=logger_level, format=log_format)
 
         self.logger = getLogger("MYRaf")
+        Fits.zscaler = ZScale(path=database_dir() / "zscale.json", logger=self.logger)
 
         getLogger('matplotlib.font_manager').disabled = True
         getLogger('libGL').disabled = True
@@ -216,7 +414,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             file_type="Video Files (*.mp4 *.avi *.mov *.flv *.wmv *.mpeg *.mpg *.m4v)"
         )
         if file:
-            fits_array = FitsArray.from_video(file)
+            fits_array = FitsArray.from_video(file, background=True)
             files = []
             for fits in fits_array:
                 fits.is_temp = False
@@ -771,10 +969,14 @@ class PhotometryForm(QWidget, Ui_FormPhotometry):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        data = self.display.load(self.fits_array[0])
         group_box_layout.addWidget(self.ginga_widget)
 
+        self.cursor_info = CursorInfo(logger=self.parent.logger)
+        self.cursor_info.load(self.fits_array.fits_list[0], data)
+        self.cursor_throttle = CursorThrottle(self.info_update, self)
+
         self.iteration = 0
         self.current_angle = 0
 
@@ -801,27 +1003,18 @@ class PhotometryForm(QWidget, Ui_FormPhotometry):
         self.tableWidgetCoordinates.installEventFilter(self)
 
     def info_update(self, x, y):
-        fits = self.fits_array[self.iteration]
         if self.canvas.check_cursor_location():
             the_x, the_y = self.canvas.get_data_xy(x, y)
             w, h = self.canvas.get_data_size()
             if not 0 < the_x < w or not 0 < the_y < h:
                 ra, dec = "---", "---"
             else:
-                x_to_show, y_to_show = int(the_x), int(the_y)
-                try:
-                    sky = fits.pixels_to_skys(x_to_show, y_to_show)
-                    ra = sky["sky"].values[0].ra
-                    dec = sky["sky"].values[0].dec
-
-                except (ValueError, Unsolvable) as e:
-                    ra, dec = "---", "---"
+                ra, dec, _ = cursor_text(*self.cursor_info.lookup(int(the_x), int(the_y)))
 
-            self.labelRa.setText(ra.__str__())
-            self.labelDec.setText(dec.__str__())
+            self.labelRa.setText(ra)
+            self.labelDec.setText(dec)
 
     def go(self):
-        warn = 0
         coordinates = self.parent.gui_functions.get_from_table(self.tableWidgetCoordinates)
         if not coordinates:
             self.parent.gui_functions.error("No coordinates were given for aperture")
@@ -847,54 +1040,34 @@ class PhotometryForm(QWidget, Ui_FormPhotometry):
         if not save_file:
             return
 
-        progress = QtWidgets.QProgressDialog("Doing Photometry ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
+        method = self.comboBoxPhotometryMethods.currentIndex()
 
-        photometry = []
-        for iteration, fits in enumerate(self.fits_array):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
-
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                method = self.comboBoxPhotometryMethods.currentIndex()
-
-                if method == 0:
-                    phot = fits.photometry(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
+        def do_photometry(fits):
+            if method == 0:
+                return fits.photometry(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
+                                       headers_to_extract, exposure_in_header)
+            elif method == 1:
+                return fits.photometry_sep(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
+                                           headers_to_extract, exposure_in_header)
+            else:
+                return fits.photometry_phu(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
                                            headers_to_extract, exposure_in_header)
-                elif method == 1:
-                    phot = fits.photometry_sep(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
-                                               headers_to_extract, exposure_in_header)
-                else:
-                    phot = fits.photometry_phu(numeric_coordinates_x, numeric_coordinates_y, numeric_radii,
-                                               headers_to_extract, exposure_in_header)
-
-                photometry.append(phot)
-
-                progress.setValue(iteration)
-
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
 
-        progress.close()
+        photometry = {}
 
-        if len(photometry) == 0:
-            self.parent.logger.warning("Cloudn't do photometry")
-            self.parent.gui_functions.error("Cloudn't do photometry")
-            return
+        def save(_):
+            if len(photometry) == 0:
+                self.parent.logger.warning("Cloudn't do photometry")
+                self.parent.gui_functions.error("Cloudn't do photometry")
+                return
 
-        stacked_photometry = pd.concat(photometry, axis=0)
-        stacked_photometry.to_csv(save_file)
+            stacked_photometry = pd.concat([photometry[index] for index in sorted(photometry)], axis=0)
+            stacked_photometry.to_csv(save_file)
 
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Doing Photometry ...", self.fits_array, do_photometry,
+            on_result=photometry.__setitem__, on_finished=save, workers=self.parent.settings.workers
+        )
 
     def load_settings(self):
         settings = self.parent.settings.settings
@@ -1072,7 +1245,7 @@ class PhotometryForm(QWidget, Ui_FormPhotometry):
 
     def eventFilter(self, source, event):
         if event.type() == QtCore.QEvent.MouseMove:
-            self.info_update(event.x(), event.y())
+            self.cursor_throttle.move(event.x(), event.y())
             return True
 
         if event.type() == QEvent.MouseButtonPress:
@@ -1496,8 +1669,6 @@ class CCDProcForm(QWidget, Ui_FormCCDPROC):
         return super(CCDProcForm, self).eventFilter(source, event)
 
     def go(self):
-        warn = 0
-
         master_zero = self.labelZeroFile.text()
         master_dark = self.labelDarkFile.text()
         master_flat = self.labelFlatFile.text()
@@ -1519,66 +1690,32 @@ class CCDProcForm(QWidget, Ui_FormCCDPROC):
         if not save_directory:
             return
 
-        progress = QtWidgets.QProgressDialog("Calibrating ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
+        try:
+            calibrator = Calibrator(
+                Fits.from_path(master_zero) if master_zero else None,
+                Fits.from_path(master_dark) if master_dark else None,
+                Fits.from_path(master_flat) if master_flat else None,
+                exposure=exposure, logger=self.parent.logger
+            )
+        except Exception as e:
+            self.parent.gui_functions.error(f"Cannot load master files: {e}")
+            return
 
         group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Calibrated"])
 
-        for iteration, fits in enumerate(self.fits_array):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
-
-                file_name = Path(save_directory) / Path(fits.file.name)
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                new_fits = Fits.from_data_header(fits.data(), fits.pure_header(), file_name.__str__())
-
-                if master_zero:
-                    new_fits = new_fits.zero_correction(
-                        Fits.from_path(master_zero), output=new_fits.file.absolute().__str__(),
-                        override=True, force=force,
-                    )
-
-                if master_dark:
-                    new_fits = new_fits.dark_correction(
-                        Fits.from_path(master_dark), exposure=exposure,
-                        output=new_fits.file.absolute().__str__(), override=True, force=force
-                    )
-
-                if master_flat:
-                    new_fits = new_fits.flat_correction(
-                        Fits.from_path(master_flat), output=new_fits.file.absolute().__str__()
-                        , override=True, force=force
-                    )
-
-                group_layer.setFirstColumnSpanned(True)
-                file_name_layer = CustomQTreeWidgetItem(group_layer, [new_fits.file.name])
-                file_name_layer.setFirstColumnSpanned(True)
-
-                item = CustomQTreeWidgetItem(file_name_layer, ["Path", new_fits.file.resolve().parent.__str__()])
-                item.setFlags(QtCore.Qt.ItemIsEnabled)
-                stats = new_fits.imstat()
-                for key, value in stats.iloc[0].items():
-                    item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                progress.setValue(iteration)
-
-            except Exception as e:
-                self.parent.logger.warning(e)
-
-        progress.close()
-        if group_layer.childCount() == 0:
-            self.parent.treeWidget.takeTopLevelItem(self.parent.treeWidget.indexOfTopLevelItem(group_layer))
+        def calibrate(fits):
+            file_name = Path(save_directory) / Path(fits.file.name)
+            new_fits = fits.ccdproc(
+                output=file_name.absolute().__str__(), override=True, force=force, calibrator=calibrator
+            )
+            return new_fits, new_fits.imstat()
 
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Calibrating ...", self.fits_array, calibrate,
+            on_result=lambda _, result: self.parent.gui_functions.add_result_to_tree(group_layer, *result),
+            on_finished=lambda _: self.parent.gui_functions.remove_if_empty(self.parent.treeWidget, group_layer),
+            workers=self.parent.settings.workers
+        )
 
     def show_image(self, file_label):
         file = file_label.text()
@@ -1793,8 +1930,6 @@ class CosmicCleanerForm(QWidget, Ui_FormCosmicCleaner):
         self.parent.settings.settings = settings
 
     def go(self):
-        warn = 0
-
         sigclip = self.doubleSpinSigclip.value()
         sigfrac = self.doubleSpinSigfrac.value()
         objlim = self.doubleSpinObjlim.value()
@@ -1816,54 +1951,25 @@ class CosmicCleanerForm(QWidget, Ui_FormCosmicCleaner):
         if not save_directory:
             return
 
-        progress = QtWidgets.QProgressDialog("Cleaning ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
-
         group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Cleaned"])
 
-        for iteration, fits in enumerate(self.fits_array):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
-
-                file_name = Path(save_directory) / Path(fits.file.name)
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                new_fits = fits.cosmic_clean(
-                    sigclip=sigclip, sigfrac=sigfrac, objlim=objlim, gain=gain, readnoise=readnoise,
-                    satlevel=satlevel,
-                    niter=niter, sepmed=sepmed, cleantype=cleantype, fsmode=fsmode, psfmodel=psfmodel,
-                    psffwhm=psffwhm, psfsize=psfsize, psfbeta=psfbeta, gain_apply=gain_apply,
-                    output=file_name.absolute().__str__(), override=True
-                )
-
-                group_layer.setFirstColumnSpanned(True)
-                file_name_layer = CustomQTreeWidgetItem(group_layer, [new_fits.file.name])
-                file_name_layer.setFirstColumnSpanned(True)
-
-                item = CustomQTreeWidgetItem(file_name_layer, ["Path", new_fits.file.resolve().parent.__str__()])
-                item.setFlags(QtCore.Qt.ItemIsEnabled)
-                stats = new_fits.imstat()
-                for key, value in stats.iloc[0].items():
-                    item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                progress.setValue(iteration)
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
-
-        progress.close()
-        if group_layer.childCount() == 0:
-            self.parent.treeWidget.takeTopLevelItem(self.parent.treeWidget.indexOfTopLevelItem(group_layer))
+        def clean(fits):
+            file_name = Path(save_directory) / Path(fits.file.name)
+            new_fits = fits.cosmic_clean(
+                sigclip=sigclip, sigfrac=sigfrac, objlim=objlim, gain=gain, readnoise=readnoise,
+                satlevel=satlevel,
+                niter=niter, sepmed=sepmed, cleantype=cleantype, fsmode=fsmode, psfmodel=psfmodel,
+                psffwhm=psffwhm, psfsize=psfsize, psfbeta=psfbeta, gain_apply=gain_apply,
+                output=file_name.absolute().__str__(), override=True
+            )
+            return new_fits, new_fits.imstat()
 
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Cleaning ...", self.fits_array, clean,
+            on_result=lambda _, result: self.parent.gui_functions.add_result_to_tree(group_layer, *result),
+            on_finished=lambda _: self.parent.gui_functions.remove_if_empty(self.parent.treeWidget, group_layer),
+            workers=self.parent.settings.workers
+        )
 
 
 # noinspection PyUnresolvedReferences
@@ -1967,8 +2073,8 @@ class ShiftForm(QWidget, Ui_FormShift):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        self.display.load(self.fits_array[0])
 
         self.ginga_widget.installEventFilter(self)
 
@@ -1983,8 +2089,6 @@ class ShiftForm(QWidget, Ui_FormShift):
         self.pushButtonGo.clicked.connect(self.go)
 
     def go(self):
-        warn = 0
-
         ref = self.tableWidgetAmount.currentRow()
 
         ref_x = self.tableWidgetAmount.item(ref, 1).text()
@@ -1997,50 +2101,25 @@ class ShiftForm(QWidget, Ui_FormShift):
         if not save_directory:
             return
 
-        progress = QtWidgets.QProgressDialog("Shifting ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
-
         group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Shifted"])
 
-        for iteration, (fits, (_, x, y)) in enumerate(zip(self.fits_array, amounts)):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
-
-                file_name = Path(save_directory) / Path(fits.file.name)
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                new_fits = fits.shift(int(float(x) - float(ref_x)), int(float(y) - float(ref_y)),
-                                      output=file_name.absolute().__str__())
-
-                group_layer.setFirstColumnSpanned(True)
-                file_name_layer = CustomQTreeWidgetItem(group_layer, [new_fits.file.name])
-                file_name_layer.setFirstColumnSpanned(True)
-
-                item = CustomQTreeWidgetItem(file_name_layer, ["Path", new_fits.file.resolve().parent.__str__()])
-                item.setFlags(QtCore.Qt.ItemIsEnabled)
-                stats = new_fits.imstat()
-                for key, value in stats.iloc[0].items():
-                    item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                progress.setValue(iteration)
-
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
-
-        progress.close()
-        if group_layer.childCount() == 0:
-            self.parent.treeWidget.takeTopLevelItem(self.parent.treeWidget.indexOfTopLevelItem(group_layer))
-
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        shifts = [
+            (fits, int(float(x) - float(ref_x)), int(float(y) - float(ref_y)))
+            for fits, (_, x, y) in zip(self.fits_array, amounts)
+        ]
+
+        def shift(job):
+            fits, x_amount, y_amount = job
+            file_name = Path(save_directory) / Path(fits.file.name)
+            new_fits = fits.shift(x_amount, y_amount, output=file_name.absolute().__str__())
+            return new_fits, new_fits.imstat()
+
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Shifting ...", shifts, shift,
+            on_result=lambda _, result: self.parent.gui_functions.add_result_to_tree(group_layer, *result),
+            on_finished=lambda _: self.parent.gui_functions.remove_if_empty(self.parent.treeWidget, group_layer),
+            workers=self.parent.settings.workers
+        )
 
     def draw_aperture(self):
 
@@ -2063,7 +2142,7 @@ class ShiftForm(QWidget, Ui_FormShift):
 
     def set_current(self):
         self.iteration = self.tableWidgetAmount.selectionModel().currentIndex().row()
-        self.img.load_data(self.fits_array[self.iteration].data())
+        self.display.load(self.fits_array[self.iteration])
         self.tableWidgetAmount.selectRow(self.iteration)
         self.draw_aperture()
 
@@ -2074,7 +2153,7 @@ class ShiftForm(QWidget, Ui_FormShift):
             self.iteration = 0
             self.parent.gui_functions.warning("End of list")
 
-        self.img.load_data(self.fits_array[self.iteration].data())
+        self.display.load(self.fits_array[self.iteration])
         self.tableWidgetAmount.selectRow(self.iteration)
         self.draw_aperture()
 
@@ -2295,8 +2374,8 @@ class RotateForm(QWidget, Ui_FormRotate):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        self.display.load(self.fits_array[0])
 
         self.current_angle = 0
         self.iteration = 0
@@ -2379,7 +2458,7 @@ class RotateForm(QWidget, Ui_FormRotate):
 
     def set_current(self):
         self.iteration = self.tableWidgetAmount.selectionModel().currentIndex().row()
-        self.img.load_data(self.fits_array[self.iteration].data())
+        self.display.load(self.fits_array[self.iteration])
         self.tableWidgetAmount.selectRow(self.iteration)
         self.rerotate()
 
@@ -2390,7 +2469,7 @@ class RotateForm(QWidget, Ui_FormRotate):
             self.iteration = 0
             self.parent.gui_functions.warning("End of list")
 
-        self.img.load_data(self.fits_array[self.iteration].data())
+        self.display.load(self.fits_array[self.iteration])
         self.tableWidgetAmount.selectRow(self.iteration)
         self.rerotate()
 
@@ -2602,8 +2681,8 @@ class CropForm(QWidget, Ui_FormCrop):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        self.display.load(self.fits_array[0])
 
         self.current_angle = 0
         self.iteration = 0
@@ -3015,8 +3094,6 @@ class AlignForm(QWidget, Ui_FormAlign):
         self.parent.settings.settings = settings
 
     def go(self):
-        warn = 0
-
         reference = self.fits_array[self.comboBoxReference.currentIndex()]
         max_control_points = self.spinBoxMaxControlPoint.value()
         detection_sigma = self.doubleSpinDetectionSigma.value()
@@ -3027,52 +3104,26 @@ class AlignForm(QWidget, Ui_FormAlign):
         if not save_directory:
             return
 
-        progress = QtWidgets.QProgressDialog("Aligning ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
+        try:
+            aligner = reference.aligner(max_control_points=max_control_points, min_area=min_area)
+        except Exception as e:
+            self.parent.gui_functions.error("Couldn't find control points on the reference image")
+            self.parent.logger.warning(e)
+            return
 
         group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Aligned"])
 
-        for iteration, fits in enumerate(self.fits_array):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
+        def align(fits):
+            file_name = save_directory / Path(fits.file.name)
+            new_fits = fits.align(aligner, output=file_name.absolute().__str__(), override=True)
+            return new_fits, new_fits.imstat()
 
-                file_name = save_directory / Path(fits.file.name)
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                new_fits = fits.align(
-                    reference, max_control_points=max_control_points, min_area=min_area,
-                    output=file_name.absolute().__str__(), override=True
-                )
-
-                group_layer.setFirstColumnSpanned(True)
-                file_name_layer = CustomQTreeWidgetItem(group_layer, [new_fits.file.name])
-                file_name_layer.setFirstColumnSpanned(True)
-
-                item = CustomQTreeWidgetItem(file_name_layer, ["Path", new_fits.file.resolve().parent.__str__()])
-                item.setFlags(QtCore.Qt.ItemIsEnabled)
-                statistics = fits.imstat()
-                for key, value in statistics.iloc[0].items():
-                    item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                progress.setValue(iteration)
-
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
-
-        progress.close()
-        if group_layer.childCount() == 0:
-            self.parent.treeWidget.takeTopLevelItem(self.parent.treeWidget.indexOfTopLevelItem(group_layer))
-
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Aligning ...", self.fits_array, align,
+            on_result=lambda _, result: self.parent.gui_functions.add_result_to_tree(group_layer, *result),
+            on_finished=lambda _: self.parent.gui_functions.remove_if_empty(self.parent.treeWidget, group_layer),
+            workers=self.parent.settings.workers
+        )
 
     def show_reference(self):
         selected_file = self.fits_array[self.comboBoxReference.currentIndex()]
@@ -3208,8 +3259,12 @@ class DisplayForm(QWidget, Ui_FormDisplay):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        data = self.display.load(self.fits_array[0])
+
+        self.cursor_info = CursorInfo(logger=self.parent.logger)
+        self.cursor_info.load(self.fits_array.fits_list[0], data)
+        self.cursor_throttle = CursorThrottle(self.info_update, self)
 
         self.labelFile.setText(self.fits_array[0].file.name)
         self.labelObject.setText(list(self.fits_array[0].header().to_dict().get("OBJECT", {1: ''}).values())[0])
@@ -3219,50 +3274,59 @@ class DisplayForm(QWidget, Ui_FormDisplay):
         self.iteration = 0
         self.current_angle = 0
 
+        self.player = None
+        self.player_cuts = False
+
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.animate)
         if len(self.fits_array) > 1:
+            self.player = FramePlayer(self.fits_array, logger=self.parent.logger)
+            self.player.start()
+
             settings = self.parent.settings.settings
             interval = settings["display"]["interval"]
             self.timer.start(interval)
 
+    def closeEvent(self, event):
+        self.timer.stop()
+        if self.player is not None:
+            self.player.stop()
+
+        super(DisplayForm, self).closeEvent(event)
+
     def info_update(self, x, y):
-        fits = self.fits_array[self.iteration]
         if self.canvas.check_cursor_location():
             the_x, the_y = self.canvas.get_data_xy(x, y)
             w, h = self.canvas.get_data_size()
             if not 0 < the_x < w or not 0 < the_y < h:
                 x_to_show, y_to_show = "---", "---"
-                ra, dec = "---", "---"
+                ra, dec, value = "---", "---", "---"
             else:
                 x_to_show, y_to_show = int(the_x), int(the_y)
-                try:
-                    sky = fits.pixels_to_skys(x_to_show, y_to_show)
-                    ra = sky["sky"].values[0].ra
-                    dec = sky["sky"].values[0].dec
-
-                except (ValueError, Unsolvable):
-                    ra, dec = "---", "---"
-
-            if x_to_show != "---":
-                value = self.canvas.get_data(x_to_show, y_to_show)
-            else:
-                value = "---"
+                ra, dec, value = cursor_text(*self.cursor_info.lookup(x_to_show, y_to_show))
 
             self.labelX.setText(x_to_show.__str__())
             self.labelY.setText(y_to_show.__str__())
-            self.labelRa.setText(ra.__str__())
-            self.labelDec.setText(dec.__str__())
-            self.labelValue.setText(value.__str__())
+            self.labelRa.setText(ra)
+            self.labelDec.setText(dec)
+            self.labelValue.setText(value)
 
     def animate(self):
-        fits = self.fits_array[self.iteration]
+        frame = self.player.poll()
+        if frame is None:
+            return
+
+        self.iteration, fits, image = frame
+        if not self.player_cuts:
+            # The frames are already scaled to 8 bits by the player
+            self.canvas.enable_autocuts('off')
+            self.canvas.cut_levels(0, 255)
+            self.display.autocuts = 'off'
+            self.player_cuts = True
+
         self.labelFile.setText(fits.file.name)
-        self.labelObject.setText(list(self.fits_array[0].header().to_dict().get("OBJECT", {1: ""}).values())[0])
-        self.img.load_data(fits.data())
-        self.iteration += 1
-        if self.iteration >= len(self.fits_array):
-            self.iteration = 0
+        self.display.load(fits, image)
+        self.cursor_info.load(fits)
 
     def rotate(self):
         warn = 0
@@ -3318,7 +3382,7 @@ class DisplayForm(QWidget, Ui_FormDisplay):
     def copy_value(self, x, y):
         try:
             the_x, the_y = self.canvas.get_data_xy(x, y)
-            value = self.canvas.get_data(the_x, the_y)
+            value = self.cursor_info.value(int(the_x), int(the_y))
             pd.DataFrame([f'{value}']).to_clipboard(index=False, header=False)
         except (ValueError, Unsolvable):
             pd.DataFrame([f'']).to_clipboard(index=False, header=False)
@@ -3341,7 +3405,7 @@ class DisplayForm(QWidget, Ui_FormDisplay):
     def eventFilter(self, source, event):
         fits = self.fits_array[self.iteration]
         if event.type() == QtCore.QEvent.MouseMove:
-            self.info_update(event.x(), event.y())
+            self.cursor_throttle.move(event.x(), event.y())
             return True
 
         if event.type() == QEvent.MouseButtonPress:
@@ -3522,8 +3586,12 @@ class WCSForm(QWidget, Ui_FormWCS):
         group_box_layout.addWidget(self.ginga_widget)
         self.groupBox.setLayout(group_box_layout)
         self.img = AstroImage(logger=self.parent.logger)
-        self.img.load_data(self.fits_array[0].data())
-        self.canvas.set_image(self.img)
+        self.display = PyramidDisplay(self.canvas, self.img, self.parent.logger, self)
+        data = self.display.load(self.fits_array[0])
+
+        self.cursor_info = CursorInfo(logger=self.parent.logger)
+        self.cursor_info.load(self.fits_array.fits_list[0], data)
+        self.cursor_throttle = CursorThrottle(self.info_update, self)
 
         self.labelObject.setText(list(self.fits_array[0].header().to_dict().get("OBJECT", {1: ''}).values())[0])
 
@@ -3538,8 +3606,6 @@ class WCSForm(QWidget, Ui_FormWCS):
         self.current_angle = 0
 
     def go(self):
-        warn = 0
-
         reference = self.fits_array[self.comboBoxFile.currentIndex()]
         api_key = self.parent.settings.settings["edit"]["wcs"]["astrometry_apikey"]
         save_directory = self.parent.gui_functions.get_directory("Save Directory")
@@ -3557,76 +3623,49 @@ class WCSForm(QWidget, Ui_FormWCS):
                 return
             api_key = ak
 
-        progress = QtWidgets.QProgressDialog("Solving ...", "Abort", 0, len(self.fits_array), self)
+        solved = []
 
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
-
-        try:
-            solved = reference.solve_field(api_key, False)
-        except Exception as e:
+        def fit_wcs(fits):
+            file_name = save_directory / Path(fits.file.name)
 
-            progress.close()
-            self.parent.gui_functions.error("Couldn't solve the reference image")
-            self.parent.logger.warning(e)
-            return
-
-        group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Solved"])
-
-        for iteration, fits in enumerate(self.fits_array):
-            try:
-                progress.setLabelText(f"Operating on {fits.file.name}")
-
-                file_name = save_directory / Path(fits.file.name)
-                if progress.wasCanceled():
-                    progress.setLabelText("ABORT!")
-                    break
-
-                ref_w = WCS(solved.pure_header())
-                t, (source_list, target_list) = astroalign.find_transform(
-                    source=fits.data(),
-                    target=solved.data()
-                )
+            ref_w = WCS(solved[0].pure_header())
+            t, (source_list, target_list) = astroalign.find_transform(
+                source=fits.data(),
+                target=solved[0].data()
+            )
 
-                xs = target_list[:, 0].flatten()
-                ys = target_list[:, 1].flatten()
+            xs = target_list[:, 0].flatten()
+            ys = target_list[:, 1].flatten()
 
-                new_xs = source_list[:, 0].flatten()
-                new_ys = source_list[:, 1].flatten()
+            new_xs = source_list[:, 0].flatten()
+            new_ys = source_list[:, 1].flatten()
 
-                skys = ref_w.pixel_to_world(xs.tolist(), ys.tolist())
-                w = fit_wcs_from_points([new_xs, new_ys], skys)
+            skys = ref_w.pixel_to_world(xs.tolist(), ys.tolist())
+            w = fit_wcs_from_points([new_xs, new_ys], skys)
 
-                temp_header = Header()
-                # temp_header.extend(fits.pure_header(), unique=True, update=True)
-                temp_header.extend(w.to_header(), unique=True)
-                new_fits = Fits.from_data_header(fits.data(), header=temp_header, output=file_name)
+            temp_header = Header()
+            # temp_header.extend(fits.pure_header(), unique=True, update=True)
+            temp_header.extend(w.to_header(), unique=True)
+            new_fits = Fits.from_data_header(fits.data(), header=temp_header, output=file_name)
+            return new_fits, new_fits.imstat()
 
-                group_layer.setFirstColumnSpanned(True)
-                file_name_layer = CustomQTreeWidgetItem(group_layer, [new_fits.file.name])
-                file_name_layer.setFirstColumnSpanned(True)
-
-                item = CustomQTreeWidgetItem(file_name_layer, ["Path", new_fits.file.resolve().parent.__str__()])
-                item.setFlags(QtCore.Qt.ItemIsEnabled)
-                stats = fits.imstat()
-                for key, value in stats.iloc[0].items():
-                    item = CustomQTreeWidgetItem(file_name_layer, [key.capitalize(), f"{value:.2f}"])
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                progress.setValue(iteration)
-
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
+        def solve_all(_):
+            if not solved:
+                self.parent.gui_functions.error("Couldn't solve the reference image")
+                return
 
-        progress.close()
-        if group_layer.childCount() == 0:
-            self.parent.treeWidget.takeTopLevelItem(self.parent.treeWidget.indexOfTopLevelItem(group_layer))
+            group_layer = CustomQTreeWidgetItem(self.parent.treeWidget, ["Solved"])
+            self.runner = self.parent.gui_functions.run_jobs(
+                self, "Solving ...", self.fits_array, fit_wcs,
+                on_result=lambda _, result: self.parent.gui_functions.add_result_to_tree(group_layer, *result),
+                on_finished=lambda _: self.parent.gui_functions.remove_if_empty(self.parent.treeWidget, group_layer),
+                workers=self.parent.settings.workers
+            )
 
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Solving reference ...", [reference], lambda fits: fits.solve_field(api_key, False),
+            on_result=lambda _, result: solved.append(result), on_finished=solve_all
+        )
 
     def load_files(self):
         files = [fits.file.name for fits in self.fits_array]
@@ -3634,40 +3673,29 @@ class WCSForm(QWidget, Ui_FormWCS):
         self.parent.gui_functions.add_to_combo(self.comboBoxFile, files)
 
     def info_update(self, x, y):
-        fits = self.fits_array[self.iteration]
         if self.canvas.check_cursor_location():
             the_x, the_y = self.canvas.get_data_xy(x, y)
             w, h = self.canvas.get_data_size()
             if not 0 < the_x < w or not 0 < the_y < h:
                 x_to_show, y_to_show = "---", "---"
-                ra, dec = "---", "---"
+                ra, dec, value = "---", "---", "---"
             else:
                 x_to_show, y_to_show = int(the_x), int(the_y)
-                try:
-                    sky = fits.pixels_to_skys(x_to_show, y_to_show)
-                    ra = sky["sky"].values[0].ra
-                    dec = sky["sky"].values[0].dec
-
-                except (ValueError, Unsolvable):
-                    ra, dec = "---", "---"
-
-            if x_to_show != "---":
-                value = self.canvas.get_data(x_to_show, y_to_show)
-            else:
-                value = "---"
+                ra, dec, value = cursor_text(*self.cursor_info.lookup(x_to_show, y_to_show))
 
             self.labelX.setText(x_to_show.__str__())
             self.labelY.setText(y_to_show.__str__())
-            self.labelRa.setText(ra.__str__())
-            self.labelDec.setText(dec.__str__())
-            self.labelValue.setText(value.__str__())
+            self.labelRa.setText(ra)
+            self.labelDec.setText(dec)
+            self.labelValue.setText(value)
 
     def goto(self):
         self.iteration = self.comboBoxFile.currentIndex()
         fits = self.fits_array[self.iteration]
         self.comboBoxFile.currentText()
         self.labelObject.setText(list(self.fits_array[0].header().to_dict().get("OBJECT", {1: ""}).values())[0])
-        self.img.load_data(fits.data())
+        data = self.display.load(fits)
+        self.cursor_info.load(fits, data)
 
     def rotate(self):
         warn = 0
@@ -3723,7 +3751,7 @@ class WCSForm(QWidget, Ui_FormWCS):
     def copy_value(self, x, y):
         try:
             the_x, the_y = self.canvas.get_data_xy(x, y)
-            value = self.canvas.get_data(the_x, the_y)
+            value = self.cursor_info.value(int(the_x), int(the_y))
             pd.DataFrame([f'{value}']).to_clipboard(index=False, header=False)
         except (ValueError, Unsolvable):
             pd.DataFrame([f'']).to_clipboard(index=False, header=False)
@@ -3731,7 +3759,7 @@ class WCSForm(QWidget, Ui_FormWCS):
     def eventFilter(self, source, event):
         fits = self.fits_array[self.iteration]
         if event.type() == QtCore.QEvent.MouseMove:
-            self.info_update(event.x(), event.y())
+            self.cursor_throttle.move(event.x(), event.y())
             return True
 
         if event.type() == QEvent.MouseButtonPress:
@@ -3904,51 +3932,46 @@ class HCalcForm(QWidget, Ui_FormHeaderCalculator):
         self.pushButtonGO.clicked.connect(self.go)
 
     def go(self):
-        warn = 0
-
         if not self.groupBoxTime.isChecked() and not self.groupBoxJDAirmass.isChecked():
             self.parent.gui_functions.error("No action. Nothing to do!")
             return
 
-        progress = QtWidgets.QProgressDialog("Calculating ...", "Abort", 0, len(self.fits_array), self)
-
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setFixedSize(progress.sizeHint() + QSize(400, 0))
-        progress.setWindowTitle('MYRaf: Please Wait')
-        progress.setAutoClose(True)
-
-        for iteration, fits in enumerate(self.fits_array):
-            progress.setLabelText(f"Operating on {fits.file.name}")
-            if progress.wasCanceled():
-                progress.setLabelText("ABORT!")
-                break
+        time_key = self.comboBoxTimeInHeader.currentText()
+        amount = self.doubleSpinBoxTimeAmount.value()
+        calculate_time = self.groupBoxTime.isChecked()
+        calculate_jd_airmass = self.groupBoxJDAirmass.isChecked()
+        observatory_key = self.comboBoxObservatoryInHeader.currentText()
+        object_key = self.comboBoxObjectInHeader.currentText()
+
+        time_delta = None
+        if calculate_time:
+            time_format = self.comboBoxTimeType.currentText()
+            if time_format == "Second":
+                time_delta = relativedelta(seconds=amount)
+            elif time_format == "Minute":
+                time_delta = relativedelta(minutes=amount)
+            elif time_format == "Hour":
+                time_delta = relativedelta(hours=amount)
+            elif time_format == "Day":
+                time_delta = relativedelta(days=amount)
+            elif time_format == "Month":
+                time_delta = relativedelta(months=amount)
+            elif time_format == "Year":
+                time_delta = relativedelta(years=amount)
+            else:
+                self.parent.gui_functions.error("Unrecognized time format.")
+                return
 
-            try:
-                current_time = Time(fits.pure_header()[self.comboBoxTimeInHeader.currentText()])
-                amount = self.doubleSpinBoxTimeAmount.value()
-                if self.groupBoxTime.isChecked():
-                    time_format = self.comboBoxTimeType.currentText()
-                    if time_format == "Second":
-                        time_delta = relativedelta(seconds=amount)
-                    elif time_format == "Minute":
-                        time_delta = relativedelta(minutes=amount)
-                    elif time_format == "Hour":
-                        time_delta = relativedelta(hours=amount)
-                    elif time_format == "Day":
-                        time_delta = relativedelta(days=amount)
-                    elif time_format == "Month":
-                        time_delta = relativedelta(months=amount)
-                    elif time_format == "Year":
-                        time_delta = relativedelta(years=amount)
-                    else:
-                        self.parent.gui_functions.error("Unrecognized time format.")
-                        return
+        def calculate(fits):
+            with fits.header_edit() as header:
+                current_time = Time(header[time_key])
+                if calculate_time:
                     new_time = Time(current_time.to_datetime() + time_delta)
-                    fits.hedit("MY-DATE", new_time.strftime("%Y-%m-%d %H:%M:%S.%f"), comments="Calculated By MYRaf")
+                    header["MY-DATE"] = (new_time.strftime("%Y-%m-%d %H:%M:%S.%f"), "Calculated By MYRaf")
 
-                if self.groupBoxJDAirmass.isChecked():
-                    observatory = fits.pure_header()[self.comboBoxObservatoryInHeader.currentText()]
-                    obj = fits.pure_header()[self.comboBoxObjectInHeader.currentText()]
+                if calculate_jd_airmass:
+                    observatory = header[observatory_key]
+                    obj = header[object_key]
                     sky_object = SkyCoord.from_name(obj)
                     location = ObservatoriesForm.get(observatory)
 
@@ -3960,17 +3983,13 @@ class HCalcForm(QWidget, Ui_FormHeaderCalculator):
                     altaz_frame = AltAz(obstime=current_time, location=location)
                     altaz = sky_object.transform_to(altaz_frame)
                     airmass = altaz.secz
-                    fits.hedit(["my_bjd", "my_hjd", "my_armss"], [hjd.jd, bjd.jd, airmass.value],
-                               comments=["Calculated By MYRaf", "Calculated By MYRaf", "Calculated By MYRaf"])
-            except Exception as e:
-                warn += 1
-                self.parent.logger.warning(e)
-
-            progress.setValue(iteration)
-        progress.close()
+                    header["my_bjd"] = (bjd.jd, "Calculated By MYRaf")
+                    header["my_hjd"] = (hjd.jd, "Calculated By MYRaf")
+                    header["my_armss"] = (airmass.value, "Calculated By MYRaf")
 
-        if warn > 0:
-            self.parent.gui_functions.toast(f"There were problems with {warn} files.\nCheck logs.")
+        self.runner = self.parent.gui_functions.run_jobs(
+            self, "Calculating ...", self.fits_array, calculate, workers=self.parent.settings.workers
+        )
 
     def load(self):
         header = self.fits_array[0].header()
@@ -4151,6 +4170,10 @@ class Setting:
     def settings_file(cls):
         return database_dir() / "settings.json"
 
+    @property
+    def workers(self) -> int:
+        return max(1, int(self.settings.get("workers", 1)))
+
     @property
     def settings(self) -> dict:
         settings_file = self.settings_file()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+import numpy as np
+from photutils.utils import calc_total_error
+from sep import Background
+
+__all__ = ["PhotometryContext", "PHOTOMETRY_DTYPE"]
+
+PHOTOMETRY_DTYPE = np.dtype([
+    ("xcentroid", float), ("ycentroid", float), ("ra", float), ("dec", float),
+    ("aperture", float), ("flux", float), ("flux_error", float), ("flag", np.int16),
+    ("snr", float), ("mag", float), ("merr", float)
+])
+
+
+class PhotometryContext:
+    """
+    The data of a frame with its background, background rms and total error
+    map. It is built once per frame and shared by all apertures and by both
+    the sep and photutils photometry back-ends.
+    """
+
+    def __init__(self, data: Any, exposure: Union[float, int] = 0.0) -> None:
+        self.data = data
+        self.exposure = exposure
+
+        self.background = Background(data)
+        self.rms = self.background.rms()
+        self.clean = data - self.rms
+        self.error = calc_total_error(data, self.background, exposure)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', shape:'{self.data.shape}', exposure:'{self.exposure}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import queue
+import threading
+from logging import getLogger, Logger
+from typing import Any, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from .zscale import ZScale
+
+if TYPE_CHECKING:
+    from .fits import Fits
+    from .fitsarray import FitsArray
+
+__all__ = ["FramePlayer"]
+
+FRAME = Tuple[int, "Fits", Any]
+
+
+class FramePlayer:
+    """
+    Plays the frames of a `FitsArray` from a bounded buffer filled by a
+    background thread.
+
+    The thread reads each frame ahead of time and (when `scale` is `True`)
+    converts it to an 8-bit image using zscale limits computed once, or
+    every `zscale_every` frames. Consumers only take ready frames from the
+    buffer, so the playback rate does not depend on the speed of the disk.
+
+    When looping over a `FitsArray` that fits in the buffer, the frames are
+    read once and replayed from memory.
+    """
+
+    def __init__(self, fits_array: FitsArray, buffer: int = 16, scale: bool = True, zscale_every: int = 0,
+                 loop: bool = True, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.fits_array = fits_array
+        self.buffer = max(1, buffer)
+        self.scale = scale
+        self.zscale_every = zscale_every
+        self.loop = loop
+
+        self._frames: queue.Queue = queue.Queue(maxsize=self.buffer)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._end = object()
+        self.finished = False
+
+    def __str__(self) -> str:
+        return (f"{self.__class__.__name__}(@: '{id(self)}', nof:'{len(self.fits_array)}', "
+                f"buffer:'{self.buffer}', running:'{self.is_running}')")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __del__(self) -> None:
+        if getattr(self, "_stop", None) is not None:
+            self.stop()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def __produce(self) -> None:
+        try:
+            cached: Optional[List[FRAME]] = [] if self.loop and len(self.fits_array) <= self.buffer else None
+            limits = None
+            number = 0
+            while not self._stop.is_set():
+                for index, fits in enumerate(self.fits_array):
+                    if self._stop.is_set():
+                        return
+
+                    try:
+                        image = fits.view() if self.scale else fits.data()
+                    except Exception as e:
+                        self.logger.warning(f"Frame {index} could not be read: {e}")
+                        continue
+
+                    if self.scale:
+                        if limits is None or (self.zscale_every > 0 and number % self.zscale_every == 0):
+                            limits = fits.zscale()
+
+                        image = ZScale.to_uint8(image, limits)
+
+                    number += 1
+                    frame = (index, fits, image)
+                    if cached is not None:
+                        cached.append(frame)
+
+                    if not self.__put(frame):
+                        return
+
+                if not self.loop or number == 0:
+                    break
+
+                if cached:
+                    # Every frame is in memory. Replay them without reading again
+                    while True:
+                        for frame in cached:
+                            if not self.__put(frame):
+                                return
+        except Exception as e:
+            self.logger.error(e)
+
+        self.__put(self._end)
+
+    def start(self) -> None:
+        """
+        Starts filling the buffer on a background thread
+        """
+        if self.is_running:
+            return
+
+        self._stop.clear()
+        self.finished = False
+        self._thread = threading.Thread(target=self.__produce, name="myraf-player", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread and empties the buffer
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        self._thread = None
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                break
+
+    def poll(self) -> Optional[FRAME]:
+        """
+        Returns the next frame if it's ready, without waiting
+
+        Returns
+        -------
+        Tuple[int, Fits, np.ndarray], optional
+            index of the frame in the `FitsArray`, the `Fits` object and its
+            (scaled) image. `None` if the next frame is not ready yet or the
+            playback is finished
+        """
+        if self.finished:
+            return None
+
+        try:
+            frame = self._frames.get_nowait()
+        except queue.Empty:
+            return None
+
+        if frame is self._end:
+            self.finished = True
+            return None
+
+        return frame
+
+    def frames(self) -> Iterator[FRAME]:
+        """
+        Returns the frames, waiting for each one to be ready. Starts the
+        player if it's not running
+
+        Returns
+        -------
+        Iterator[Tuple[int, Fits, np.ndarray]]
+            index of each frame in the `FitsArray`, the `Fits` object and its
+            (scaled) image. Ends after the last frame if `loop` is `False`
+        """
+        self.start()
+        while not self.finished:
+            try:
+                frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            if frame is self._end:
+                self.finished = True
+                return
+
+            yield frame
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from logging import getLogger, Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .fits import Fits
+
+__all__ = ["Pyramid"]
+
+# Number of rows of the full resolution data reduced at once
+STRIP = 512
+
+
+class Pyramid:
+    """
+    Block reduced (mean) copies of the data of a `Fits` object for display.
+
+    Each level `f` is the data binned by `f` in both axes, so a viewer
+    zoomed out by `f` or more can show it instead of the full resolution
+    data. All levels are made in a single pass over the file, strip by
+    strip, without reading the whole data at once. Regions shown at a
+    higher zoom are read from the full resolution data by `tile`.
+
+    When `cache_dir` is given the levels are saved there and memory-mapped
+    on the next use. A saved level is used only if the modification time
+    and size of the file are unchanged.
+    """
+
+    def __init__(self, fits: Fits, factors: Sequence[int] = (2, 4, 8),
+                 cache_dir: Optional[Union[str, Path]] = None, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        if len(factors) == 0 or any(int(factor) < 2 for factor in factors):
+            self.logger.error("Factors must be integers bigger than 1")
+            raise ValueError("Factors must be integers bigger than 1")
+
+        self.fits = fits
+        self.factors: List[int] = sorted({int(factor) for factor in factors})
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+
+        header = fits.pure_header()
+        if header.get("NAXIS", 0) != 2:
+            self.logger.error("Only 2D images are supported")
+            raise ValueError("Only 2D images are supported")
+
+        self.shape: Tuple[int, int] = (int(header["NAXIS2"]), int(header["NAXIS1"]))
+
+        self._levels: Dict[int, Any] = {}
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', fits:'{self.fits}', factors:'{self.factors}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(abs(self.fits))
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def __prefix(self) -> str:
+        return hashlib.sha1(abs(self.fits).encode()).hexdigest()[:16]
+
+    def __path(self, factor: int) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+
+        signature = self.__signature()
+        if signature is None:
+            return None
+
+        return self.cache_dir / f"{self.__prefix()}-{signature[0]}-{signature[1]}-{factor}.npy"
+
+    def __load(self, factor: int) -> Optional[Any]:
+        path = self.__path(factor)
+        if path is None or not path.exists():
+            return None
+
+        try:
+            level = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load the cached level {factor}: {e}")
+            return None
+
+        if level.shape != self.level_shape(factor):
+            return None
+
+        return level
+
+    def __save(self, factor: int, level: Any) -> None:
+        path = self.__path(factor)
+        if path is None:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in path.parent.glob(f"{self.__prefix()}-*-{factor}.npy"):
+                stale.unlink()
+
+            temporary = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(temporary, level)
+            os.replace(temporary, path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache the level {factor}: {e}")
+
+    def level_shape(self, factor: int) -> Tuple[int, int]:
+        """
+        Returns the shape of a level
+
+        Parameters
+        ----------
+        factor : int
+            the binning factor of the level
+
+        Returns
+        -------
+        Tuple[int, int]
+            number of rows and columns of the level
+        """
+        return math.ceil(self.shape[0] / factor), math.ceil(self.shape[1] / factor)
+
+    def build(self) -> None:
+        """
+        Makes the levels that are not in memory or in the cache directory, in
+        a single pass over the data
+        """
+        missing = []
+        for factor in self.factors:
+            if factor in self._levels:
+                continue
+
+            level = self.__load(factor)
+            if level is None:
+                missing.append(factor)
+            else:
+                self._levels[factor] = level
+
+        if not missing:
+            return
+
+        self.logger.info(f"Making the levels {missing}")
+
+        data = self.fits.view()
+        step = math.lcm(*missing)
+        strip = step * max(1, STRIP // step)
+
+        levels = {factor: np.empty(self.level_shape(factor), dtype=np.float32) for factor in missing}
+        for start in range(0, self.shape[0], strip):
+            block = np.asarray(data[start:start + strip], dtype=float)
+            finite = np.isfinite(block)
+            block = np.where(finite, block, 0.0)
+            finite = finite.astype(float)
+            for factor in missing:
+                # Strips start at a multiple of every factor, so each one
+                # makes complete rows of the level
+                rows = np.arange(0, block.shape[0], factor)
+                columns = np.arange(0, block.shape[1], factor)
+                row = start // factor
+                sums = np.add.reduceat(np.add.reduceat(block, rows, axis=0), columns, axis=1)
+                counts = np.add.reduceat(np.add.reduceat(finite, rows, axis=0), columns, axis=1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    levels[factor][row:row + sums.shape[0]] = sums / counts
+
+        for factor, level in levels.items():
+            self.__save(factor, level)
+            self._levels[factor] = level
+
+    def level(self, factor: int) -> Any:
+        """
+        Returns a level
+
+        Parameters
+        ----------
+        factor : int
+            the binning factor of the level
+
+        Returns
+        -------
+        np.ndarray
+            the data binned by `factor` (mean of each block, ignoring `NaN`
+            values)
+
+        Raises
+        ------
+        ValueError
+            when the `factor` is not one of `factors`
+        """
+        if factor not in self.factors:
+            self.logger.error(f"No level with factor {factor}")
+            raise ValueError(f"No level with factor {factor}. Available factors are {self.factors}")
+
+        if factor not in self._levels:
+            self.build()
+
+        return self._levels[factor]
+
+    def factor_for(self, scale: float) -> int:
+        """
+        Returns the biggest factor whose level is not magnified at the given
+        zoom scale
+
+        Parameters
+        ----------
+        scale : float
+            zoom scale of the viewer (screen pixels per data pixel)
+
+        Returns
+        -------
+        int
+            the factor of the level to show. `1` if the full resolution data
+            should be shown
+        """
+        fitting = [factor for factor in self.factors if factor * scale <= 1]
+        return fitting[-1] if fitting else 1
+
+    def tile(self, x: int, y: int, width: int, height: int) -> Tuple[Any, int, int]:
+        """
+        Returns a region of the full resolution data. The region is clipped to
+        the boundaries of the data
+
+        Parameters
+        ----------
+        x : int
+            x coordinate of top left
+        y : int
+            y coordinate of top left
+        width : int
+            width of the region
+        height : int
+            height of the region
+
+        Returns
+        -------
+        Tuple[np.ndarray, int, int]
+            the region and the x and y coordinates of its top left after
+            clipping
+
+        Raises
+        ------
+        IndexError
+            when the region is out of boundaries
+        """
+        x1, y1 = max(int(x), 0), max(int(y), 0)
+        x2, y2 = min(int(x + width), self.shape[1]), min(int(y + height), self.shape[0])
+        if x2 <= x1 or y2 <= y1:
+            self.logger.error("Out of boundaries")
+            raise IndexError("Out of boundaries")
+
+        return self.fits.cutout(x1, y1, x2 - x1, y2 - y1), x1, y1
+
+    def clear(self) -> None:
+        """
+        Removes the levels from memory and the cache directory
+        """
+        self._levels.clear()
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return
+
+        for path in self.cache_dir.glob(f"{self.__prefix()}-*.npy"):
+            try:
+                path.unlink()
+            except OSError as e:
+                self.logger.warning(f"Could not remove {path}: {e}")
@@ -1,6 +1,9 @@
+import os
+import re
+import shutil
 import tempfile
 from pathlib import Path, PurePath
-from typing import Optional, Union, List, Tuple, Any
+from typing import Optional, Union, List, Tuple, Any, Dict
 
 import numpy as np
 
@@ -134,6 +137,71 @@ class Fixer:
 
         return to_write
 
+    @staticmethod
+    def strips(height: int, width: int, number_of_frames: int,
+               mem_limit: float, memory_factor: int = 3) -> List[Tuple[int, int]]:
+        """
+        Splits the rows of images into strips so the float64 stack of
+        `number_of_frames` strips fits into `mem_limit` bytes
+
+        Parameters
+        ----------
+        height : int
+            number of rows of each image
+        width : int
+            number of columns of each image
+        number_of_frames : int
+            number of images to be stacked
+        mem_limit : float
+            memory limit in bytes
+        memory_factor : int, default=3
+            number of copies of the stack a combine needs (data, mask and temporaries)
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            start (inclusive) and stop (exclusive) rows of each strip
+        """
+        row_size = width * number_of_frames * np.dtype(float).itemsize * memory_factor
+        rows = max(1, min(height, int(mem_limit // max(row_size, 1))))
+
+        return [(start, min(start + rows, height)) for start in range(0, height, rows)]
+
+    @staticmethod
+    def tiles(height: int, width: int, tile_size: int,
+              halo: int) -> List[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+        """
+        Splits an image into square tiles with an overlapping halo
+
+        Parameters
+        ----------
+        height : int
+            number of rows of the image
+        width : int
+            number of columns of the image
+        tile_size : int
+            size of the core of each tile
+        halo : int
+            number of pixels added around each core. clipped at the edges of the image
+
+        Returns
+        -------
+        List[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]
+            `(y0, y1, x0, x1)` of each tile with its halo and of its core
+        """
+        tile_size = max(1, int(tile_size))
+        tiles = []
+        for y0 in range(0, height, tile_size):
+            y1 = min(y0 + tile_size, height)
+            for x0 in range(0, width, tile_size):
+                x1 = min(x0 + tile_size, width)
+                tiles.append((
+                    (max(0, y0 - halo), min(height, y1 + halo), max(0, x0 - halo), min(width, x1 + halo)),
+                    (y0, y1, x0, x1)
+                ))
+
+        return tiles
+
     @staticmethod
     def output(output: Optional[str] = None, override: bool = False,
                prefix: str = "myraf_", suffix: str = ".fits",
@@ -326,3 +394,258 @@ class Check:
         if method is not None:
             if method not in ["sigma", "minmax"]:
                 raise ValueError("Method can only be one of these: sigma, minmax")
+
+
+class RawHeader:
+    BLOCK = 2880
+    CARD = 80
+    DATA_TYPES = {8: ">u1", 16: ">i2", 32: ">i4", 64: ">i8", -32: ">f4", -64: ">f8"}
+    STRING = re.compile(r"'(?P<string>([ -~]+?|''|) *?)'(?=$|/| )")
+
+    @classmethod
+    def raw_string(cls, value: str) -> Optional[str]:
+        """
+        Returns a quoted string value as it is written in the card, with its
+        quotes still doubled and the trailing spaces removed
+
+        Parameters
+        ----------
+        value : str
+            the value part of the card (after `= `)
+
+        Returns
+        -------
+        Optional[str]
+            the string between the quotes. `None` if the value is not a
+            quoted string
+        """
+        match = cls.STRING.match(value.strip())
+        if match is None:
+            return None
+
+        return match.group("string").rstrip()
+
+    @classmethod
+    def parse_value(cls, value: str) -> Any:
+        """
+        Parses the value part of a header card
+
+        Parameters
+        ----------
+        value : str
+            the value part of the card (after `= `)
+
+        Returns
+        -------
+        Any
+            the value as str, bool, int, or float. `None` if it cannot be parsed
+        """
+        value = value.strip()
+
+        if value.startswith("'"):
+            raw = cls.raw_string(value)
+            if raw is None:
+                return value[1:].replace("''", "'").rstrip()
+            return raw.replace("''", "'")
+
+        value = value.split("/", 1)[0].strip()
+
+        if value == "T":
+            return True
+
+        if value == "F":
+            return False
+
+        try:
+            return int(value)
+        except ValueError:
+            pass
+
+        try:
+            return float(value.replace("D", "E"))
+        except ValueError:
+            return None
+
+    @classmethod
+    def parse_card(cls, card: str) -> Tuple[str, Any]:
+        """
+        Parses a header card to its keyword and value
+
+        Parameters
+        ----------
+        card : str
+            the 80 character card
+
+        Returns
+        -------
+        Tuple[str, Any]
+            the keyword and the value. The value is `None` if the card has no value
+        """
+        if card.startswith("HIERARCH ") and "=" in card:
+            keyword, value = card[9:].split("=", 1)
+            return keyword.strip(), cls.parse_value(value)
+
+        keyword = card[:8].strip()
+        if card[8:10] != "= ":
+            return keyword, None
+
+        return keyword, cls.parse_value(card[10:])
+
+    @classmethod
+    def read(cls, path: str, keys: Optional[List[str]] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Reads the primary header of the given file block by block until the
+        `END` card without building an astropy `Header`
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        keys : List[str], optional
+            keys to be parsed. All keys are parsed if it's `None`
+
+        Notes
+        -----
+        Only the first card of a repeated key is kept, like astropy does. Long
+        string values continued with `CONTINUE` cards are joined.
+
+        Returns
+        -------
+        Tuple[Dict[str, Any], int]
+            the parsed keys and values, and the offset of the data unit in bytes
+
+        Raises
+        ------
+        ValueError
+            when the file is not a fits file or the `END` card is missing
+        """
+        wanted = None if keys is None else set(keys)
+        cards: Dict[str, Any] = {}
+        continued = None
+        continued_raw = ""
+
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                block = f.read(cls.BLOCK)
+                if len(block) < cls.BLOCK:
+                    raise ValueError("END card not found. Maybe it is not a fits file.")
+
+                if offset == 0 and not block.startswith(b"SIMPLE  ="):
+                    raise ValueError("Not a fits file")
+
+                offset += cls.BLOCK
+                text = block.decode("ascii", errors="replace")
+                for i in range(0, cls.BLOCK, cls.CARD):
+                    card = text[i:i + cls.CARD]
+                    if card.rstrip() == "END":
+                        return cards, offset
+
+                    if card.startswith("CONTINUE"):
+                        part = None if continued is None else cls.raw_string(card[8:])
+                        if part is not None:
+                            continued_raw += part[:-1] if part.endswith("&") else part
+                            cards[continued] = continued_raw.replace("''", "'")
+                            if part.endswith("&"):
+                                continue
+
+                        continued = None
+                        continue
+
+                    continued = None
+                    if wanted is not None and card[:8].strip() not in wanted and not card.startswith("HIERARCH "):
+                        continue
+
+                    keyword, value = cls.parse_card(card)
+                    if not keyword or keyword in ("COMMENT", "HISTORY"):
+                        continue
+
+                    if (wanted is None or keyword in wanted) and keyword not in cards:
+                        cards[keyword] = value
+                        if isinstance(value, str) and value.endswith("&"):
+                            continued = keyword
+                            continued_raw = (cls.raw_string(card.split("=", 1)[1]) or "&")[:-1]
+
+    @classmethod
+    def text(cls, path: str) -> str:
+        """
+        Reads the primary header of the given file block by block until the
+        block holding the `END` card
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+
+        Returns
+        -------
+        str
+            the header blocks. Its length is the offset of the data unit
+
+        Raises
+        ------
+        ValueError
+            when the file is not a fits file or the `END` card is missing
+        """
+        blocks: List[str] = []
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(cls.BLOCK)
+                if len(block) < cls.BLOCK:
+                    raise ValueError("END card not found. Maybe it is not a fits file.")
+
+                if not blocks and not block.startswith(b"SIMPLE  ="):
+                    raise ValueError("Not a fits file")
+
+                text = block.decode("ascii", errors="replace")
+                blocks.append(text)
+                if any(text[i:i + cls.CARD].rstrip() == "END" for i in range(0, cls.BLOCK, cls.CARD)):
+                    return "".join(blocks)
+
+    @classmethod
+    def write(cls, path: str, cards: str, offset: int) -> bool:
+        """
+        Writes the header cards to the given file in front of its data unit
+
+        Notes
+        -----
+        The cards are followed by `END` and the last block is filled with
+        spaces. If they need as many blocks as the existing header, only the
+        header blocks are overwritten. Otherwise the file is rewritten with
+        the data unit (and everything after it) copied as is.
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        cards : str
+            the header cards without the `END` card and padding
+        offset : int
+            offset of the data unit (size of the existing header blocks)
+
+        Returns
+        -------
+        bool
+            `True` if the header was overwritten in place
+        """
+        text = cards + "END".ljust(cls.CARD)
+        text += " " * (-len(text) % cls.BLOCK)
+
+        # The data unit starts right after the block holding END
+        if len(text) == offset:
+            with open(path, "r+b") as f:
+                f.write(text.encode("ascii"))
+
+            return True
+
+        with open(path, "rb") as source, tempfile.NamedTemporaryFile(
+                dir=Path(path).parent, suffix=".fits", delete=False
+        ) as target:
+            target.write(text.encode("ascii"))
+            source.seek(offset)
+            shutil.copyfileobj(source, target)
+
+        shutil.copymode(path, target.name)
+        os.replace(target.name, path)
+
+        return False
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import queue
+import threading
+from logging import getLogger, Logger
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+import pandas as pd
+from astropy.io import fits as fts
+from astropy.io.fits.header import Header
+from astropy.table import Table
+from astropy.time import Time
+from typing_extensions import Self
+
+from .error import NumberOfElementError
+from .fits import MemoryFits
+from .utils import Fixer, RawHeader
+
+__all__ = ["VideoCube"]
+
+
+def probe(path: str) -> Tuple[float, int, int, int]:
+    """
+    Returns the properties of a video as reported by its container
+
+    Parameters
+    ----------
+    path : str
+        path of the video
+
+    Returns
+    -------
+    Tuple[float, int, int, int]
+        frames per second, number of frames (an estimate for some containers),
+        width and height
+
+    Raises
+    ------
+    ValueError
+        when the video cannot be opened
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise ValueError(f"Cannot open the video {path}")
+
+        return (
+            capture.get(cv2.CAP_PROP_FPS),
+            max(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), 0),
+            int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+    finally:
+        capture.release()
+
+
+def read_frames(path: str, logger: Logger) -> Iterator[Tuple[int, Optional[Any]]]:
+    """
+    Decodes the frames of a video as gray images
+
+    Parameters
+    ----------
+    path : str
+        path of the video
+    logger : Logger
+        the logger
+
+    Returns
+    -------
+    Iterator[Tuple[int, Optional[np.ndarray]]]
+        number of each frame and its gray image. The image is `None` if the
+        frame could not be converted. Decoding stops at the first frame that
+        cannot be read.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        number = 0
+        while True:
+            success, frame = capture.read()
+            if not success:
+                break
+
+            try:
+                yield number, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            except cv2.error as e:
+                logger.warning(f"Frame {number} could not be converted: {e}")
+                yield number, None
+
+            number += 1
+    finally:
+        capture.release()
+
+
+def prefetch(items: Iterable[Any], size: int) -> Iterator[Any]:
+    """
+    Iterates over `items` on a background thread, keeping at most `size`
+    items ahead of the consumer
+
+    Parameters
+    ----------
+    items : Iterable[Any]
+        the items
+    size : int
+        maximum number of items waiting to be consumed
+
+    Returns
+    -------
+    Iterator[Any]
+        the items in the same order. An exception raised while iterating is
+        raised in the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, size))
+    stop = threading.Event()
+    end = object()
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                put((item, None))
+        except Exception as e:
+            put((end, e))
+        else:
+            put((end, None))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="myraf-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class VideoCube:
+    """
+    The frames of a video in a single 3D fits file.
+
+    The primary data unit holds the gray frames as a `(frames, height,
+    width)` cube of unsigned bytes and a `FRAMES` table extension holds the
+    number, relative time (`MY-RELJD`) and exposure (`MY-EXPTM`) of each
+    frame. The cube is read through a read-only memory map, so a frame is
+    only read from the disk when its data is used.
+
+    A temporary cube is deleted when neither it nor any of its frames is
+    referenced anymore.
+    """
+    TABLE = "FRAMES"
+
+    def __init__(self, path: str, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.file = Path(path)
+        self.is_temp = False
+
+        try:
+            cards, offset = RawHeader.read(
+                abs(self), ["BITPIX", "NAXIS", "NAXIS1", "NAXIS2", "NAXIS3", "BZERO", "BSCALE"]
+            )
+        except ValueError as e:
+            self.logger.error(e)
+            raise
+
+        if cards.get("NAXIS") != 3 or cards.get("BITPIX") not in RawHeader.DATA_TYPES:
+            self.logger.error("The file is not an image cube")
+            raise ValueError("The file is not an image cube")
+
+        if cards.get("BZERO", 0) != 0 or cards.get("BSCALE", 1) != 1:
+            self.logger.error("Scaled cubes are not supported")
+            raise ValueError("Scaled cubes are not supported")
+
+        shape = (cards["NAXIS3"], cards["NAXIS2"], cards["NAXIS1"])
+        self.data = np.memmap(
+            abs(self), dtype=np.dtype(RawHeader.DATA_TYPES[cards["BITPIX"]]), mode="r", offset=offset, shape=shape
+        )
+
+        try:
+            self.times = Table.read(abs(self), hdu=self.TABLE).to_pandas()
+        except (KeyError, ValueError):
+            self.times = pd.DataFrame({"FRAME": np.arange(shape[0])})
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', path:'{self.file}', shape:'{self.data.shape}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __abs__(self) -> str:
+        return str(self.file.absolute())
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, index: int) -> Any:
+        return self.data[index]
+
+    def __del__(self) -> None:
+        if getattr(self, "is_temp", False):
+            del self.data
+            try:
+                self.file.unlink()
+            except OSError as e:
+                self.logger.warning(e)
+
+    @classmethod
+    def from_video(cls, path: str, output: Optional[str] = None, override: bool = False,
+                   start_time: Optional[Union[Time, float]] = None, background: bool = False,
+                   buffer: int = 64, logger: Optional[Logger] = None) -> Self:
+        """
+        Streams the frames of a video into a 3D fits cube
+
+        Notes
+        -----
+        The header is written first and each decoded frame is appended to the
+        file as it arrives, so only `buffer` frames are kept in memory. The
+        number of frames in the header is corrected in place when the video
+        ends. A frame that cannot be converted is skipped and logged.
+
+        Parameters
+        ----------
+        path : str
+            path of the video
+        output : str, optional
+            path of the cube. A temporary file is created if it's `None`
+        override : bool, default=False
+            delete already existing file if `true`
+        start_time: Time or float, optional
+            start time of the video
+        background : bool, default=False
+            decode the frames on a background thread while they are written
+        buffer : int, default=64
+            maximum number of decoded frames waiting to be written when
+            `background` is `True`
+        logger: Logger, optional
+            The logger
+
+        Returns
+        -------
+        VideoCube
+            the cube
+
+        Raises
+        ------
+        FileNotFoundError
+            when the video does not exist
+        FileExistsError
+            when the output does exist and `override` is `False`
+        NumberOfElementError
+            when no frame could be read
+        """
+        logger = getLogger(cls.__name__) if logger is None else logger
+
+        if not Path(path).exists():
+            logger.error(f"{path} does not exist")
+            raise FileNotFoundError(f"{path} does not exist")
+
+        fps, estimate, width, height = probe(path)
+        new_output = Fixer.output(output=output, override=override, prefix="myraf_video_")
+
+        if isinstance(start_time, Time):
+            first = start_time.jd
+        elif isinstance(start_time, float):
+            first = start_time
+        else:
+            first = 0
+
+        header = Header([
+            ("SIMPLE", True), ("BITPIX", 8), ("NAXIS", 3),
+            ("NAXIS1", width), ("NAXIS2", height), ("NAXIS3", estimate), ("EXTEND", True),
+            ("MY-FPS", fps, "Frames per second of the video"),
+        ])
+
+        frames = read_frames(path, logger)
+        if background:
+            frames = prefetch(frames, buffer)
+
+        numbers = []
+        padding = 0
+        with open(new_output, "wb") as f:
+            f.write(header.tostring().encode("ascii"))
+            offset = f.tell()
+            for number, frame in frames:
+                if frame is None:
+                    continue
+
+                if frame.shape != (height, width):
+                    logger.warning(f"Frame {number} has a shape of {frame.shape}. Expected {(height, width)}")
+                    continue
+
+                f.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+                numbers.append(number)
+
+            padding = -(len(numbers) * height * width) % RawHeader.BLOCK
+            f.write(b"\0" * padding)
+
+        if not numbers:
+            Path(new_output).unlink()
+            logger.error("No frame could be read from the video")
+            raise NumberOfElementError("No frame could be read from the video")
+
+        if len(numbers) != estimate:
+            logger.info(f"The video has {len(numbers)} frames. {estimate} were expected")
+            header["NAXIS3"] = len(numbers)
+            RawHeader.write(new_output, header.tostring(endcard=False, padding=False), offset)
+
+        frame_numbers = np.array(numbers)
+        table = fts.table_to_hdu(Table({
+            "FRAME": frame_numbers,
+            "MY-RELJD": (first + frame_numbers) / (fps * 86400),
+            "MY-EXPTM": np.full(len(frame_numbers), 1 / fps),
+        }))
+        table.name = cls.TABLE
+        with fts.open(new_output, mode="append") as hdu:
+            hdu.append(table)
+
+        cube = cls(new_output, logger=logger)
+        cube.is_temp = output is None
+        return cube
+
+    def frames(self) -> List[MemoryFits]:
+        """
+        Returns each frame as a `MemoryFits` whose data is a view of the cube.
+        The frames keep the cube alive
+
+        Returns
+        -------
+        List[MemoryFits]
+            the frames with their `MY-RELJD` and `MY-EXPTM` in the header
+        """
+        records = self.times.to_dict("records")
+        template = fts.PrimaryHDU(data=self.data[0]).header
+
+        frames = []
+        for index, record in enumerate(records[:len(self)]):
+            header = template.copy()
+            for key, value in record.items():
+                if key != "FRAME":
+                    header[key] = value.item() if isinstance(value, np.generic) else value
+
+            header["MY-FRAME"] = int(record["FRAME"])
+            frames.append(MemoryFits.from_view(self.data[index], header, logger=self.logger, owner=self))
+
+        return frames
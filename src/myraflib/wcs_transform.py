@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import math
+from logging import getLogger, Logger
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from astropy.io.fits.header import Header
+from astropy.wcs import WCS, Sip
+from scipy.signal import convolve2d
+
+__all__ = ["WCSTransform"]
+
+
+class WCSTransform:
+    """
+    Closed form updates of a `WCS` for the geometric operations of `Fits`.
+
+    Each operation is an affine map between the pixels of the new and the
+    old image: `p_old = matrix @ p_new + offset` (0 based `x, y`). The
+    reference pixel, the linear transformation (`CD` or `PC`) and the `SIP`
+    polynomials are updated so that every new pixel maps to the same sky
+    coordinate as the old pixel it came from.
+
+    Notes
+    -----
+    Lookup table distortions (`CPDIS`, `D2IM`) are kept as they are.
+    """
+
+    def __init__(self, wcs: WCS, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        self.wcs = wcs
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', celestial:'{self.wcs.has_celestial}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @staticmethod
+    def __substitute(coefficients: Any, matrix: Any) -> Any:
+        """
+        Returns the coefficients of `P(matrix @ (u, v))` for the polynomial
+        `P(u, v) = sum(coefficients[p, q] * u ** p * v ** q)`
+        """
+        order = coefficients.shape[0] - 1
+
+        first = np.array([[0, matrix[0, 1]], [matrix[0, 0], 0]], dtype=float)
+        second = np.array([[0, matrix[1, 1]], [matrix[1, 0], 0]], dtype=float)
+
+        firsts: List[Any] = [np.ones((1, 1))]
+        seconds: List[Any] = [np.ones((1, 1))]
+        for _ in range(order):
+            firsts.append(convolve2d(firsts[-1], first))
+            seconds.append(convolve2d(seconds[-1], second))
+
+        result = np.zeros((order + 1, order + 1))
+        for p, q in zip(*np.nonzero(coefficients)):
+            if p + q > order:
+                continue
+
+            term = convolve2d(firsts[p], seconds[q])
+            result[:term.shape[0], :term.shape[1]] += coefficients[p, q] * term
+
+        return result
+
+    @classmethod
+    def __distortion(cls, first: Optional[Any], second: Optional[Any],
+                     matrix: Any) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Returns the coefficients of the distortion `(f, g)` in the new
+        pixels: `matrix^-1 @ (f, g)(matrix @ (u, v))`
+        """
+        if first is None or second is None:
+            return first, second
+
+        order = max(first.shape[0], second.shape[0])
+        padded = []
+        for coefficients in (first, second):
+            each = np.zeros((order, order))
+            each[:coefficients.shape[0], :coefficients.shape[1]] = coefficients
+            padded.append(cls.__substitute(each, matrix))
+
+        inverse = np.linalg.inv(matrix)
+        return (
+            inverse[0, 0] * padded[0] + inverse[0, 1] * padded[1],
+            inverse[1, 0] * padded[0] + inverse[1, 1] * padded[1],
+        )
+
+    def affine(self, matrix: Any, offset: Any) -> WCSTransform:
+        """
+        Returns the transform of the `WCS` of the image whose pixels are
+        mapped to the old ones by `p_old = matrix @ p_new + offset`
+
+        Parameters
+        ----------
+        matrix : np.ndarray
+            2x2 matrix acting on `(x, y)`
+        offset : np.ndarray
+            `(x, y)` offset (0 based pixels)
+
+        Returns
+        -------
+        WCSTransform
+            the transform with the updated `WCS`
+        """
+        if not self.wcs.has_celestial:
+            self.logger.info("No WCS found in header")
+            return self
+
+        matrix = np.asarray(matrix, dtype=float)
+        offset = np.asarray(offset, dtype=float)
+        inverse = np.linalg.inv(matrix)
+
+        w = self.wcs.deepcopy()
+
+        crpix = np.array(w.wcs.crpix, dtype=float)
+        crpix[:2] = inverse @ (crpix[:2] - 1 - offset) + 1
+
+        full = np.identity(w.naxis)
+        full[:2, :2] = matrix
+
+        if w.wcs.has_cd():
+            w.wcs.cd = w.wcs.cd @ full
+        else:
+            w.wcs.pc = w.wcs.get_pc() @ full
+
+        w.wcs.crpix = crpix
+
+        if w.sip is not None:
+            a, b = self.__distortion(w.sip.a, w.sip.b, matrix)
+            ap, bp = self.__distortion(w.sip.ap, w.sip.bp, matrix)
+            w.sip = Sip(a, b, ap, bp, crpix[:2])
+
+        if any(each is not None for each in (w.cpdis1, w.cpdis2, w.det2im1, w.det2im2)):
+            self.logger.warning("Lookup table distortions are not transformed")
+
+        w.wcs.set()
+        return self.__class__(w, logger=self.logger)
+
+    def shift(self, x: float, y: float) -> WCSTransform:
+        """
+        Returns the transform for the image shifted by `x` and `y` pixels
+
+        Parameters
+        ----------
+        x : float
+            shift along the x axis
+        y : float
+            shift along the y axis
+
+        Returns
+        -------
+        WCSTransform
+            the transform with the updated `WCS`
+        """
+        return self.affine(np.identity(2), [-x, -y])
+
+    def crop(self, x: int, y: int) -> WCSTransform:
+        """
+        Returns the transform for the image cropped with the top left corner
+        at `x` and `y`
+
+        Parameters
+        ----------
+        x : int
+            x coordinate of top left
+        y : int
+            y coordinate of top left
+
+        Returns
+        -------
+        WCSTransform
+            the transform with the updated `WCS`
+        """
+        return self.affine(np.identity(2), [x, y])
+
+    def bin(self, x_factor: int, y_factor: int) -> WCSTransform:
+        """
+        Returns the transform for the image binned in blocks of `x_factor`
+        by `y_factor` pixels starting from the first pixel
+
+        Parameters
+        ----------
+        x_factor : int
+            binning factor along the x axis
+        y_factor : int
+            binning factor along the y axis
+
+        Returns
+        -------
+        WCSTransform
+            the transform with the updated `WCS`
+        """
+        return self.affine(
+            np.diag([x_factor, y_factor]), [(x_factor - 1) / 2, (y_factor - 1) / 2]
+        )
+
+    def rotate(self, angle: float, shape: Tuple[int, int]) -> WCSTransform:
+        """
+        Returns the transform for the image rotated about its center as
+        `scipy.ndimage.rotate` does with `reshape=False`
+
+        Parameters
+        ----------
+        angle : float
+            rotation angle (radians)
+        shape : Tuple[int, int]
+            shape of the image (rows, columns)
+
+        Returns
+        -------
+        WCSTransform
+            the transform with the updated `WCS`
+        """
+        center = np.array([shape[1] - 1, shape[0] - 1]) / 2
+        cos, sin = math.cos(angle), math.sin(angle)
+        matrix = np.array([[cos, -sin], [sin, cos]])
+
+        return self.affine(matrix, center - matrix @ center)
+
+    def header(self) -> Header:
+        """
+        Returns the `WCS` as header cards, with the `SIP` polynomials if any
+
+        Returns
+        -------
+        Header
+            the header
+        """
+        return self.wcs.to_header(relax=self.wcs.sip is not None)
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from logging import getLogger, Logger
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+from astropy.visualization import ZScaleInterval
+
+if TYPE_CHECKING:
+    from .fits import Fits
+
+__all__ = ["ZScale"]
+
+
+class ZScale:
+    """
+    Approximate zscale limits of images computed from a stratified sample
+    of pixels.
+
+    The image is divided into a grid of about `n_samples` cells and one
+    pixel is picked from each cell, so only the sampled pixels are read
+    from a memory-mapped file. The limits are then fitted by
+    `ZScaleInterval` on the sample.
+
+    The limits of fits files are cached with the modification time and
+    size of the file, in memory and, when `path` is given, in a JSON
+    sidecar file shared between sessions.
+    """
+
+    def __init__(self, n_samples: int = 1000, contrast: float = 0.25,
+                 path: Optional[Union[str, Path]] = None, logger: Optional[Logger] = None) -> None:
+        self.logger = getLogger(f"{self.__class__.__name__}") if logger is None else logger
+
+        if n_samples < 1:
+            self.logger.error("n_samples must be positive")
+            raise ValueError("n_samples must be positive")
+
+        self.n_samples = n_samples
+        self.contrast = contrast
+        self.path = None if path is None else str(Path(path).absolute())
+
+        self._items: Dict[str, Tuple[Tuple[int, int], Tuple[float, float]]] = {}
+        self._lock = Lock()
+
+        if self.path is not None and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    stored = json.load(f)
+                self._items = {
+                    key: (tuple(signature), tuple(limits)) for key, (signature, limits) in stored.items()
+                }
+            except (OSError, ValueError, TypeError) as e:
+                self.logger.warning(f"Could not read the zscale limits from {self.path}: {e}")
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(@: '{id(self)}', n_samples:'{self.n_samples}', nof:'{len(self)}')"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def sample(self, data: Any) -> Any:
+        """
+        Returns a stratified sample of the finite pixels of the data
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the data. It is not copied or converted
+
+        Returns
+        -------
+        np.ndarray
+            about `n_samples` finite values as `float`
+        """
+        data = np.asarray(data) if not isinstance(data, np.ndarray) else data
+        if data.size <= self.n_samples:
+            values = np.asarray(data, dtype=float).ravel()
+        elif data.ndim != 2:
+            stride = math.ceil(data.size / self.n_samples)
+            values = np.asarray(data.reshape(-1)[::stride], dtype=float)
+        else:
+            ny, nx = data.shape
+            rows = min(ny, max(1, round(math.sqrt(self.n_samples * ny / nx))))
+            columns = min(nx, max(1, math.ceil(self.n_samples / rows)))
+
+            row_edges = np.linspace(0, ny, rows + 1).astype(int)
+            column_edges = np.linspace(0, nx, columns + 1).astype(int)
+
+            # A fixed seed, so the same image always gives the same limits
+            rng = np.random.default_rng(0)
+            ys = row_edges[:-1, np.newaxis] + (
+                    rng.random((rows, columns)) * np.diff(row_edges)[:, np.newaxis]
+            ).astype(int)
+            xs = column_edges[np.newaxis, :-1] + (
+                    rng.random((rows, columns)) * np.diff(column_edges)[np.newaxis, :]
+            ).astype(int)
+            values = np.asarray(data[ys.ravel(), xs.ravel()], dtype=float)
+
+        return values[np.isfinite(values)]
+
+    def get_limits(self, data: Any) -> Tuple[float, float]:
+        """
+        Returns the zscale limits of the data
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the data in any data type
+
+        Returns
+        -------
+        Tuple[float, float]
+            the lower and upper limits
+        """
+        values = self.sample(data)
+        if values.size == 0:
+            self.logger.warning("No finite values to compute the zscale limits")
+            return 0.0, 0.0
+
+        low, high = ZScaleInterval(n_samples=values.size, contrast=self.contrast).get_limits(values)
+        return float(low), float(high)
+
+    def __key(self, path: str) -> str:
+        return f"{path}|{self.n_samples}|{self.contrast}"
+
+    def __save(self) -> None:
+        if self.path is None:
+            return
+
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump({key: [list(signature), list(limits)] for key, (signature, limits) in self._items.items()}, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not save the zscale limits to {self.path}: {e}")
+
+    def limits(self, fits: Fits) -> Tuple[float, float]:
+        """
+        Returns the zscale limits of a `Fits` object. The limits are computed
+        from its native data type data and cached until the file changes
+
+        Parameters
+        ----------
+        fits : Fits
+            the `Fits` object
+
+        Returns
+        -------
+        Tuple[float, float]
+            the lower and upper limits
+        """
+        path = abs(fits)
+        try:
+            stat = os.stat(path)
+            signature: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        key = self.__key(path)
+        if signature is not None:
+            with self._lock:
+                if key in self._items and self._items[key][0] == signature:
+                    return self._items[key][1]
+
+        limits = self.get_limits(fits.view())
+
+        if signature is not None:
+            with self._lock:
+                self._items[key] = (signature, limits)
+                self.__save()
+
+        return limits
+
+    @staticmethod
+    def to_uint8(data: Any, limits: Tuple[float, float]) -> Any:
+        """
+        Scales the data linearly between the limits to an 8-bit image
+
+        Parameters
+        ----------
+        data : np.ndarray
+            the data in any data type
+        limits : Tuple[float, float]
+            values mapped to 0 and 255
+
+        Returns
+        -------
+        np.ndarray
+            the 8-bit image
+        """
+        low, high = limits
+        if not high > low:
+            return np.zeros(np.shape(data), dtype=np.uint8)
+
+        scaled = np.subtract(data, low, dtype=np.float32)
+        scaled *= 255 / (high - low)
+        np.clip(scaled, 0, 255, out=scaled)
+        if np.issubdtype(np.asarray(data).dtype, np.floating):
+            np.nan_to_num(scaled, copy=False, nan=0.0)
+        return scaled.astype(np.uint8)
+
+    def image(self, fits: Fits) -> Any:
+        """
+        Returns the zscale scaled 8-bit image of a `Fits` object
+
+        Parameters
+        ----------
+        fits : Fits
+            the `Fits` object
+
+        Returns
+        -------
+        np.ndarray
+            the 8-bit image
+        """
+        return self.to_uint8(fits.view(), self.limits(fits))
+
+    def clear(self) -> None:
+        """
+        Removes the cached limits
+        """
+        with self._lock:
+            self._items.clear()
+            self.__save()
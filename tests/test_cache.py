@@ -0,0 +1,114 @@
+import os
+import unittest
+
+import numpy as np
+from astropy.io.fits.header import Header
+
+from myraflib import Fits
+from myraflib.cache import DataCache
+
+
+class TestDataCache(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        self.SAMPLE = Fits.sample()
+        self.CACHE = DataCache(max_bytes=1024)
+
+    def test_put_get(self):
+        data = np.zeros(10)
+        self.CACHE.put(abs(self.SAMPLE), "data", data)
+        self.assertIs(self.CACHE.get(abs(self.SAMPLE), "data"), data)
+        self.assertEqual(self.CACHE.nbytes, data.nbytes)
+
+    def test_get_not_cached(self):
+        self.assertIsNone(self.CACHE.get(abs(self.SAMPLE), "data"))
+
+    def test_header_size(self):
+        header = self.SAMPLE.pure_header()
+        self.assertEqual(DataCache.size_of(header), len(header) * 80)
+
+    def test_invalidate(self):
+        self.CACHE.put(abs(self.SAMPLE), "data", np.zeros(10))
+        self.CACHE.put(abs(self.SAMPLE), "header", Header())
+        self.CACHE.invalidate(abs(self.SAMPLE))
+        self.assertEqual(len(self.CACHE), 0)
+        self.assertEqual(self.CACHE.nbytes, 0)
+
+    def test_file_changed(self):
+        self.CACHE.put(abs(self.SAMPLE), "data", np.zeros(10))
+        mtime = os.stat(abs(self.SAMPLE)).st_mtime_ns
+        os.utime(abs(self.SAMPLE), ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+        self.assertIsNone(self.CACHE.get(abs(self.SAMPLE), "data"))
+        self.assertEqual(len(self.CACHE), 0)
+
+    def test_lru_eviction(self):
+        other = Fits.sample()
+        self.CACHE.put(abs(self.SAMPLE), "data", np.zeros(64))
+        self.CACHE.put(abs(other), "data", np.zeros(64))
+        self.assertIsNotNone(self.CACHE.get(abs(self.SAMPLE), "data"))
+
+        self.CACHE.put(abs(other), "header", np.zeros(32))
+        self.assertLessEqual(self.CACHE.nbytes, self.CACHE.max_bytes)
+        self.assertIsNone(self.CACHE.get(abs(other), "data"))
+        self.assertIsNotNone(self.CACHE.get(abs(self.SAMPLE), "data"))
+
+    def test_bigger_than_budget(self):
+        self.CACHE.put(abs(self.SAMPLE), "data", np.zeros(1024))
+        self.assertEqual(len(self.CACHE), 0)
+
+    def test_clear(self):
+        self.CACHE.put(abs(self.SAMPLE), "data", np.zeros(10))
+        self.CACHE.clear()
+        self.assertEqual(len(self.CACHE), 0)
+        self.assertEqual(self.CACHE.nbytes, 0)
+
+
+class TestFitsCache(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        Fits.cache.clear()
+        self.SAMPLE = Fits.sample()
+        self.SAMPLE.use_cache = True
+
+    def tearDown(self):
+        Fits.cache.clear()
+
+    def test_data(self):
+        first = self.SAMPLE.data()
+        self.assertIsNotNone(Fits.cache.get(abs(self.SAMPLE), "data"))
+        np.testing.assert_array_equal(first, self.SAMPLE.data())
+
+    def test_data_is_a_copy(self):
+        data = self.SAMPLE.data()
+        data[0, 0] = -1
+        self.assertNotEqual(self.SAMPLE.data()[0, 0], -1)
+
+    def test_pure_header_is_a_copy(self):
+        header = self.SAMPLE.pure_header()
+        header["MSH"] = "TEST"
+        self.assertNotIn("MSH", self.SAMPLE.pure_header())
+
+    def test_hedit_invalidates(self):
+        _ = self.SAMPLE.header()
+        self.SAMPLE.hedit("MSH", "TEST")
+        self.assertEqual(self.SAMPLE.header()["MSH"].values, ["TEST"])
+
+        self.SAMPLE.hedit("MSH", delete=True)
+        self.assertNotIn("MSH", self.SAMPLE.header().columns)
+
+    def test_not_used_by_default(self):
+        other = Fits.sample()
+        _ = other.data()
+        self.assertIsNone(Fits.cache.get(abs(other), "data"))
+
+    def test_delete_invalidates(self):
+        other = Fits.sample()
+        other.use_cache = True
+        path = abs(other)
+        _ = other.data()
+        del other
+        self.assertIsNone(Fits.cache.get(path, "data"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from myraflib import Fits, MemoryFits
+from myraflib.cursor import CursorInfo
+
+
+class TestCursorInfo(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        self.SAMPLE = Fits.sample()
+        self.CURSOR = CursorInfo()
+        self.CURSOR.load(self.SAMPLE)
+
+    def test___str__(self):
+        string = str(self.CURSOR)
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("CursorInfo"))
+
+    def test_lookup(self):
+        ra, dec, value = self.CURSOR.lookup(10, 20)
+        sky = self.SAMPLE.pixels_to_skys(10, 20)
+
+        self.assertAlmostEqual(ra, sky["ra"].iloc[0])
+        self.assertAlmostEqual(dec, sky["dec"].iloc[0])
+        self.assertEqual(value, self.SAMPLE.data()[20, 10])
+
+    def test_lookup_out_of_boundaries(self):
+        _, _, value = self.CURSOR.lookup(10000, 20)
+        self.assertIsNone(value)
+
+    def test_lookup_unsolved(self):
+        cursor = CursorInfo()
+        cursor.load(MemoryFits.from_data_header(self.SAMPLE.data()))
+
+        ra, dec, value = cursor.lookup(10, 20)
+        self.assertIsNone(ra)
+        self.assertIsNone(dec)
+        self.assertEqual(value, self.SAMPLE.data()[20, 10])
+
+    def test_lookup_without_data(self):
+        cursor = CursorInfo()
+        cursor.load(self.SAMPLE)
+        expected = self.SAMPLE.data()
+
+        with patch.object(Fits, "data", side_effect=AssertionError("data was called")), \
+                patch.object(Fits, "view", side_effect=AssertionError("view was called")):
+            _, _, value = cursor.lookup(10, 20)
+            self.assertEqual(value, expected[20, 10])
+            self.assertIsNone(cursor.value(10000, 20))
+            self.assertIsNone(cursor.value(-1, 20))
+
+        self.assertIsNone(cursor.data)
+
+    def test_load_data(self):
+        data = np.zeros((5, 5))
+        self.CURSOR.load(self.SAMPLE, data)
+        self.assertIs(self.CURSOR.data, data)
+
+        self.CURSOR.load(self.SAMPLE)
+        self.assertIs(self.CURSOR.data, data)
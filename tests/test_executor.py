@@ -0,0 +1,67 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from myraflib.executor import Job, SerialJob, Shared, WorkerPool, submit_all
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.objects = [np.arange(5) * i for i in range(6)]
+        self.big = np.arange(5) + 100
+
+    def test_job_is_abstract(self):
+        with self.assertRaises(TypeError):
+            _ = Job()
+
+    def test_serial(self):
+        jobs = submit_all(self.objects, "__add__", repeat((self.big,)), {})
+        self.assertTrue(all(isinstance(job, SerialJob) for job in jobs))
+        for obj, job in zip(self.objects, jobs):
+            np.testing.assert_array_equal(job.result(), obj + self.big)
+
+    def test_thread_pool_shared(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            jobs = submit_all(self.objects, "__add__", repeat((self.big,)), {}, executor=executor, shared=(self.big,))
+            for obj, job in zip(self.objects, jobs):
+                np.testing.assert_array_equal(job.result(), obj + self.big)
+
+    def test_worker_pool_shared(self):
+        with WorkerPool(2) as pool:
+            jobs = submit_all(self.objects, "__add__", repeat((self.big,)), {}, executor=pool, shared=(self.big,))
+            for obj, job in zip(self.objects, jobs):
+                np.testing.assert_array_equal(job.result(), obj + self.big)
+
+            self.assertIs(pool._shared[0], self.big)
+
+    def test_worker_pool_reused(self):
+        with WorkerPool(2) as pool:
+            jobs = submit_all(self.objects, "__add__", repeat((self.big,)), {}, executor=pool, shared=(self.big,))
+            _ = [job.result() for job in jobs]
+            started = pool._pool
+
+            jobs = submit_all(self.objects, "__mul__", repeat((self.big,)), {}, executor=pool, shared=(self.big,))
+            for obj, job in zip(self.objects, jobs):
+                np.testing.assert_array_equal(job.result(), obj * self.big)
+            self.assertIs(pool._pool, started)
+
+            other = self.big + 1
+            jobs = submit_all(self.objects, "__add__", repeat((other,)), {}, executor=pool, shared=(other,))
+            for obj, job in zip(self.objects, jobs):
+                np.testing.assert_array_equal(job.result(), obj + other)
+            self.assertIsNot(pool._pool, started)
+
+        self.assertFalse(pool.running)
+
+    def test_shared_placeholder(self):
+        self.assertEqual(Shared(3).index, 3)
+
+    def test_worker_pool_workers(self):
+        with self.assertRaises(ValueError):
+            _ = WorkerPool(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
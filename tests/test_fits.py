@@ -1,20 +1,30 @@
 import math
+import os
+import pickle
 import unittest
 from unittest import skip
+from unittest.mock import patch
 
+import astroalign
 from astropy import units
 from astropy.coordinates import SkyCoord
 from astropy.nddata import CCDData
+from ccdproc import subtract_bias, subtract_dark, flat_correct
 from scipy.ndimage import rotate
 from sep import Background
 
-from myraflib import Fits
+from myraflib import Fits, MemoryFits
+from myraflib.aligner import Aligner
+from myraflib.calibration import Calibrator
+from myraflib.expression import Expression
 import pandas as pd
 import numpy as np
 
+from astropy.io import fits as fts
 from astropy.io.fits.header import Header
+from astropy.wcs import WCS
 
-from myraflib.error import NothingToDo, OverCorrection, NumberOfElementError, Unsolvable
+from myraflib.error import NothingToDo, OverCorrection, NumberOfElementError, Unsolvable, CardNotFound
 
 
 class TestFits(unittest.TestCase):
@@ -186,10 +196,47 @@ class TestFits(unittest.TestCase):
         ]:
             self.assertIn(each, headers.columns)
 
+    def test_header_keys(self):
+        headers = self.SAMPLE.header()
+        selected = self.SAMPLE.header(keys=["NAXIS1", "DOESNOTEXIST", "BITPIX"])
+        self.assertListEqual(selected.columns.tolist(), ["NAXIS1", "BITPIX"])
+        pd.testing.assert_frame_equal(selected, headers[["NAXIS1", "BITPIX"]])
+
+    def test_header_keys_long_string(self):
+        self.SAMPLE.hedit("LONGSTR", "abc'" * 40)
+        self.assertEqual(self.SAMPLE.header(keys=["LONGSTR"])["LONGSTR"].iloc[0], "abc'" * 40)
+        pd.testing.assert_frame_equal(
+            self.SAMPLE.header(keys=["LONGSTR"]), self.SAMPLE.header()[["LONGSTR"]]
+        )
+
     def test_data(self):
         data = self.SAMPLE.data()
         self.assertIsInstance(data, np.ndarray)
 
+    def test_pickled_temp_does_not_delete(self):
+        shifted = self.SAMPLE.shift(10, 10)
+        copied = pickle.loads(pickle.dumps(shifted))
+        self.assertFalse(copied.is_temp)
+        del copied
+        self.assertTrue(shifted.file.exists())
+
+    def test_view(self):
+        view = self.SAMPLE.view()
+        self.assertIsInstance(view, np.ndarray)
+        self.assertFalse(view.flags.writeable)
+        np.testing.assert_array_equal(view, self.SAMPLE.data())
+
+    def test_view_native_dtype(self):
+        Fits.high_precision = False
+        sample = Fits.from_data_header(np.arange(100).reshape(10, 10))
+        view = sample.view()
+        self.assertEqual(view.dtype.kind, "u")
+        np.testing.assert_array_equal(view, sample.data())
+
+    def test_view_read_only(self):
+        with self.assertRaises(ValueError):
+            self.SAMPLE.view()[0, 0] = 0
+
     def test_value(self):
         data = self.SAMPLE.value(20, 20)
         self.assertIsInstance(data, float)
@@ -199,6 +246,46 @@ class TestFits(unittest.TestCase):
         with self.assertRaises(IndexError):
             _ = self.SAMPLE.value(65535, 65535)
 
+    def test_value_scaled(self):
+        Fits.high_precision = False
+        sample = Fits.from_data_header(np.arange(100).reshape(10, 10) + 40000)
+        self.assertIn("BZERO", sample.header().columns)
+        self.assertEqual(sample.value(3, 4), sample.data()[3][4])
+        self.assertEqual(sample.value(-1, -2), sample.data()[-1][-2])
+
+    def test_values(self):
+        values = self.SAMPLE.values([20, 100], [20, 30])
+        self.assertIsInstance(values, pd.DataFrame)
+        self.assertListEqual(
+            values["value"].tolist(), [self.SAMPLE.data()[20][20], self.SAMPLE.data()[100][30]]
+        )
+
+    def test_values_not_equal(self):
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.values([20, 100], [20])
+
+    def test_values_out_of_boundaries(self):
+        with self.assertRaises(IndexError):
+            _ = self.SAMPLE.values([20, 65535], [20, 65535])
+
+    def test_cutout(self):
+        cutout = self.SAMPLE.cutout(20, 12, 220, 200)
+        np.testing.assert_array_equal(cutout, self.SAMPLE.data()[12:212, 20:240])
+
+    def test_cutout_out_of_boundaries(self):
+        with self.assertRaises(IndexError):
+            _ = self.SAMPLE.cutout(1000, 1000, 10, 10)
+
+    def test_pyramid(self):
+        pyramid = self.SAMPLE.pyramid(factors=[3])
+        self.assertEqual(pyramid.factors, [3])
+        self.assertEqual(pyramid.level(3).shape, (math.ceil(893 / 3), math.ceil(891 / 3)))
+
+    def test_zscale(self):
+        low, high = self.SAMPLE.zscale()
+        self.assertLess(low, high)
+        self.assertEqual(self.SAMPLE.zscale(), (low, high))
+
     def test_pure_header(self):
         pure_header = self.SAMPLE.pure_header()
         self.assertIsInstance(pure_header, Header)
@@ -225,6 +312,26 @@ class TestFits(unittest.TestCase):
         cleaned = self.SAMPLE.cosmic_clean()
         self.assertIsInstance(cleaned, Fits)
 
+    def test_cosmic_clean_tiled(self):
+        data = self.SAMPLE.data()
+        data[100:800:37, 50:850:41] += 5000
+        with_rays = Fits.from_data_header(data)
+
+        cleaned = with_rays.cosmic_clean(niter=2)
+        tiled = with_rays.cosmic_clean(niter=2, tile_size=300)
+        np.testing.assert_array_equal(tiled.data(), cleaned.data())
+        self.assertFalse(np.array_equal(tiled.data(), with_rays.data()))
+
+    def test_cosmic_clean_tiled_workers(self):
+        cleaned = self.SAMPLE.cosmic_clean(niter=1, cleantype="idw")
+        tiled = self.SAMPLE.cosmic_clean(niter=1, cleantype="idw", tile_size=500, workers=2)
+        np.testing.assert_array_equal(tiled.data(), cleaned.data())
+
+    def test_cosmic_clean_tiled_median(self):
+        cleaned = self.SAMPLE.cosmic_clean(niter=1, cleantype="median")
+        tiled = self.SAMPLE.cosmic_clean(niter=1, cleantype="median", tile_size=300)
+        np.testing.assert_array_equal(tiled.data(), cleaned.data())
+
     def test_hedit(self):
         self.SAMPLE.hedit("MSH", "TEST")
         header = self.SAMPLE.header()
@@ -310,6 +417,86 @@ class TestFits(unittest.TestCase):
         self.assertNotIn("MSH", new_header.columns)
         self.assertEqual(header["MSH"].values, ["TEST"])
 
+    def test_header_edit(self):
+        data = self.SAMPLE.data()
+        size = os.path.getsize(abs(self.SAMPLE))
+        inode = os.stat(abs(self.SAMPLE)).st_ino
+
+        with self.SAMPLE.header_edit() as header:
+            header["MSH"] = "TEST"
+            header["MSH2"] = (12, "a comment")
+
+        self.assertEqual(os.path.getsize(abs(self.SAMPLE)), size)
+        self.assertEqual(os.stat(abs(self.SAMPLE)).st_ino, inode)
+        pure_header = self.SAMPLE.pure_header()
+        self.assertEqual(pure_header["MSH"], "TEST")
+        self.assertEqual(pure_header["MSH2"], 12)
+        self.assertEqual(pure_header.comments["MSH2"], "a comment")
+        np.testing.assert_array_equal(self.SAMPLE.data(), data)
+
+    def test_header_edit_grow_and_shrink(self):
+        data = self.SAMPLE.data()
+        size = os.path.getsize(abs(self.SAMPLE))
+
+        with self.SAMPLE.header_edit() as header:
+            for i in range(100):
+                header[f"MSH{i}"] = i
+
+        self.assertGreater(os.path.getsize(abs(self.SAMPLE)), size)
+        self.assertEqual(self.SAMPLE.pure_header()["MSH99"], 99)
+        np.testing.assert_array_equal(self.SAMPLE.data(), data)
+
+        with self.SAMPLE.header_edit() as header:
+            for i in range(100):
+                del header[f"MSH{i}"]
+
+        self.assertNotIn("MSH99", self.SAMPLE.header().columns)
+        np.testing.assert_array_equal(self.SAMPLE.data(), data)
+
+    def test_header_edit_shrink_card_count(self):
+        cards = len(fts.getheader(abs(self.SAMPLE)))
+        size = os.path.getsize(abs(self.SAMPLE))
+        data = self.SAMPLE.data()
+        keys = [f"MSH{i}" for i in range(20)]
+
+        self.SAMPLE.hedit(keys, list(range(20)))
+        self.assertEqual(len(fts.getheader(abs(self.SAMPLE))), cards + 20)
+
+        self.SAMPLE.hedit(keys, delete=True)
+        header = fts.getheader(abs(self.SAMPLE))
+        self.assertEqual(len(header), cards)
+        self.assertNotIn("", list(header.keys()))
+        self.assertEqual(len(self.SAMPLE.pure_header()), cards)
+        self.assertEqual(os.path.getsize(abs(self.SAMPLE)), size)
+        np.testing.assert_array_equal(self.SAMPLE.data(), data)
+
+        self.SAMPLE.hedit("MSH", 1)
+        self.SAMPLE.hedit("MSH", delete=True)
+        self.assertEqual(len(fts.getheader(abs(self.SAMPLE))), cards)
+        np.testing.assert_array_equal(self.SAMPLE.data(), data)
+
+    def test_header_edit_error_discards(self):
+        with self.assertRaises(KeyError):
+            with self.SAMPLE.header_edit() as header:
+                header["MSH"] = "TEST"
+                _ = header["DOESNOTEXIST"]
+
+        self.assertNotIn("MSH", self.SAMPLE.header().columns)
+
+    def test_header_edit_structure(self):
+        with self.assertRaises(ValueError):
+            with self.SAMPLE.header_edit() as header:
+                header["NAXIS1"] = 12
+
+    def test_hedit_many(self):
+        self.SAMPLE.hedit("MSH", "TEST")
+        self.SAMPLE.hedit_many({"MSH": None, "MSH2": 12, "MSH3": ("TEST", "a comment")})
+        pure_header = self.SAMPLE.pure_header()
+        self.assertNotIn("MSH", pure_header)
+        self.assertEqual(pure_header["MSH2"], 12)
+        self.assertEqual(pure_header["MSH3"], "TEST")
+        self.assertEqual(pure_header.comments["MSH3"], "a comment")
+
     def test_save_as(self):
         new_file = self.SAMPLE.save_as("TEST.fits")
         self.assertIsInstance(new_file, Fits)
@@ -322,6 +509,57 @@ class TestFits(unittest.TestCase):
             _ = self.SAMPLE.save_as("TEST.fits")
         new_file.file.unlink()
 
+    def test_lazy(self):
+        other = Fits.from_data_header(self.SAMPLE.data() * 3 + 1)
+        expression = (self.SAMPLE.lazy() - other) / (other + 2) * 2.5
+        new_fits = expression.compute()
+
+        np.testing.assert_array_almost_equal(
+            new_fits.data(), (self.SAMPLE.data() - other.data()) / (other.data() + 2) * 2.5
+        )
+        self.assertEqual(new_fits.header()["OBJECT"].iloc[0], self.SAMPLE.header()["OBJECT"].iloc[0])
+
+    def test_lazy_reflected(self):
+        new_fits = (2 - self.SAMPLE.lazy() / 4) * -self.SAMPLE.lazy()
+        np.testing.assert_array_almost_equal(
+            new_fits.data(), (2 - self.SAMPLE.data() / 4) * -self.SAMPLE.data()
+        )
+
+    def test_lazy_save_as(self):
+        output = "lazy_save_as.fits"
+        try:
+            new_fits = (self.SAMPLE.lazy() + 1).save_as(output)
+            self.assertTrue(os.path.exists(output))
+            np.testing.assert_array_equal(new_fits.data(), self.SAMPLE.data() + 1)
+        finally:
+            if os.path.exists(output):
+                os.remove(output)
+
+    def test_lazy_memory(self):
+        memory_fits = MemoryFits.from_data_header(self.SAMPLE.data())
+        new_fits = (memory_fits.lazy() * 2).compute()
+        self.assertIsInstance(new_fits, MemoryFits)
+        np.testing.assert_array_equal(new_fits.data(), self.SAMPLE.data() * 2)
+
+    def test_lazy_shape_error(self):
+        other = Fits.from_data_header(np.ones((10, 10)))
+        with self.assertRaises(ValueError):
+            _ = (self.SAMPLE.lazy() + other).compute()
+
+    def test_lazy_value_error(self):
+        with self.assertRaises(NotImplementedError):
+            _ = self.SAMPLE.lazy() + "2"
+
+    def test_lazy_arithmetic(self):
+        Fits.lazy_arithmetic = True
+        try:
+            expression = (self.SAMPLE - 1) / 2
+        finally:
+            Fits.lazy_arithmetic = False
+
+        self.assertIsInstance(expression, Expression)
+        np.testing.assert_array_equal(expression.data(), (self.SAMPLE.data() - 1) / 2)
+
     def test_add(self):
         new_fits = self.SAMPLE.add(self.SAMPLE)
         np.testing.assert_array_equal(new_fits.data(), self.SAMPLE.data() * 2)
@@ -509,6 +747,47 @@ class TestFits(unittest.TestCase):
             cropped.data(), cropped_data
         )
 
+    def test_shift_wcs(self):
+        shifted = self.SAMPLE.shift(20, -10)
+        np.testing.assert_allclose(
+            WCS(shifted.pure_header()).pixel_to_world_values([143, 300.5], [113, 40.25]),
+            WCS(self.SAMPLE.pure_header()).pixel_to_world_values([123, 280.5], [123, 50.25]),
+            rtol=0, atol=1e-9
+        )
+
+    def test_rotate_wcs(self):
+        rotated = self.SAMPLE.rotate(math.pi / 6)
+        ys, xs = (np.array(rotated.data().shape) - 1) / 2
+        np.testing.assert_allclose(
+            WCS(rotated.pure_header()).pixel_to_world_values(
+                [xs + math.cos(math.pi / 6) * 100], [ys - math.sin(math.pi / 6) * 100]
+            ),
+            WCS(self.SAMPLE.pure_header()).pixel_to_world_values([xs + 100], [ys]),
+            rtol=0, atol=1e-9
+        )
+
+    def test_crop_wcs(self):
+        cropped = self.SAMPLE.crop(20, 12, 220, 200)
+        np.testing.assert_allclose(
+            WCS(cropped.pure_header()).pixel_to_world_values([0, 100.5], [0, 150.25]),
+            WCS(self.SAMPLE.pure_header()).pixel_to_world_values([20, 120.5], [12, 162.25]),
+            rtol=0, atol=1e-9
+        )
+
+    def test_bin_wcs(self):
+        binned = self.SAMPLE.bin([2, 4])
+        np.testing.assert_allclose(
+            WCS(binned.pure_header()).pixel_to_world_values([0, 10], [0, 10]),
+            WCS(self.SAMPLE.pure_header()).pixel_to_world_values([1.5, 41.5], [0.5, 20.5]),
+            rtol=0, atol=1e-9
+        )
+
+    def test_shift_wcs_deterministic(self):
+        self.assertEqual(
+            self.SAMPLE.shift(3, 4).pure_header().tostring(),
+            self.SAMPLE.shift(3, 4).pure_header().tostring()
+        )
+
     def test_crop_out_of_boundaries(self):
         with self.assertRaises(IndexError):
             _ = self.SAMPLE.crop(1000, 1000, 10, 10)
@@ -518,6 +797,33 @@ class TestFits(unittest.TestCase):
         aligned = self.SAMPLE.align(shifted)
         self.assertIsInstance(aligned, Fits)
 
+    def test_align_aligner(self):
+        shifted = self.SAMPLE.shift(10, 10)
+        aligner = shifted.aligner()
+        self.assertIsInstance(aligner, Aligner)
+        aligned = self.SAMPLE.align(aligner)
+        self.assertIsInstance(aligned, Fits)
+        self.assertEqual(aligned.data().shape, shifted.data().shape)
+
+    def test_aligner_same_as_astroalign(self):
+        shifted = self.SAMPLE.shift(10, -7)
+        transform, _ = self.SAMPLE.aligner().find_transform(shifted.data())
+        expected, _ = astroalign.find_transform(shifted.data(), self.SAMPLE.data())
+        np.testing.assert_allclose(transform.params, expected.params, atol=1e-6)
+
+    def test_aligner_without_internals(self):
+        shifted = self.SAMPLE.shift(10, -7)
+        with patch("myraflib.aligner._INTERNALS", ["_missing_internal"]):
+            aligner = self.SAMPLE.aligner()
+        self.assertFalse(aligner.internal)
+        transform, _ = aligner.find_transform(shifted.data())
+        expected, _ = astroalign.find_transform(shifted.data(), self.SAMPLE.data())
+        np.testing.assert_allclose(transform.params, expected.params, atol=1e-6)
+
+    def test_align_value_error(self):
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.align(5)
+
     def test_zero_correction(self):
         zero_corrected = self.SAMPLE.zero_correction(self.SAMPLE)
         self.assertIn("MY-ZERO", zero_corrected.header().columns)
@@ -860,6 +1166,58 @@ class TestFits(unittest.TestCase):
         self.assertTrue(all(each is None for each in ph["DOESNOTEXIST1"]))
         self.assertTrue(all(each is not None for each in ph["NAXIS"]))
 
+    def test_photometry_context(self):
+        context = self.SAMPLE.photometry_context(exposure="EXPOSURE")
+        self.assertEqual(context.exposure, 65)
+        np.testing.assert_array_equal(context.data, self.SAMPLE.data())
+        np.testing.assert_array_equal(context.rms, self.SAMPLE.background().rms())
+
+    def test_phot_context_same_as_without(self):
+        sources = self.SAMPLE.extract()
+        context = self.SAMPLE.photometry_context(exposure=65)
+        for method in [self.SAMPLE.photometry_sep, self.SAMPLE.photometry_phu, self.SAMPLE.photometry]:
+            pd.testing.assert_frame_equal(
+                method(sources["xcentroid"], sources["ycentroid"], [5, 10], exposure=65),
+                method(sources["xcentroid"], sources["ycentroid"], [5, 10], context=context)
+            )
+
+    def test_phot_arrays_same_as_sep(self):
+        sources = self.SAMPLE.extract()
+        arrays = self.SAMPLE.photometry_arrays(
+            sources["xcentroid"], sources["ycentroid"], [5, 10], exposure=65
+        )
+        ph = self.SAMPLE.photometry_sep(
+            sources["xcentroid"], sources["ycentroid"], [5, 10], exposure=65
+        )
+        self.assertEqual(arrays.shape, (len(sources), 2))
+        for column in ["xcentroid", "ycentroid", "ra", "dec", "aperture", "flux", "flux_error",
+                       "flag", "snr", "mag", "merr"]:
+            np.testing.assert_allclose(arrays[column].T.ravel(), ph[column])
+
+    def test_phot_arrays_package_error(self):
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.photometry_arrays(1, 2, 10, package="DOESNOTEXIST")
+
+    def test_phot_phu_radec_same_as_sep(self):
+        sources = self.SAMPLE.extract()
+        ph_sep = self.SAMPLE.photometry_sep(
+            sources["xcentroid"], sources["ycentroid"], [5, 10],
+        )
+        ph_phu = self.SAMPLE.photometry_phu(
+            sources["xcentroid"], sources["ycentroid"], [5, 10],
+        )
+        np.testing.assert_allclose(ph_phu["ra"].astype(float), ph_sep["ra"])
+        np.testing.assert_allclose(ph_phu["dec"].astype(float), ph_sep["dec"])
+
+    def test_flux_to_mag_array(self):
+        fluxes = np.array([100.0, 1000.0, 5000.0])
+        flux_errors = np.array([10.0, 0.0, 50.0])
+        mags, mag_errs = self.SAMPLE.flux_to_mag(fluxes, flux_errors, 65)
+        for flux, flux_error, mag, mag_err in zip(fluxes, flux_errors, mags, mag_errs):
+            expected_mag, expected_mag_err = self.SAMPLE.flux_to_mag(flux, flux_error, 65)
+            self.assertAlmostEqual(mag, expected_mag)
+            self.assertAlmostEqual(mag_err, expected_mag_err)
+
     def test_pixels_to_skys(self):
         sky = self.SAMPLE.pixels_to_skys(2, 2)
         self.assertAlmostEquals(
@@ -885,6 +1243,34 @@ class TestFits(unittest.TestCase):
             sky.iloc[1].sky.dec.value, -2.52720021
         )
 
+    def test_pixels_to_skys_array(self):
+        xs, ys = np.linspace(0, 800, 1000), np.linspace(10, 500, 1000)
+        sky = self.SAMPLE.pixels_to_skys(xs, ys, sky=False)
+
+        self.assertNotIn("sky", sky.columns)
+        expected = WCS(self.SAMPLE.pure_header()).pixel_to_world(xs, ys)
+        np.testing.assert_allclose(sky["ra"], expected.ra.degree)
+        np.testing.assert_allclose(sky["dec"], expected.dec.degree)
+
+    def test_wcs_cached(self):
+        header = WCS(self.SAMPLE.pure_header()).to_header()
+        fits = Fits.from_data_header(self.SAMPLE.data(), header=header)
+        w = fits.wcs()
+        self.assertIs(fits.wcs(), w)
+
+        fits.hedit("CRPIX1", header["CRPIX1"] + 10)
+        self.assertIsNot(fits.wcs(), w)
+        self.assertAlmostEqual(fits.wcs().wcs.crpix[0], header["CRPIX1"] + 10)
+
+    def test_wcs_memory(self):
+        header = WCS(self.SAMPLE.pure_header()).to_header()
+        memory_fits = MemoryFits.from_data_header(self.SAMPLE.data(), header=header)
+        w = memory_fits.wcs()
+        self.assertIs(memory_fits.wcs(), w)
+
+        memory_fits.hedit("CRPIX1", header["CRPIX1"] + 10)
+        self.assertAlmostEqual(memory_fits.wcs().wcs.crpix[0], header["CRPIX1"] + 10)
+
     def test_pixels_to_skys_not_equal(self):
         with self.assertRaises(ValueError):
             _ = self.SAMPLE.pixels_to_skys([2, 200, 300], [2, 200])
@@ -927,6 +1313,12 @@ class TestFits(unittest.TestCase):
             pixel.iloc[1].ycentroid, 200, places=3
         )
 
+    def test_skys_to_pixels_array(self):
+        sc = SkyCoord(ra=[85.39916173, 85.34366079] * units.degree, dec=[-2.58265558, -2.52720021] * units.degree)
+        pixel = self.SAMPLE.skys_to_pixels(sc)
+        np.testing.assert_allclose(pixel["xcentroid"], [2, 200], atol=1e-3)
+        np.testing.assert_allclose(pixel["ycentroid"], [2, 200], atol=1e-3)
+
     def test_skys_to_pixels_unsolvable(self):
         sc = SkyCoord(ra=85.39916173 * units.hourangle, dec=-2.58265558 * units.hourangle)
         with self.assertRaises(Unsolvable):
@@ -982,10 +1374,56 @@ class TestFits(unittest.TestCase):
         )
         self.assertIsInstance(corrected, Fits)
 
+    def test_ccdproc_same_as_ccdproc_package(self):
+        shape = self.SAMPLE.data().shape
+        zero = Fits.from_data_header(np.full(shape, 100.0))
+        dark = Fits.from_data_header(np.linspace(10, 30, shape[0] * shape[1]).reshape(shape))
+        dark.hedit("EXPOSURE", 130)
+        flat = Fits.from_data_header(np.linspace(900, 1100, shape[0] * shape[1]).reshape(shape))
+
+        corrected = self.SAMPLE.ccdproc(
+            master_zero=zero, master_dark=dark, master_flat=flat, exposure="EXPOSURE"
+        )
+
+        expected = subtract_bias(self.SAMPLE.ccd(), zero.ccd())
+        expected = subtract_dark(
+            expected, dark.ccd(), dark_exposure=130 * units.s, data_exposure=65 * units.s, scale=True
+        )
+        expected = flat_correct(expected, flat.ccd())
+
+        np.testing.assert_allclose(corrected.data(), expected.data)
+        for each in ["MY-ZERO", "MY-DARK", "MY-FLAT"]:
+            self.assertIn(each, corrected.header().columns)
+
+    def test_ccdproc_exposure_does_not_exist(self):
+        with self.assertRaises(CardNotFound):
+            _ = self.SAMPLE.ccdproc(master_dark=self.SAMPLE, exposure="DOESNOTEXIST")
+
+    def test_ccdproc_over_correction_skipped(self):
+        zero_corrected = self.SAMPLE.ccdproc(master_zero=self.SAMPLE)
+        again = zero_corrected.ccdproc(master_zero=self.SAMPLE)
+        np.testing.assert_array_equal(again.data(), zero_corrected.data())
+
     def test_ccdproc_nothing_to_do(self):
         with self.assertRaises(NothingToDo):
             _ = self.SAMPLE.ccdproc()
 
+    def test_ccdproc_calibrator(self):
+        calibrator = Calibrator(master_zero=self.SAMPLE, master_flat=self.SAMPLE)
+        with_calibrator = self.SAMPLE.ccdproc(calibrator=calibrator)
+        without_calibrator = self.SAMPLE.ccdproc(master_zero=self.SAMPLE, master_flat=self.SAMPLE)
+        np.testing.assert_array_equal(with_calibrator.data(), without_calibrator.data())
+
+    def test_ccdproc_calibrator_masters_shape_mismatch(self):
+        cropped = self.SAMPLE.crop(0, 0, 10, 10)
+        with self.assertRaises(ValueError):
+            _ = Calibrator(master_zero=self.SAMPLE, master_flat=cropped)
+
+    def test_ccdproc_calibrator_data_shape_mismatch(self):
+        calibrator = Calibrator(master_zero=self.SAMPLE)
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.crop(0, 0, 10, 10).ccdproc(calibrator=calibrator)
+
     @skip("Cannot test since it requires an API key")
     def test_solve_field(self):
         """Cannot test"""
@@ -998,5 +1436,104 @@ class TestFits(unittest.TestCase):
         )
 
 
+class TestMemoryFits(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        self.SAMPLE = MemoryFits.sample()
+        self.DISK_SAMPLE = Fits.sample()
+
+    def test_sample(self):
+        self.assertIsInstance(self.SAMPLE, MemoryFits)
+        self.assertFalse(self.SAMPLE.file.exists())
+
+    def test_data(self):
+        np.testing.assert_array_equal(self.SAMPLE.data(), self.DISK_SAMPLE.data())
+
+    def test_view(self):
+        view = self.SAMPLE.view()
+        self.assertFalse(view.flags.writeable)
+        np.testing.assert_array_equal(view, self.DISK_SAMPLE.view())
+
+    def test_value(self):
+        self.assertEqual(self.SAMPLE.value(20, 30), self.DISK_SAMPLE.value(20, 30))
+
+    def test_cutout(self):
+        np.testing.assert_array_equal(
+            self.SAMPLE.cutout(20, 12, 220, 200), self.DISK_SAMPLE.cutout(20, 12, 220, 200)
+        )
+
+    def test_header(self):
+        self.assertListEqual(
+            self.SAMPLE.header().columns.tolist(),
+            self.DISK_SAMPLE.header().columns.tolist()
+        )
+
+    def test_header_keys(self):
+        pd.testing.assert_frame_equal(
+            self.SAMPLE.header(keys=["NAXIS2", "NAXIS1"]).reset_index(drop=True),
+            self.DISK_SAMPLE.header(keys=["NAXIS2", "NAXIS1"]).reset_index(drop=True)
+        )
+
+    def test_chain_stays_in_memory(self):
+        result = ((self.SAMPLE + 2) * self.SAMPLE).shift(3, 4).crop(10, 10, 100, 100)
+        expected = ((self.DISK_SAMPLE + 2) * self.DISK_SAMPLE).shift(3, 4).crop(10, 10, 100, 100)
+
+        self.assertIsInstance(result, MemoryFits)
+        self.assertFalse(result.file.exists())
+        np.testing.assert_array_equal(result.data(), expected.data())
+
+    def test_mixed_arithmetic(self):
+        result = self.SAMPLE - self.DISK_SAMPLE
+        self.assertIsInstance(result, MemoryFits)
+        self.assertTrue(np.all(result.data() == 0))
+
+    def test_hedit(self):
+        self.SAMPLE.hedit("MSH", "TEST")
+        self.assertEqual(self.SAMPLE.header()["MSH"].values, ["TEST"])
+
+        self.SAMPLE.hedit("MSH", delete=True)
+        self.assertNotIn("MSH", self.SAMPLE.header().columns)
+
+    def test_header_edit(self):
+        with self.SAMPLE.header_edit() as header:
+            header["MSH"] = "TEST"
+
+        self.assertEqual(self.SAMPLE.header()["MSH"].values, ["TEST"])
+
+    def test_ccd(self):
+        ccd = self.SAMPLE.ccd()
+        self.assertIsInstance(ccd, CCDData)
+        np.testing.assert_array_equal(ccd.data, self.SAMPLE.data())
+
+    def test_zero_correction(self):
+        zero_corrected = self.SAMPLE.zero_correction(self.SAMPLE)
+        self.assertIsInstance(zero_corrected, MemoryFits)
+        self.assertIn("MY-ZERO", zero_corrected.header().columns)
+        self.assertTrue(np.all(zero_corrected.data() == 0))
+
+    def test_flush(self):
+        flushed = self.SAMPLE.flush()
+        self.assertNotIsInstance(flushed, MemoryFits)
+        self.assertTrue(flushed.file.exists())
+        np.testing.assert_array_equal(flushed.data(), self.SAMPLE.data())
+
+    def test_save_as(self):
+        new_file = self.SAMPLE.save_as("TEST.fits")
+        self.assertNotIsInstance(new_file, MemoryFits)
+        np.testing.assert_array_equal(new_file.data(), self.SAMPLE.data())
+        with self.assertRaises(FileExistsError):
+            _ = self.SAMPLE.save_as("TEST.fits")
+        new_file.file.unlink()
+
+    def test_from_path(self):
+        loaded = MemoryFits.from_path(abs(self.DISK_SAMPLE))
+        self.assertIsInstance(loaded, MemoryFits)
+        np.testing.assert_array_equal(loaded.data(), self.DISK_SAMPLE.data())
+
+    def test_from_path_does_not_exist(self):
+        with self.assertRaises(FileNotFoundError):
+            _ = MemoryFits.from_path("TEST")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,20 +1,31 @@
+import gc
 import math
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import skip
+from unittest.mock import patch
 
+import cv2
 from astropy import units
 from astropy.coordinates import SkyCoord
 from astropy.nddata import CCDData
+from ccdproc import Combiner
 from scipy.ndimage import rotate
 from sep import Background
 
-from myraflib import FitsArray, Fits
+from myraflib import FitsArray, Fits, MemoryFits
+from myraflib.executor import WorkerPool
+from myraflib.header_index import HeaderIndex
+from myraflib.video import VideoCube
 import pandas as pd
 import numpy as np
 
+from astropy.io import fits as fts
 from astropy.io.fits.header import Header
 
-from myraflib.error import NumberOfElementError, Unsolvable, NothingToDo
+from myraflib.error import NumberOfElementError, Unsolvable, NothingToDo, AlignError, CardNotFound
 
 
 class TestFitsArray(unittest.TestCase):
@@ -473,6 +484,71 @@ class TestFitsArray(unittest.TestCase):
         with self.assertRaises(NumberOfElementError):
             _ = FitsArray.from_paths(files)
 
+    def __video(self, directory, frames=12):
+        path = str(Path(directory) / "video.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+        rng = np.random.default_rng(0)
+        for _ in range(frames):
+            writer.write((rng.random((48, 64, 3)) * 255).astype(np.uint8))
+        writer.release()
+        return path
+
+    def test_from_video(self):
+        with TemporaryDirectory() as directory:
+            fits_array = FitsArray.from_video(self.__video(directory))
+            self.assertEqual(len(fits_array), 12)
+            self.assertListEqual(
+                fits_array.hselect("MY-EXPTM")["MY-EXPTM"].tolist(), [1 / 30] * 12
+            )
+
+    def test_from_video_cube(self):
+        with TemporaryDirectory() as directory:
+            path = self.__video(directory)
+            expected = FitsArray.from_video(path)
+            output = str(Path(directory) / "cube.fits")
+            fits_array = FitsArray.from_video(path, cube=True, output=output, background=True)
+
+            self.assertTrue(Path(output).exists())
+            self.assertEqual(len(fits_array), len(expected))
+            for fits, expected_fits in zip(fits_array, expected):
+                self.assertIsInstance(fits, MemoryFits)
+                np.testing.assert_array_equal(fits.data(), expected_fits.data())
+                self.assertAlmostEqual(
+                    fits.pure_header()["MY-RELJD"], expected_fits.pure_header()["MY-RELJD"]
+                )
+
+            cube = VideoCube(output)
+            self.assertEqual(cube.data.shape, (12, 48, 64))
+            self.assertListEqual(cube.times["FRAME"].tolist(), list(range(12)))
+            del cube
+
+    def test_from_video_cube_temporary(self):
+        with TemporaryDirectory() as directory:
+            fits_array = FitsArray.from_video(self.__video(directory), cube=True)
+            cube = fits_array[0]._owner
+            self.assertIsInstance(cube, VideoCube)
+            self.assertTrue(cube.is_temp)
+            path = cube.file
+            del cube
+            gc.collect()
+
+            self.assertTrue(path.exists())
+            frame = fits_array[3]
+            expected = frame.data().copy()
+            del fits_array
+            gc.collect()
+
+            self.assertTrue(path.exists())
+            np.testing.assert_array_equal(frame.data(), expected)
+            del frame
+            gc.collect()
+
+            self.assertFalse(path.exists())
+
+    def test_from_video_does_not_exist(self):
+        with self.assertRaises(FileNotFoundError):
+            _ = FitsArray.from_video("DOESNOTEXIST.avi", cube=True)
+
     def test_header(self):
         headers = self.SAMPLE.header()
         self.assertIsInstance(headers, pd.DataFrame)
@@ -483,6 +559,11 @@ class TestFitsArray(unittest.TestCase):
         ]:
             self.assertIn(each, headers.columns)
 
+    def test_header_keys(self):
+        headers = self.SAMPLE.header()
+        selected = self.SAMPLE.header(keys=["EXPOSURE", "NAXIS1"])
+        pd.testing.assert_frame_equal(selected, headers[["EXPOSURE", "NAXIS1"]])
+
     def test_data(self):
         list_of_data = self.SAMPLE.data()
         self.assertIsInstance(list_of_data, list)
@@ -494,6 +575,97 @@ class TestFitsArray(unittest.TestCase):
         self.assertIsInstance(data, pd.DataFrame)
         self.assertListEqual(data["value"].tolist(), [each.data()[200][200] for each in self.SAMPLE])
 
+    def test_values(self):
+        values = self.SAMPLE.values([200, 12], [200, 34])
+        self.assertIsInstance(values, pd.DataFrame)
+        self.assertListEqual(
+            values["value"].tolist(),
+            [value for each in self.SAMPLE for value in (each.data()[200][200], each.data()[12][34])]
+        )
+
+    def test_values_not_equal(self):
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.values([200, 12], [200])
+
+    def test_cutout(self):
+        cutouts = self.SAMPLE.cutout(20, 12, 220, 200)
+        self.assertEqual(len(cutouts), len(self.SAMPLE))
+        for cutout, fits in zip(cutouts, self.SAMPLE):
+            np.testing.assert_array_equal(cutout, fits.data()[12:212, 20:240])
+
+    def test_with_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = self.SAMPLE.with_executor(executor)
+            added = parallel.add(2)
+            self.assertIs(added.executor, executor)
+            for fits, result in zip(self.SAMPLE, added):
+                np.testing.assert_array_equal(result.data(), fits.data() + 2)
+
+    def test_with_executor_workers(self):
+        parallel = self.SAMPLE.with_executor(workers=2)
+        shifted = parallel.shift(10, 20)
+        self.assertEqual(shifted.workers, 2)
+        self.assertEqual(len(shifted), len(self.SAMPLE))
+        for fits, result in zip(self.SAMPLE, shifted):
+            self.assertTrue(result.file.exists())
+            self.assertTrue(result.is_temp)
+            np.testing.assert_array_equal(result.data(), fits.shift(10, 20).data())
+
+    def test_with_executor_reuses_pool(self):
+        with self.SAMPLE.with_executor(workers=2) as parallel:
+            self.assertIsInstance(parallel.executor, WorkerPool)
+            added = parallel.add(2)
+            pool = parallel.executor._pool
+            self.assertIsNotNone(pool)
+            self.assertIs(added.executor, parallel.executor)
+            _ = added.sub(2)
+            self.assertIs(parallel.executor._pool, pool)
+
+        self.assertFalse(parallel.executor.running)
+
+    def test_close(self):
+        parallel = self.SAMPLE.with_executor(workers=2)
+        _ = parallel.imstat()
+        self.assertTrue(parallel.executor.running)
+        parallel.close()
+        self.assertFalse(parallel.executor.running)
+        pd.testing.assert_frame_equal(parallel.imstat(), self.SAMPLE.imstat())
+        parallel.close()
+
+    def test_with_executor_keeps_order(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            stats = self.SAMPLE.with_executor(executor).imstat()
+        pd.testing.assert_frame_equal(stats, self.SAMPLE.imstat())
+
+    def test_with_index(self):
+        with TemporaryDirectory() as directory:
+            indexed = self.SAMPLE.with_index(Path(directory) / "headers.sqlite")
+            self.assertIsInstance(indexed.index, HeaderIndex)
+            pd.testing.assert_frame_equal(indexed.header(), self.SAMPLE.header())
+            self.assertEqual(len(indexed.index), len(self.SAMPLE))
+
+    def test_with_index_reads_changed(self):
+        with TemporaryDirectory() as directory:
+            indexed = self.SAMPLE.with_index(Path(directory) / "headers.sqlite")
+            _ = indexed.header()
+
+            self.SAMPLE[0].hedit("MYRAFIDX", 12)
+            headers = indexed.header()
+            self.assertEqual(headers.loc[abs(self.SAMPLE[0]), "MYRAFIDX"], 12)
+            self.assertTrue(headers["MYRAFIDX"].iloc[1:].isna().all())
+            self.assertEqual(len(indexed.index), len(self.SAMPLE))
+
+    def test_with_index_hselect_group_by(self):
+        with TemporaryDirectory() as directory:
+            indexed = self.SAMPLE.with_index(Path(directory) / "headers.sqlite")
+            pd.testing.assert_frame_equal(indexed.hselect(["NAXIS1"]), self.SAMPLE.hselect(["NAXIS1"]))
+
+            groups = indexed.group_by("EXPOSURE")
+            self.assertEqual(len(groups), 1)
+            for group in groups.values():
+                self.assertIs(group.index, indexed.index)
+                self.assertEqual(len(group), len(self.SAMPLE))
+
     def test_pure_header(self):
         list_of_pure_headers = self.SAMPLE.pure_header()
         self.assertIsInstance(list_of_pure_headers, list)
@@ -523,6 +695,12 @@ class TestFitsArray(unittest.TestCase):
         cleaned = self.SAMPLE.cosmic_clean()
         self.assertIsInstance(cleaned, FitsArray)
 
+    def test_cosmic_clean_tiled(self):
+        cleaned = self.SAMPLE[:2].cosmic_clean(niter=1)
+        tiled = self.SAMPLE[:2].cosmic_clean(niter=1, tile_size=400)
+        for each_cleaned, each_tiled in zip(cleaned, tiled):
+            np.testing.assert_array_equal(each_tiled.data(), each_cleaned.data())
+
     def test_hedit(self):
         self.SAMPLE.hedit("MSH", "TEST")
         header = self.SAMPLE.header()
@@ -626,6 +804,20 @@ class TestFitsArray(unittest.TestCase):
             ["TEST"] * len(self.SAMPLE)
         )
 
+    def test_hedit_many(self):
+        self.SAMPLE.hedit_many([{"MSH": i, "EXPOSURE": None} for i in range(len(self.SAMPLE))])
+        header = self.SAMPLE.header()
+        self.assertListEqual(header["MSH"].tolist(), list(range(len(self.SAMPLE))))
+        self.assertNotIn("EXPOSURE", header.columns)
+
+    def test_hedit_many_single(self):
+        self.SAMPLE.hedit_many({"MSH": ("TEST", "a comment")})
+        self.assertListEqual(self.SAMPLE.header()["MSH"].tolist(), ["TEST"] * len(self.SAMPLE))
+
+    def test_hedit_many_different_length(self):
+        with self.assertRaises(NumberOfElementError):
+            self.SAMPLE.hedit_many([{"MSH": 1}])
+
     def test_hselect(self):
         selected = self.SAMPLE.hselect("NAXIS")
         self.assertIsInstance(selected, pd.DataFrame)
@@ -661,6 +853,27 @@ class TestFitsArray(unittest.TestCase):
         self.assertIsInstance(selected, pd.DataFrame)
         self.assertEqual(len(selected), len(self.SAMPLE))
 
+    def test_lazy(self):
+        new_fits_array = (self.SAMPLE.lazy() - self.SAMPLE[0]) * 2 + list(range(len(self.SAMPLE)))
+        new_fits_array = new_fits_array.compute()
+
+        self.assertIsInstance(new_fits_array, FitsArray)
+        self.assertEqual(len(new_fits_array), len(self.SAMPLE))
+        for added, (fits, new_fits) in enumerate(zip(self.SAMPLE, new_fits_array)):
+            np.testing.assert_array_equal(
+                new_fits.data(),
+                (fits.data() - self.SAMPLE[0].data()) * 2 + added
+            )
+
+    def test_lazy_shape_error(self):
+        other = Fits.from_data_header(np.ones((10, 10)))
+        with self.assertRaises(ValueError):
+            _ = (self.SAMPLE.lazy() + other).compute()
+
+    def test_lazy_length_error(self):
+        with self.assertRaises(NumberOfElementError):
+            _ = (self.SAMPLE.lazy() + self.SAMPLE[:2]).compute()
+
     def test_add(self):
         new_fits_array = self.SAMPLE.add(self.SAMPLE)
         for fits, new_fits in zip(self.SAMPLE, new_fits_array):
@@ -1412,6 +1625,16 @@ class TestFitsArray(unittest.TestCase):
         aligned = self.SAMPLE.align(self.SAMPLE[0])
         self.assertIsInstance(aligned, FitsArray)
 
+    def test_align_with_executor(self):
+        aligned = self.SAMPLE.with_executor(workers=2).align()
+        self.assertIsInstance(aligned, FitsArray)
+        self.assertEqual(len(aligned), len(self.SAMPLE))
+
+    def test_align_no_source_on_reference(self):
+        blank = Fits.from_data_header(np.zeros((100, 100)))
+        with self.assertRaises(AlignError):
+            _ = self.SAMPLE.align(blank)
+
     def test_zero_correction(self):
         new_fits_array = self.SAMPLE.zero_correction(self.SAMPLE[0])
         self.assertIn("MY-ZERO", new_fits_array.header().columns)
@@ -1582,6 +1805,24 @@ class TestFitsArray(unittest.TestCase):
         with self.assertRaises(NothingToDo):
             _ = self.SAMPLE.ccdproc()
 
+    def test_ccdproc_same_as_fits(self):
+        new_fits_array = self.SAMPLE.ccdproc(master_zero=self.SAMPLE[0], master_flat=self.SAMPLE[1])
+        for fits, corrected in zip(self.SAMPLE, new_fits_array):
+            expected = fits.ccdproc(master_zero=self.SAMPLE[0], master_flat=self.SAMPLE[1])
+            np.testing.assert_array_equal(corrected.data(), expected.data())
+
+    def test_ccdproc_workers(self):
+        with self.SAMPLE.with_executor(workers=2) as parallel:
+            new_fits_array = parallel.ccdproc(master_zero=self.SAMPLE[0], master_flat=self.SAMPLE[1])
+            self.assertEqual(len(parallel.executor._shared), 1)
+        expected = self.SAMPLE.ccdproc(master_zero=self.SAMPLE[0], master_flat=self.SAMPLE[1])
+        for corrected, each in zip(new_fits_array, expected):
+            np.testing.assert_array_equal(corrected.data(), each.data())
+
+    def test_ccdproc_exposure_does_not_exist(self):
+        with self.assertRaises(CardNotFound):
+            _ = self.SAMPLE.ccdproc(master_dark=self.SAMPLE[0], exposure="DOESNOTEXIST")
+
     def test_background(self):
         list_of_background = self.SAMPLE.background()
         self.assertIsInstance(list_of_background, list)
@@ -1900,6 +2141,65 @@ class TestFitsArray(unittest.TestCase):
         self.assertTrue(all(each is None for each in ph["DOESNOTEXIST1"]))
         self.assertTrue(all(each is not None for each in ph["NAXIS"]))
 
+    def test_phot_batch_same_as_sep(self):
+        sources = self.SAMPLE.extract()
+        batch = self.SAMPLE.photometry_batch(
+            sources["xcentroid"], sources["ycentroid"], [5, 10],
+            headers=["EXPOSURE", "DOESNOTEXIST"], exposure="EXPOSURE"
+        )
+        ph = self.SAMPLE.photometry_sep(
+            sources["xcentroid"], sources["ycentroid"], [5, 10],
+            headers=["EXPOSURE", "DOESNOTEXIST"], exposure="EXPOSURE"
+        )
+        pd.testing.assert_frame_equal(batch, ph, check_dtype=False)
+
+    def test_phot_batch_header_keys(self):
+        sources = self.SAMPLE.extract()
+        with patch.object(FitsArray, "header", autospec=True, side_effect=FitsArray.header) as header:
+            batch = self.SAMPLE.photometry_batch(
+                sources["xcentroid"], sources["ycentroid"], [5], headers=["EXPOSURE", "DOESNOTEXIST"]
+            )
+
+        header.assert_called_once_with(self.SAMPLE, keys=["EXPOSURE", "DOESNOTEXIST"])
+        self.assertTrue(all(each is not None for each in batch["EXPOSURE"]))
+        self.assertTrue(all(each is None for each in batch["DOESNOTEXIST"]))
+
+    def test_phot_batch_same_as_phu(self):
+        sources = self.SAMPLE.extract()
+        batch = self.SAMPLE.photometry_batch(
+            sources["xcentroid"], sources["ycentroid"], [5, 10], package="phu"
+        )
+        ph = self.SAMPLE.photometry_phu(
+            sources["xcentroid"], sources["ycentroid"], [5, 10]
+        )
+        for column in ["xcentroid", "ycentroid", "flux", "flux_error", "snr", "mag", "merr"]:
+            np.testing.assert_allclose(batch[column], ph[column])
+
+    def test_phot_batch_raw(self):
+        sources = self.SAMPLE.extract()
+        raw = self.SAMPLE.photometry_batch(
+            sources["xcentroid"], sources["ycentroid"], [5, 10, 15], raw=True
+        )
+        self.assertEqual(raw.shape, (len(self.SAMPLE), len(sources), 3))
+        for each in ["xcentroid", "ycentroid", "ra", "dec", "aperture", "flux", "flux_error",
+                     "flag", "snr", "mag", "merr"]:
+            self.assertIn(each, raw.dtype.names)
+
+        first = self.SAMPLE[0].photometry_arrays(sources["xcentroid"], sources["ycentroid"], [5, 10, 15])
+        np.testing.assert_array_equal(raw[0], first)
+
+    def test_phot_batch_coordinates_not_equal(self):
+        with self.assertRaises(NumberOfElementError):
+            _ = self.SAMPLE.photometry_batch(
+                [1, 2], [2], 10,
+            )
+
+    def test_phot_batch_package_error(self):
+        with self.assertRaises(ValueError):
+            _ = self.SAMPLE.photometry_batch(
+                [1, 2], [2, 3], 10, package="DOESNOTEXIST"
+            )
+
     def test_merge(self):
         sample = FitsArray.sample()
         sample.merge(self.SAMPLE)
@@ -1945,6 +2245,57 @@ class TestFitsArray(unittest.TestCase):
             np.median([each.data() for each in self.SAMPLE], axis=0),
         )
 
+    def test_combine_strips(self):
+        for method in ["average", "median", "sum"]:
+            for clipping in [None, "sigma", "minmax"]:
+                combiner = Combiner(self.SAMPLE.ccd())
+                if clipping == "sigma":
+                    combiner.sigma_clipping()
+                elif clipping == "minmax":
+                    combiner.minmax_clipping()
+
+                combiner.weights = np.ones(len(self.SAMPLE))
+                if method == "median":
+                    expected = combiner.median_combine().data
+                elif method == "sum":
+                    expected = combiner.sum_combine().data
+                else:
+                    expected = combiner.average_combine().data
+
+                combined = self.SAMPLE.combine(method=method, clipping=clipping, mem_limit=1e6)
+                np.testing.assert_allclose(combined.data(), expected)
+
+    def test_combine_weights(self):
+        weights = list(range(1, len(self.SAMPLE) + 1))
+        combined = self.SAMPLE.combine(method="average", weights=weights, mem_limit=1e6)
+        np.testing.assert_allclose(
+            combined.data(),
+            np.average([each.data() for each in self.SAMPLE], axis=0, weights=weights),
+        )
+
+    def test_combine_scaled_not_read_whole(self):
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 65535, (60, 80), dtype=np.uint16) for _ in range(3)]
+        with TemporaryDirectory() as directory:
+            paths = []
+            for i, frame in enumerate(frames):
+                path = str(Path(directory) / f"scaled_{i}.fits")
+                fts.PrimaryHDU(data=frame).writeto(path)
+                paths.append(path)
+
+            fits_array = FitsArray.from_paths(paths)
+            self.assertEqual(fts.getheader(paths[0])["BZERO"], 32768)
+            with patch.object(Fits, "view", side_effect=AssertionError("view was called")), \
+                    patch.object(Fits, "data", side_effect=AssertionError("data was called")):
+                combined = fits_array.combine(method="average", mem_limit=1e4)
+
+            np.testing.assert_allclose(combined.data(), np.mean(frames, axis=0))
+
+    def test_combine_shape_error(self):
+        fits_array = FitsArray(list(self.SAMPLE) + [self.SAMPLE[0].crop(0, 0, 10, 10)])
+        with self.assertRaises(ValueError):
+            _ = fits_array.combine()
+
     def test_pixels_to_skys(self):
         ra_decs = [
             [85.39915825, -2.58265742],
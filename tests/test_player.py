@@ -0,0 +1,68 @@
+import time
+import unittest
+
+import numpy as np
+
+from myraflib import FitsArray
+from myraflib.player import FramePlayer
+from myraflib.zscale import ZScale
+
+
+class TestFramePlayer(unittest.TestCase):
+    def setUp(self):
+        FitsArray.high_precision = True
+        self.SAMPLE = FitsArray.sample(5)
+
+    def test___str__(self):
+        string = str(FramePlayer(self.SAMPLE))
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("FramePlayer"))
+
+    def test_frames(self):
+        player = FramePlayer(self.SAMPLE, buffer=2, loop=False)
+        frames = list(player.frames())
+
+        self.assertEqual([index for index, _, _ in frames], list(range(len(self.SAMPLE))))
+        limits = self.SAMPLE[0].zscale()
+        for index, fits, image in frames:
+            self.assertIs(fits, self.SAMPLE[index])
+            self.assertEqual(image.dtype, np.uint8)
+            np.testing.assert_array_equal(image, ZScale.to_uint8(fits.view(), limits))
+
+    def test_frames_not_scaled(self):
+        player = FramePlayer(self.SAMPLE, loop=False, scale=False)
+        for index, fits, image in player.frames():
+            np.testing.assert_array_equal(image, fits.data())
+
+    def test_frames_loop(self):
+        player = FramePlayer(self.SAMPLE, buffer=len(self.SAMPLE))
+        frames = player.frames()
+        indices = [next(frames)[0] for _ in range(3 * len(self.SAMPLE))]
+        player.stop()
+
+        self.assertEqual(indices, list(range(len(self.SAMPLE))) * 3)
+
+    def test_poll(self):
+        player = FramePlayer(self.SAMPLE, loop=False)
+        self.assertIsNone(player.poll())
+
+        player.start()
+        frames = []
+        deadline = time.time() + 30
+        while not player.finished and time.time() < deadline:
+            frame = player.poll()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            frames.append(frame[0])
+
+        self.assertEqual(frames, list(range(len(self.SAMPLE))))
+
+    def test_stop(self):
+        player = FramePlayer(self.SAMPLE, buffer=1)
+        player.start()
+        player.stop()
+
+        self.assertFalse(player.is_running)
+        self.assertIsNone(player.poll())
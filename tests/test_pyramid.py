@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from astropy.nddata import block_reduce
+
+from myraflib import Fits, MemoryFits
+from myraflib.pyramid import Pyramid
+
+
+class TestPyramid(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        self.SAMPLE = Fits.sample()
+        self.CACHE = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.CACHE, ignore_errors=True)
+
+    def test___str__(self):
+        string = str(Pyramid(self.SAMPLE))
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("Pyramid"))
+
+    def test_level(self):
+        pyramid = Pyramid(self.SAMPLE)
+        data = self.SAMPLE.data()
+        for factor in [2, 4, 8]:
+            level = pyramid.level(factor)
+            self.assertEqual(level.shape, pyramid.level_shape(factor))
+
+            ny, nx = data.shape[0] // factor, data.shape[1] // factor
+            np.testing.assert_allclose(
+                level[:ny, :nx], block_reduce(data[:ny * factor, :nx * factor], factor, np.mean), rtol=1e-6
+            )
+            np.testing.assert_allclose(
+                level[-1, -1], data[(level.shape[0] - 1) * factor:, (level.shape[1] - 1) * factor:].mean(),
+                rtol=1e-6
+            )
+
+    def test_level_nan(self):
+        data = np.arange(16, dtype=float).reshape(4, 4)
+        data[0, 0] = np.nan
+        data[2:, 2:] = np.nan
+        level = Pyramid(MemoryFits.from_data_header(data), factors=[2]).level(2)
+
+        self.assertAlmostEqual(level[0, 0], np.mean([1, 4, 5]), places=5)
+        self.assertTrue(np.isnan(level[1, 1]))
+
+    def test_level_wrong_factor(self):
+        with self.assertRaises(ValueError):
+            _ = Pyramid(self.SAMPLE).level(3)
+
+    def test_wrong_factors(self):
+        with self.assertRaises(ValueError):
+            _ = Pyramid(self.SAMPLE, factors=[1, 2])
+
+    def test_cache(self):
+        level = Pyramid(self.SAMPLE, cache_dir=self.CACHE).level(4)
+        self.assertEqual(len(os.listdir(self.CACHE)), 3)
+
+        cached = Pyramid(self.SAMPLE, cache_dir=self.CACHE).level(4)
+        self.assertIsInstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, level)
+
+    def test_cache_changed_file(self):
+        Pyramid(self.SAMPLE, cache_dir=self.CACHE).build()
+
+        with self.SAMPLE.header_edit() as header:
+            header["MYRAF"] = "pyramid"
+        os.utime(abs(self.SAMPLE), ns=(0, 0))
+
+        pyramid = Pyramid(self.SAMPLE, cache_dir=self.CACHE)
+        self.assertNotIsInstance(pyramid.level(2), np.memmap)
+        self.assertEqual(len(os.listdir(self.CACHE)), 3)
+
+    def test_cache_memory_fits(self):
+        pyramid = Pyramid(MemoryFits.from_data_header(self.SAMPLE.data()), cache_dir=self.CACHE)
+        pyramid.build()
+        self.assertEqual(os.listdir(self.CACHE), [])
+
+    def test_clear(self):
+        pyramid = Pyramid(self.SAMPLE, cache_dir=self.CACHE)
+        pyramid.build()
+        pyramid.clear()
+        self.assertEqual(os.listdir(self.CACHE), [])
+
+    def test_factor_for(self):
+        pyramid = Pyramid(self.SAMPLE)
+
+        self.assertEqual(pyramid.factor_for(2), 1)
+        self.assertEqual(pyramid.factor_for(0.75), 1)
+        self.assertEqual(pyramid.factor_for(0.5), 2)
+        self.assertEqual(pyramid.factor_for(0.3), 2)
+        self.assertEqual(pyramid.factor_for(0.01), 8)
+
+    def test_tile(self):
+        tile, x, y = Pyramid(self.SAMPLE).tile(-10, 20, 110, 30)
+
+        self.assertEqual((x, y), (0, 20))
+        np.testing.assert_array_equal(tile, self.SAMPLE.data()[20:50, 0:100])
+
+    def test_tile_out_of_boundaries(self):
+        with self.assertRaises(IndexError):
+            _ = Pyramid(self.SAMPLE).tile(5000, 5000, 10, 10)
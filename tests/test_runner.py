@@ -0,0 +1,122 @@
+import os
+import time
+import unittest
+from threading import Event
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer  # noqa: E402
+
+from myrafgui.runner import JobRunner  # noqa: E402
+
+
+def square(value):
+    time.sleep(0.01 * (value % 3))
+    return value ** 2
+
+
+def fail_on_odd(value):
+    if value % 2:
+        raise ValueError(f"odd value: {value}")
+
+    return value
+
+
+class TestJobRunner(unittest.TestCase):
+    def setUp(self):
+        self.APP = QCoreApplication.instance() or QCoreApplication([])
+        self.results = {}
+        self.order = []
+        self.failures = {}
+        self.progress = []
+        self.finished = []
+
+    def run_runner(self, runner, before=None):
+        runner.result.connect(lambda index, value: (self.results.__setitem__(index, value), self.order.append(index)))
+        runner.failed.connect(self.failures.__setitem__)
+        runner.progress.connect(self.progress.append)
+        runner.finished.connect(self.finished.append)
+
+        loop = QEventLoop()
+        runner.finished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+
+        runner.start()
+        if before is not None:
+            before()
+
+        loop.exec_()
+        runner.wait()
+
+    def test___str__(self):
+        string = str(JobRunner(range(3), square, workers=2))
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("JobRunner"))
+
+    def test_results_keep_index(self):
+        items = list(range(12))
+        runner = JobRunner(items, square, workers=4)
+        self.run_runner(runner)
+
+        self.assertEqual(self.finished, [0])
+        self.assertEqual(self.results, {i: item ** 2 for i, item in enumerate(items)})
+        self.assertEqual(self.progress, list(range(1, len(items) + 1)))
+
+    def test_results_serial_order(self):
+        items = list(range(6))
+        runner = JobRunner(items, square, workers=1)
+        self.run_runner(runner)
+
+        self.assertEqual(self.order, list(range(len(items))))
+
+    def test_errors(self):
+        items = list(range(7))
+        runner = JobRunner(items, fail_on_odd, workers=3)
+        self.run_runner(runner)
+
+        self.assertEqual(self.finished, [3])
+        self.assertEqual(sorted(self.failures), [1, 3, 5])
+        for index, error in self.failures.items():
+            self.assertIsInstance(error, ValueError)
+            self.assertIn(str(items[index]), str(error))
+
+        self.assertEqual(self.results, {0: 0, 2: 2, 4: 4, 6: 6})
+
+    def test_cancel(self):
+        started = Event()
+        release = Event()
+
+        def blocking(value):
+            started.set()
+            release.wait(5)
+            return value
+
+        def cancel():
+            self.assertTrue(started.wait(5))
+            runner.cancel()
+            release.set()
+
+        items = list(range(5))
+        runner = JobRunner(items, blocking, workers=1)
+        self.run_runner(runner, before=cancel)
+
+        self.assertTrue(runner.is_cancelled())
+        self.assertEqual(self.finished, [0])
+        self.assertEqual(self.results, {0: 0})
+        self.assertEqual(self.progress[-1], len(items))
+
+    def test_empty(self):
+        runner = JobRunner([], square)
+        self.run_runner(runner)
+
+        self.assertEqual(self.finished, [0])
+        self.assertEqual(self.results, {})
+
+    def test_name_of(self):
+        self.assertEqual(JobRunner.name_of(("a", 1)), "a")
+        self.assertEqual(JobRunner.name_of(5), "5")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import math
+import unittest
+
+import numpy as np
+from astropy.wcs import WCS, Sip
+
+from myraflib import Fits
+from myraflib.wcs_transform import WCSTransform
+
+
+class TestWCSTransform(unittest.TestCase):
+    def setUp(self):
+        w = WCS(naxis=2)
+        w.wcs.ctype = ["RA---TAN-SIP", "DEC--TAN-SIP"]
+        w.wcs.crval = [150.0, 2.0]
+        w.wcs.crpix = [400.3, 380.7]
+        w.wcs.cd = [[-2e-4, 3e-5], [2.5e-5, 1.9e-4]]
+
+        a = np.zeros((4, 4))
+        a[2, 0], a[1, 1], a[2, 1] = 3e-6, -2e-6, 4e-9
+        b = np.zeros((4, 4))
+        b[0, 2], b[1, 1], b[3, 0] = 2e-6, 1e-6, -2e-9
+        w.sip = Sip(a, b, None, None, w.wcs.crpix)
+        w.wcs.set()
+
+        self.WCS = w
+        self.PIXELS = np.random.default_rng(0).uniform(0, 700, (2, 50))
+
+    def assert_same_sky(self, transform, matrix, offset):
+        xs, ys = np.asarray(matrix) @ self.PIXELS + np.asarray(offset)[:, np.newaxis]
+        expected = self.WCS.pixel_to_world(xs, ys)
+
+        for w in (transform.wcs, WCS(transform.header())):
+            skys = w.pixel_to_world(*self.PIXELS)
+            self.assertLess(expected.separation(skys).arcsec.max(), 1e-6)
+
+    def test___str__(self):
+        string = str(WCSTransform(self.WCS))
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("WCSTransform"))
+
+    def test_shift(self):
+        self.assert_same_sky(WCSTransform(self.WCS).shift(20, -7), np.identity(2), [-20, 7])
+
+    def test_crop(self):
+        self.assert_same_sky(WCSTransform(self.WCS).crop(13, 40), np.identity(2), [13, 40])
+
+    def test_bin(self):
+        self.assert_same_sky(WCSTransform(self.WCS).bin(4, 3), np.diag([4, 3]), [1.5, 1])
+
+    def test_rotate(self):
+        angle = 0.7
+        center = np.array([776, 800]) / 2
+        matrix = np.array([[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]])
+        self.assert_same_sky(
+            WCSTransform(self.WCS).rotate(angle, (801, 777)), matrix, center - matrix @ center
+        )
+
+    def test_header_sip(self):
+        header = WCSTransform(self.WCS).bin(2, 2).header()
+        self.assertEqual(header["A_ORDER"], 3)
+        self.assertEqual(header["B_ORDER"], 3)
+
+    def test_no_wcs(self):
+        w = WCS(Fits.from_data_header(np.ones((4, 4))).pure_header())
+        transform = WCSTransform(w)
+        self.assertIs(transform.shift(1, 1), transform)
@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from astropy.visualization import ZScaleInterval
+
+from myraflib import Fits, MemoryFits
+from myraflib.zscale import ZScale
+
+
+class TestZScale(unittest.TestCase):
+    def setUp(self):
+        Fits.high_precision = True
+        self.SAMPLE = Fits.sample()
+        self.DIRECTORY = tempfile.mkdtemp()
+        self.ZSCALE = ZScale(path=os.path.join(self.DIRECTORY, "zscale.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.DIRECTORY, ignore_errors=True)
+
+    def test___str__(self):
+        string = str(self.ZSCALE)
+
+        self.assertTrue(string.endswith("')"))
+        self.assertTrue(string.startswith("ZScale"))
+
+    def test_wrong_n_samples(self):
+        with self.assertRaises(ValueError):
+            _ = ZScale(n_samples=0)
+
+    def test_sample(self):
+        data = self.SAMPLE.data()
+        sample = self.ZSCALE.sample(data)
+
+        self.assertLess(abs(len(sample) - 1000), 100)
+        self.assertTrue(np.isin(sample, data).all())
+        np.testing.assert_array_equal(sample, self.ZSCALE.sample(data))
+
+    def test_sample_small(self):
+        data = np.arange(20, dtype=float).reshape(4, 5)
+        data[1, 1] = np.nan
+        sample = self.ZSCALE.sample(data)
+
+        self.assertEqual(len(sample), 19)
+
+    def test_sample_native_data_type(self):
+        sample = self.ZSCALE.sample(self.SAMPLE.view())
+        np.testing.assert_array_equal(sample, self.ZSCALE.sample(self.SAMPLE.data()))
+
+    def test_get_limits(self):
+        data = self.SAMPLE.data()
+        expected = np.array(ZScaleInterval(n_samples=50000).get_limits(data))
+        limits = np.array(self.ZSCALE.get_limits(data))
+        strided = np.array(ZScaleInterval().get_limits(data))
+
+        self.assertTrue((np.abs(limits - expected) < 0.1 * (expected[1] - expected[0])).all())
+        self.assertLessEqual(np.abs(limits - expected).sum(), np.abs(strided - expected).sum())
+
+    def test_get_limits_no_finite(self):
+        self.assertEqual(self.ZSCALE.get_limits(np.full((5, 5), np.nan)), (0.0, 0.0))
+
+    def test_limits(self):
+        limits = self.ZSCALE.limits(self.SAMPLE)
+
+        self.assertEqual(limits, self.ZSCALE.get_limits(self.SAMPLE.view()))
+        self.assertEqual(len(self.ZSCALE), 1)
+
+        with open(self.ZSCALE.path) as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+        self.assertEqual(ZScale(path=self.ZSCALE.path).limits(self.SAMPLE), limits)
+
+    def test_limits_changed_file(self):
+        self.ZSCALE.limits(self.SAMPLE)
+
+        with self.SAMPLE.header_edit() as header:
+            header["MYRAF"] = "zscale"
+        os.utime(abs(self.SAMPLE), ns=(0, 0))
+        self.ZSCALE.limits(self.SAMPLE)
+
+        _, (signature, _) = next(iter(self.ZSCALE._items.items()))
+        self.assertEqual(signature[0], 0)
+
+    def test_limits_memory_fits(self):
+        fits = MemoryFits.from_data_header(self.SAMPLE.data())
+        self.assertEqual(self.ZSCALE.limits(fits), self.ZSCALE.get_limits(self.SAMPLE.data()))
+        self.assertEqual(len(self.ZSCALE), 0)
+
+    def test_clear(self):
+        self.ZSCALE.limits(self.SAMPLE)
+        self.ZSCALE.clear()
+
+        self.assertEqual(len(self.ZSCALE), 0)
+        self.assertEqual(len(ZScale(path=self.ZSCALE.path)), 0)
+
+    def test_image(self):
+        image = self.ZSCALE.image(self.SAMPLE)
+
+        self.assertEqual(image.dtype, np.uint8)
+        np.testing.assert_array_equal(
+            image, ZScale.to_uint8(self.SAMPLE.data(), self.ZSCALE.limits(self.SAMPLE))
+        )
+
+    def test_to_uint8(self):
+        image = ZScale.to_uint8(np.array([-1.0, 0.0, 5.0, 10.0, 11.0, np.nan]), (0, 10))
+        np.testing.assert_array_equal(image, [0, 0, 127, 255, 255, 0])
+
+    def test_to_uint8_native_data_type(self):
+        image = ZScale.to_uint8(np.array([0, 5, 10], dtype=">i2"), (0, 10))
+        np.testing.assert_array_equal(image, [0, 127, 255])